@@ -1,18 +1,98 @@
-from simulations.characters.harmony.ruan_mei import RuanMei
-from simulations.characters.remembrance.castorice import Castorice
-from simulations.characters.remembrance.hyacine import Hyacine
-from simulations.data_transformer import output_df
-from simulations.characters.base_character import Character
-from simulations.logger_config import get_default_logger
+import argparse
+import time
 from pathlib import Path
 
+from simulations.instrumentation import stage_metrics_as_dicts, write_run_report
+from simulations.lod import DEFAULT_TIER_ROWS
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import OUTPUT_BACKENDS
+from simulations.pipeline import OutputOptions, OutputStatus, run_pipeline
+from simulations.registry import CHARACTERS, load_characters
 
 logger = get_default_logger()
 
 
-def main() -> None:
-    # Initialize characters
-    character_list: list[Character] = [Hyacine(), Castorice(), RuanMei()]
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate character data for the visual dashboard."
+    )
+    parser.add_argument(
+        "characters",
+        nargs="*",
+        choices=sorted(CHARACTERS),
+        metavar="CHARACTER",
+        help=f"Characters to generate (default: all of {', '.join(CHARACTERS)})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU, 1 runs in-process)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate every character even if its build hash is unchanged",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=sorted(OUTPUT_BACKENDS),
+        default=["csv"],
+        help="Output formats to write for each character (default: csv)",
+    )
+    parser.add_argument(
+        "--wide",
+        action="store_true",
+        help=(
+            "Also repeat scalar metadata as columns of every data row "
+            "(default: only in the JSON sidecar)"
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Path of the JSON run report (default: .build_cache/run_report.json)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=None,
+        help="Write cProfile and tracemalloc dumps for each character to this directory",
+    )
+    parser.add_argument(
+        "--lod",
+        action="store_true",
+        help="Also write downsampled level-of-detail tiers for charted curves",
+    )
+    parser.add_argument(
+        "--lod-tiers",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_TIER_ROWS),
+        help="Row counts of the downsampled tiers (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse the sweep batches an interrupted run checkpointed, "
+        "recomputing only the missing ones; implies --checkpoint",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Journal completed sweep batches in the build cache while a run "
+        "is in progress, so it can be resumed",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    # Initialize characters, importing only the selected modules
+    character_list = load_characters(args.characters)
 
     # Get the workspace root directory (parent of the hsr_simulations directory)
     # This assumes the script is in hsr_simulations/main.py
@@ -23,26 +103,73 @@ def main() -> None:
 
     # Create the base directory path relative to workspace root
     base_dir = workspace_root / "visual_dashboard" / "public"
-    base_dir.mkdir(parents=True, exist_ok=True)
 
-    for character in character_list:
-        # Get character name from class name
-        character_name = character.__class__.__name__.lower()
+    # Build manifest recording the hash of each character's last build
+    manifest_path = current_file.parent / ".build_cache" / "manifest.json"
+    report_path = (
+        args.report or current_file.parent / ".build_cache" / "run_report.json"
+    )
 
-        # Create character-specific directory
-        character_dir = base_dir / character_name
-        character_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    results = run_pipeline(
+        character_list,
+        base_dir,
+        max_workers=args.workers,
+        manifest_path=manifest_path,
+        force=args.force,
+        options=OutputOptions(
+            output_formats=tuple(args.formats),
+            normalize=not args.wide,
+            profile_dir=args.profile_dir,
+            lod_tiers=tuple(args.lod_tiers) if args.lod else (),
+            cache_dir=current_file.parent / ".build_cache",
+            checkpoint=args.checkpoint or args.resume,
+            resume=args.resume,
+        ),
+    )
+    total_wall_s = time.perf_counter() - start
 
-        # Get dataframe and save to CSV
-        df = output_df(character)
+    failed = False
+    for result in results:
+        if result.status == OutputStatus.WRITTEN:
+            logger.info(
+                f"Saved {result.character_name} data to "
+                f"{', '.join(str(path) for path in result.output_paths)}"
+            )
+        elif result.status == OutputStatus.UNCHANGED:
+            logger.info(f"{result.character_name} data unchanged")
+        elif result.status == OutputStatus.SKIPPED:
+            logger.info(f"Skipped {result.character_name}: build hash unchanged")
+        else:
+            logger.error(
+                f"Failed to generate {result.character_name} data: {result.error}"
+            )
+            failed = True
 
-        # Create the CSV file path
-        csv_path = character_dir / f"{character_name}_data.csv"
+        for stage in result.stages:
+            logger.info(
+                f"{result.character_name} {stage.stage}: {stage.wall_s:.4f}s wall, "
+                f"{stage.cpu_s:.4f}s cpu, {stage.rows} rows"
+            )
 
-        # Save the dataframe to CSV
-        df.to_csv(csv_path, index=False)
+    write_run_report(
+        report_path,
+        [
+            {
+                "character": result.character_name,
+                "status": result.status,
+                "output_paths": result.output_paths,
+                "error": result.error,
+                "stages": stage_metrics_as_dicts(result.stages),
+            }
+            for result in results
+        ],
+        total_wall_s,
+    )
+    logger.info(f"Finished in {total_wall_s:.2f}s; run report at {report_path}")
 
-        logger.info(f"Saved {character_name} data to {csv_path}")
+    if failed:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
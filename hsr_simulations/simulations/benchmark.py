@@ -0,0 +1,296 @@
+import argparse
+import io
+import itertools
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from simulations.characters.base_character import Character
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.castorice import Castorice
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.data_transformer import iter_output_batches
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import get_output_backend
+
+logger = get_default_logger()
+
+DEFAULT_BASELINE_PATH = (
+    Path(__file__).resolve().parent.parent / "benchmarks" / "baseline.json"
+)
+BENCHMARK_FORMATS = ("csv", "parquet")
+CALIBRATION_SIZE = 200_000
+
+
+def _hyacine(scale: int) -> Character:
+    hyacine = Hyacine()
+    hyacine.MAX_SPEED = hyacine.speed + (Hyacine.MAX_SPEED - hyacine.speed) * scale
+    return hyacine
+
+
+def _castorice(scale: int) -> Character:
+    castorice = Castorice()
+    castorice.COMBINED_ALLIES_HP_STEP = max(
+        1, Castorice.COMBINED_ALLIES_HP_STEP // scale
+    )
+    return castorice
+
+
+def _ruan_mei(scale: int) -> Character:
+    ruan_mei = RuanMei()
+    ruan_mei.BREAK_EFFECT_STEP = RuanMei.BREAK_EFFECT_STEP / scale
+    return ruan_mei
+
+
+def _anaxa(scale: int) -> Character:
+    return Anaxa()
+
+
+# Build a character whose sweep is `scale` times its default size, and the
+# scales to run it at. Anaxa's grid is every eidolon/light cone combination,
+# which no setting enlarges, so it runs at its default size only.
+CHARACTER_FACTORIES: dict[str, tuple[Callable[[int], Character], tuple[int, ...]]] = {
+    "hyacine": (_hyacine, (1, 10, 100)),
+    "castorice": (_castorice, (1, 10, 100)),
+    "ruanmei": (_ruan_mei, (1, 10, 100)),
+    "anaxa": (_anaxa, (1,)),
+}
+
+
+def benchmark_formats() -> tuple[str, ...]:
+    """Output formats to benchmark, leaving out those whose extra is missing."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ("csv",)
+    return BENCHMARK_FORMATS
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Timings of one character and sweep size.
+
+    Args:
+        rows: Rows written
+        stage_s: Best wall time of each stage: 'simulate' for streaming the
+            batches, then one entry per output format for writing them
+        peak_bytes: Peak traced memory of a whole run
+    """
+
+    rows: int
+    stage_s: dict[str, float]
+    peak_bytes: int
+
+    def costs(self, calibration_s: float) -> dict[str, float]:
+        """Stage times in units of the calibration workload's time."""
+        return {stage: s / calibration_s for stage, s in self.stage_s.items()}
+
+
+def _time_stages(
+    character: Character, formats: tuple[str, ...]
+) -> tuple[int, dict[str, float]]:
+    # The same path the pipeline takes: stream the batches, then hand each
+    # one to every format's batch writer
+    start = time.perf_counter()
+    batches = list(iter_output_batches(character))
+    stage_s = {"simulate": time.perf_counter() - start}
+    for output_format in formats:
+        start = time.perf_counter()
+        with get_output_backend(output_format).batch_writer(io.BytesIO()) as write:
+            for batch in batches:
+                write(batch)
+        stage_s[output_format] = time.perf_counter() - start
+    rows = sum(len(next(iter(batch.values()), [])) for batch in batches)
+    return rows, stage_s
+
+
+def measure(
+    factory: Callable[[int], Character],
+    scale: int,
+    repeat: int = 5,
+    formats: tuple[str, ...] = ("csv",),
+) -> BenchmarkResult:
+    """
+    Time each pipeline stage for one character and sweep size.
+
+    Stage times are the best of `repeat` runs, each on a fresh character so
+    cached results are not reused. Peak memory is measured in a separate run
+    with tracemalloc, so tracing does not skew the timings.
+    """
+    best: dict[str, float] = {}
+    rows = 0
+    for _ in range(repeat):
+        rows, stage_s = _time_stages(factory(scale), formats)
+        best = {
+            stage: min(best.get(stage, float("inf")), s) for stage, s in stage_s.items()
+        }
+
+    tracemalloc.start()
+    try:
+        _time_stages(factory(scale), formats)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(rows, best, peak_bytes)
+
+
+def run_benchmarks(
+    repeat: int = 5, formats: tuple[str, ...] | None = None
+) -> dict[str, BenchmarkResult]:
+    formats = benchmark_formats() if formats is None else formats
+    return {
+        f"{name}@x{scale}": measure(factory, scale, repeat, formats)
+        for name, (factory, scales) in CHARACTER_FACTORIES.items()
+        for scale in scales
+    }
+
+
+def _calibration_workload() -> None:
+    # Interpreter-bound loop and a NumPy sort, the two kinds of work the
+    # stages do, independent of any code being benchmarked
+    total = 0.0
+    for value in range(CALIBRATION_SIZE):
+        total += value * 0.5
+    np.sort(np.random.default_rng(0).random(CALIBRATION_SIZE))
+
+
+def calibrate(repeat: int = 5) -> float:
+    """Best wall time of a fixed workload, measuring this machine's speed."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _calibration_workload()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def find_regressions(
+    results: dict[str, BenchmarkResult],
+    calibration_s: float,
+    baseline: dict[str, dict[str, Any]],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_cost_delta: float = 0.5,
+) -> list[str]:
+    """
+    Compare results with a stored baseline.
+
+    Times are compared as costs, in units of the calibration workload timed
+    on the same machine, so a baseline recorded elsewhere still applies. A
+    stage regresses when its cost exceeds the baseline's by more than
+    time_tolerance (relative) and min_cost_delta (absolute, to ignore timer
+    noise on the smallest stages). Peak memory regresses when it grows by
+    more than memory_tolerance.
+
+    Returns:
+        Human-readable description of each regression
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        if result.rows != base["rows"]:
+            regressions.append(
+                f"{key}: {result.rows} rows vs baseline {base['rows']}; "
+                "update the baseline if the sweep changed on purpose"
+            )
+            continue
+
+        base_costs = base["costs"]
+        for stage, cost in result.costs(calibration_s).items():
+            if stage not in base_costs:
+                continue
+            base_cost = base_costs[stage]
+            limit = max(base_cost * (1 + time_tolerance), base_cost + min_cost_delta)
+            if cost > limit:
+                regressions.append(
+                    f"{key} {stage}: cost {cost:.2f} vs baseline {base_cost:.2f}"
+                )
+
+        if result.peak_bytes > base["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(
+                f"{key} peak_bytes: {result.peak_bytes} vs baseline "
+                f"{base['peak_bytes']}"
+            )
+    return regressions
+
+
+def find_superlinear(
+    results: dict[str, BenchmarkResult], tolerance: float, min_delta_s: float = 0.005
+) -> list[str]:
+    """
+    Check that each character's time grows at most linearly with its rows.
+
+    Compares consecutive scales of the same character on this run alone, so
+    no baseline or calibration is involved.
+
+    Returns:
+        Human-readable description of each character that scales worse
+    """
+    problems = []
+    for name, (_, scales) in CHARACTER_FACTORIES.items():
+        for small_scale, large_scale in itertools.pairwise(scales):
+            small = results.get(f"{name}@x{small_scale}")
+            large = results.get(f"{name}@x{large_scale}")
+            if small is None or large is None:
+                continue
+            small_s = sum(small.stage_s.values())
+            large_s = sum(large.stage_s.values())
+            limit = small_s * large.rows / small.rows * (1 + tolerance) + min_delta_s
+            if large_s > limit:
+                problems.append(
+                    f"{name}: {large_s:.4f}s for {large.rows} rows vs "
+                    f"{small_s:.4f}s for {small.rows} rows"
+                )
+    return problems
+
+
+def baseline_entries(
+    results: dict[str, BenchmarkResult], calibration_s: float
+) -> dict[str, dict[str, Any]]:
+    return {
+        key: {
+            "rows": result.rows,
+            "costs": result.costs(calibration_s),
+            "peak_bytes": result.peak_bytes,
+        }
+        for key, result in results.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-record the benchmark baseline checked by the test suite."
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    calibration_s = calibrate(args.repeat)
+    results = run_benchmarks(args.repeat)
+    for key, result in results.items():
+        stages = ", ".join(f"{stage} {s:.4f}s" for stage, s in result.stage_s.items())
+        logger.info(
+            f"{key}: {result.rows} rows, {stages}, "
+            f"peak {result.peak_bytes / 1024:,.0f} KiB"
+        )
+
+    args.baseline.parent.mkdir(parents=True, exist_ok=True)
+    args.baseline.write_text(
+        json.dumps(baseline_entries(results, calibration_s), indent=2) + "\n"
+    )
+    logger.info(f"Saved benchmark baseline to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import hashlib
+import importlib
+import inspect
+import json
+from pathlib import Path
+from types import ModuleType
+
+from simulations.characters.base_character import Character
+
+# Modules that shape every character's output files. Imported by name when
+# hashing, since the pipeline itself depends on this module.
+OUTPUT_MODULES = (
+    "simulations.data_transformer",
+    "simulations.lod",
+    "simulations.output_backends",
+    "simulations.pipeline",
+)
+
+
+def _source_modules(character: Character) -> list[ModuleType]:
+    """Modules whose source can change a character's output."""
+    modules = {name: importlib.import_module(name) for name in OUTPUT_MODULES}
+
+    for cls in type(character).__mro__:
+        module = inspect.getmodule(cls)
+        if module is None or not module.__name__.startswith("simulations."):
+            continue
+        modules[module.__name__] = module
+
+        # Include project modules the character's module depends on, e.g. the
+        # rotation solver used by Anaxa
+        for value in vars(module).values():
+            dependency = inspect.getmodule(value)
+            if dependency is not None and dependency.__name__.startswith(
+                "simulations."
+            ):
+                modules[dependency.__name__] = dependency
+
+    return [modules[name] for name in sorted(modules)]
+
+
+def compute_character_hash(character: Character) -> str:
+    """
+    Hash everything that determines a character's output data.
+
+    Covers the source of the output pipeline modules, the character's modules
+    and the project modules they depend on, the class-level constants (e.g. RuanMei.A6_*,
+    Castorice.NEWBUD_REQUIRED) and the public instance attributes set in __init__.
+
+    Args:
+        character: Character instance to hash
+
+    Returns:
+        Hex digest identifying the character's current definition
+    """
+    digest = hashlib.sha256()
+
+    for module in _source_modules(character):
+        digest.update(module.__name__.encode())
+        digest.update(inspect.getsource(module).encode())
+
+    for cls in type(character).__mro__:
+        if cls is object:
+            continue
+
+        constants = {
+            name: repr(value)
+            for name, value in vars(cls).items()
+            if name.isupper() and not callable(value)
+        }
+        digest.update(json.dumps(constants, sort_keys=True).encode())
+
+    # Private attributes hold caches of results, not inputs
+    instance_attrs = {
+        name: repr(value)
+        for name, value in vars(character).items()
+        if not name.startswith("_")
+    }
+    digest.update(json.dumps(instance_attrs, sort_keys=True).encode())
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """JSON manifest mapping each character name to the key of its last build."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hashes: dict[str, str] = {}
+        if path.exists():
+            self.hashes = json.loads(path.read_text())
+
+    def is_up_to_date(self, character_name: str, build_key: str) -> bool:
+        return self.hashes.get(character_name) == build_key
+
+    def update(self, character_name: str, build_key: str) -> None:
+        self.hashes[character_name] = build_key
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.hashes, indent=2, sort_keys=True) + "\n")
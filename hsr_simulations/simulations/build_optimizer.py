@@ -0,0 +1,263 @@
+import argparse
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.characters.base_character import Character
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import columns_to_csv
+from simulations.registry import CHARACTERS, load_character_class
+from simulations.sweep import DEFAULT_CHUNK_SIZE, iter_grid_chunks
+
+logger = get_default_logger()
+
+# Points checked together in each pass of pareto_mask
+PARETO_BLOCK_SIZE = 64
+
+# Scores a chunk of builds: axis values in, objective name to scores out
+BuildScorer = Callable[[dict[str, npt.NDArray[Any]]], Mapping[str, npt.ArrayLike]]
+
+
+@dataclass(frozen=True)
+class ParetoFront:
+    """
+    Non-dominated builds found by optimize_builds.
+
+    Args:
+        params: Axis name to the chosen value of each front build
+        objectives: Objective name to the score of each front build
+        candidates: Number of builds in the searched grid
+        feasible: Number of builds that satisfied the model's constraints
+    """
+
+    params: dict[str, npt.NDArray[Any]]
+    objectives: dict[str, npt.NDArray[np.float64]]
+    candidates: int
+    feasible: int
+
+    def __len__(self) -> int:
+        return len(next(iter(self.objectives.values()), []))
+
+    def as_columns(self) -> dict[str, list[str | float]]:
+        """Front builds as lists, ordered by the first objective descending."""
+        columns: dict[str, list[str | float]] = {}
+        for name, values in {**self.params, **self.objectives}.items():
+            columns.setdefault(name, []).extend(values.tolist())
+        return columns
+
+
+def pareto_mask(points: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+    """
+    Find the points not dominated by any other point, maximizing every column.
+
+    A point is dominated when another point is at least as good in every
+    objective and better in at least one. Of several identical points only
+    the first is kept.
+
+    Two objectives are solved exactly with one sort. Otherwise points are
+    visited from the largest objective sum down in blocks; the strongest
+    points come first and each block removes everything it dominates in one
+    vectorized pass, so the work is about n times the size of the front.
+
+    Args:
+        points: Array of shape (n, objectives)
+
+    Returns:
+        Boolean mask of shape (n,) selecting the non-dominated points
+    """
+    if points.shape[1] == 2:
+        return _pareto_mask_2d(points)
+
+    order = np.argsort(-points.sum(axis=1), kind="stable")
+    remaining = order
+    candidates = points[order]
+    i = 0
+    while i < len(candidates):
+        # A point can only be dominated by one with a larger sum, which comes
+        # earlier, so the next block only needs checking against itself
+        block = candidates[i : i + PARETO_BLOCK_SIZE]
+        earlier_dominates = np.all(block[:, None, :] >= block[None, :, :], axis=2)
+        block_keep = ~np.any(np.triu(earlier_dominates, k=1), axis=0)
+
+        # Drop every later point dominated by the block's survivors at once
+        rest_keep = ~dominated_by_front(candidates[i + len(block) :], block[block_keep])
+        keep = np.concatenate([np.ones(i, dtype=np.bool_), block_keep, rest_keep])
+        remaining = remaining[keep]
+        candidates = candidates[keep]
+        i += int(np.count_nonzero(block_keep))
+
+    mask = np.zeros(len(points), dtype=np.bool_)
+    mask[remaining] = True
+    return mask
+
+
+def _pareto_mask_2d(points: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+    # Sorted by the first objective descending (ties: second descending, then
+    # original order), a point is on the front only if its second objective
+    # beats every point before it
+    order = np.lexsort((np.arange(len(points)), -points[:, 1], -points[:, 0]))
+    second = points[order, 1]
+    best_before = np.maximum.accumulate(np.concatenate([[-np.inf], second[:-1]]))
+
+    mask = np.zeros(len(points), dtype=np.bool_)
+    mask[order[second > best_before]] = True
+    return mask
+
+
+def dominated_by_front(
+    points: npt.NDArray[np.float64], front: npt.NDArray[np.float64]
+) -> npt.NDArray[np.bool_]:
+    """
+    Find the points weakly dominated by at least one point of front.
+
+    Args:
+        points: Array of shape (n, objectives)
+        front: Array of shape (m, objectives)
+
+    Returns:
+        Boolean mask of shape (n,)
+    """
+    dominated = np.zeros(len(points), dtype=np.bool_)
+    if not len(front):
+        return dominated
+
+    # Compare in blocks so the (block, m, objectives) temporary stays small
+    block_size = max(1, 1_000_000 // (len(front) * points.shape[1]))
+    for start in range(0, len(points), block_size):
+        block = points[start : start + block_size, None, :]
+        dominated[start : start + block_size] = np.any(
+            np.all(front[None, :, :] >= block, axis=2), axis=1
+        )
+    return dominated
+
+
+def optimize_builds(
+    axes: Mapping[str, npt.ArrayLike],
+    score: BuildScorer,
+    objectives: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ParetoFront:
+    """
+    Search a grid of builds for the Pareto front of several objectives.
+
+    Builds are scored chunk by chunk with a vectorized score function. Each
+    chunk is pruned in three steps:
+    - Infeasible builds are dropped.
+    - If the chunk's ideal point (best value of every objective) is already
+      dominated by the front, the whole chunk is discarded.
+    - Otherwise the chunk's own front is merged into the running front.
+
+    Args:
+        axes: Axis name to 1-D array of choices, e.g. substat roll counts
+        score: Callable taking a chunk of axis values and returning objective
+            name to score array; NaN marks a build that breaks a constraint
+        objectives: Names of the score columns to maximize
+        chunk_size: Maximum number of builds scored at once
+
+    Returns:
+        Non-dominated builds, sorted by the first objective descending
+    """
+    front_points = np.empty((0, len(objectives)), dtype=np.float64)
+    front_params: dict[str, npt.NDArray[Any]] = {}
+    candidates = 0
+    feasible = 0
+
+    for params in iter_grid_chunks(axes, chunk_size):
+        scores = score(params)
+        points = np.column_stack(
+            [np.asarray(scores[name], dtype=np.float64) for name in objectives]
+        )
+        candidates += len(points)
+
+        keep = ~np.isnan(points).any(axis=1)
+        feasible += int(np.count_nonzero(keep))
+        if not keep.any():
+            continue
+
+        points = points[keep]
+        params = {name: values[keep] for name, values in params.items()}
+
+        # Bound: skip the chunk if even its ideal point is already dominated
+        if dominated_by_front(points.max(axis=0)[None, :], front_points)[0]:
+            continue
+
+        # Reduce the chunk to its own front first; the merge below then only
+        # compares a few points against the running front
+        chunk_front = pareto_mask(points)
+        merged_points = np.concatenate([front_points, points[chunk_front]])
+        merged_params = {
+            name: np.concatenate(
+                [front_params[name], values[chunk_front]]
+                if name in front_params
+                else [values[chunk_front]]
+            )
+            for name, values in params.items()
+        }
+        merged_front = pareto_mask(merged_points)
+        front_points = merged_points[merged_front]
+        front_params = {
+            name: values[merged_front] for name, values in merged_params.items()
+        }
+
+    order = np.argsort(-front_points[:, 0], kind="stable")
+    return ParetoFront(
+        params={name: values[order] for name, values in front_params.items()},
+        objectives={name: front_points[order, i] for i, name in enumerate(objectives)},
+        candidates=candidates,
+        feasible=feasible,
+    )
+
+
+def optimize_character_builds(
+    character: Character, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ParetoFront:
+    """Find the Pareto front of a character's build_axes and score_builds."""
+    if not character.build_axes():
+        raise ValueError(f"{type(character).__name__} has no build model")
+    return optimize_builds(
+        character.build_axes(),
+        character.score_builds,
+        character.BUILD_OBJECTIVES,
+        chunk_size,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Find the Pareto front of relic builds for a character."
+    )
+    parser.add_argument("character", choices=sorted(CHARACTERS))
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write the front to this CSV file"
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    character = load_character_class(args.character)()
+    if not character.build_axes():
+        parser.error(f"{args.character} has no build model")
+
+    start = time.perf_counter()
+    front = optimize_character_builds(character, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Searched {front.candidates:,} builds ({front.feasible:,} feasible) in "
+        f"{elapsed:.2f}s; {len(front)} on the Pareto front"
+    )
+
+    columns = front.as_columns()
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(columns_to_csv(columns))
+        logger.info(f"Saved Pareto front to {args.output}")
+    else:
+        print(columns_to_csv(columns).decode(), end="")
+
+
+if __name__ == "__main__":
+    main()
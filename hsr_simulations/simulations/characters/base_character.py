@@ -1,6 +1,145 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.sweep import DEFAULT_CHUNK_SIZE, iter_grid_chunks
+
+
 class Character:
+    # Objectives maximized by the build optimizer, in score_builds columns
+    BUILD_OBJECTIVES: tuple[str, ...] = ()
+    # Output column charted on the x axis; None skips level-of-detail tiers
+    LOD_X_COLUMN: str | None = None
+
     def __init__(self) -> None:
         pass
 
+    def sweep_axes(self) -> dict[str, npt.ArrayLike]:
+        """Parameter axes swept by the default output_data, by name."""
+        return {}
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        """
+        Evaluate a chunk of grid points.
+
+        Characters declaring sweep_axes override this; the default adds no
+        columns, as there is no grid to evaluate.
+
+        Args:
+            params: Axis name to array of values, one entry per grid point
+
+        Returns:
+            Output column name to array of values, one entry per grid point
+        """
+        return {}
+
+    def build_axes(self) -> dict[str, npt.ArrayLike]:
+        """
+        Relic and substat choices searched by the build optimizer, by name.
+
+        Empty for characters without a build model, which the optimizer
+        rejects.
+        """
+        return {}
+
+    def score_builds(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Score a chunk of builds on each of BUILD_OBJECTIVES.
+
+        Characters declaring build_axes override this; the default scores no
+        objectives.
+
+        Args:
+            params: Axis name to array of choices, one entry per build
+
+        Returns:
+            Objective name to score, NaN for builds breaking a constraint
+        """
+        return {}
+
+    def iter_sweep(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        offset: int = 0,
+    ) -> Iterator[dict[str, npt.NDArray[Any]]]:
+        """
+        Evaluate the declared parameter grid lazily, chunk by chunk.
+
+        Args:
+            chunk_size: Maximum number of grid points per chunk
+            shard_index: Which contiguous shard of the grid to evaluate
+            shard_count: Number of shards the grid is split into, e.g. one
+                per worker process
+            offset: Grid points at the start of the shard to skip
+
+        Yields:
+            Axis values followed by evaluated columns for each chunk
+        """
+        for params in iter_grid_chunks(
+            self.sweep_axes(), chunk_size, shard_index, shard_count, offset
+        ):
+            yield {**params, **self.evaluate_sweep(params)}
+
+    def sweep_data(
+        self, shard_index: int = 0, shard_count: int = 1
+    ) -> dict[str, list[str | float]]:
+        """Collect the declared parameter grid (or one shard of it) as lists."""
+        data_dict: dict[str, list[str | float]] = {}
+        for chunk in self.iter_sweep(shard_index=shard_index, shard_count=shard_count):
+            for column, values in chunk.items():
+                data_dict.setdefault(column, []).extend(values.tolist())
+        return data_dict
+
     def output_data(self) -> dict[str, list[str | float]]:
-        return {"character": []}
+        """Per-row series, one list per column, all of the same length."""
+        return self.sweep_data()
+
+    def iter_batches(
+        self, batch_size: int = DEFAULT_CHUNK_SIZE, offset: int = 0
+    ) -> Iterator[dict[str, list[str | float]]]:
+        """
+        Stream the rows of output_data in batches of bounded size.
+
+        Characters with sweep axes evaluate their grid chunk by chunk, so only
+        one batch is held in memory. Others yield output_data() as a single
+        batch; override this alongside output_data if it is not the sweep.
+
+        Args:
+            batch_size: Maximum number of rows per batch
+            offset: Rows to skip, e.g. those an interrupted run already
+                checkpointed
+
+        Yields:
+            Column name to list of values, with the same columns every batch
+        """
+        if not self.sweep_axes():
+            yield {
+                column: values[offset:] for column, values in self.output_data().items()
+            }
+            return
+
+        for chunk in self.iter_sweep(chunk_size=batch_size, offset=offset):
+            yield {column: values.tolist() for column, values in chunk.items()}
+
+    def lod_breakpoints(self, cache_dir: Path | None = None) -> list[float]:
+        """
+        x values where the charted curves change shape, kept in every tier.
+
+        Args:
+            cache_dir: Directory to cache anything expensive to find them
+                in, e.g. threshold indexes, or None to not cache
+        """
+        return []
+
+    def output_metadata(self) -> dict[str, str | float]:
+        """Scalar values shared by every row, written once per character."""
+        return {"character": self.__class__.__name__}
@@ -1,103 +1,262 @@
+import functools
+import itertools
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
 from simulations.characters.base_character import Character
+from simulations.markov_rotation import Outcome, solve_markov_rotation, with_crit
+from simulations.monte_carlo import PERCENTILES, CritDamageSampler, run_monte_carlo
+from simulations.rotation import RotationStep, solve_rotation
+from simulations.status_effects import StatusStacks
+from simulations.timeline import (
+    Timeline,
+    TimelineActor,
+    TurnRecord,
+    cycles_action_value,
+)
+
+
+@functools.cache
+def _e4_transition_table(
+    atk: float,
+    skill_mult: float,
+    atk_buff_percent: float,
+    atk_buff_duration: int,
+    atk_buff_max_stacks: int,
+    shape: tuple[int, int, int],
+) -> tuple[tuple[int, ...], tuple[float, ...]]:
+    # Every state is one entity of a single StatusStacks, stepped together
+    # with the rules of Anaxa.e4_rotation_step
+    has_e4, skill_points, codes = np.unravel_index(np.arange(np.prod(shape)), shape)
+    has_e4 = has_e4.astype(np.bool_)
+    atk_buffs = StatusStacks.from_codes(codes, atk_buff_max_stacks, atk_buff_duration)
+
+    atk_buff_multiplier = np.where(
+        has_e4, 1.0 + (atk_buffs.counts() * atk_buff_percent), 1.0
+    )
+    use_skill = skill_points > 0
+    # Skill or Basic ATK multiplier, as in Anaxa.calculate_dmg
+    dmg = (atk * atk_buff_multiplier) * np.where(use_skill, skill_mult, 1.0)
+    skill_points = skill_points + np.where(use_skill, -1, 1)
+    atk_buffs.apply(use_skill & has_e4)
+    atk_buffs.tick()
+
+    next_state = np.ravel_multi_index((has_e4, skill_points, atk_buffs.codes()), shape)
+    return tuple(next_state.tolist()), tuple(dmg.tolist())
 
 
 class Anaxa(Character):
-    def __init__(self):
+    BASE_ATK: float = 1000.0
+    ULT_ENERGY: int = 140
+    TOTAL_CYCLES: int | None = 1000
+    # One turn per 100 action value cycle
+    SPEED: float = 100.0
+    BASE_CRIT_RATE: float = 0.5
+    BASE_CRIT_DMG: float = 1.0
+    E6_CRIT_DMG_BONUS: float = 1.4  # 140%, applied twice as in the E6 simulation
+    E6_ALLY_DMG_BONUS: float = 0.5  # 50%
+    E6_ANAXA_DMG_MULT: float = 1.3
+    # Hit damage of the E6 rotation before its bonuses
+    E6_BASE_SKILL_DMG: float = 1000.0
+    E6_BASE_BASIC_ATK_DMG: float = 500.0
+    BASE_SKILL_POINTS: int = 3
+    MAX_SKILL_POINTS: int = 5
+    # E4: When using Skill, increases ATK by 30%, lasting for 2 turns. Stacks up to 2 times.
+    E4_ATK_BUFF_PERCENT: float = 0.3
+    E4_ATK_BUFF_DURATION: int = 2
+    E4_ATK_BUFF_MAX_STACKS: int = 2
+    FLAG_NAMES = ("has_e1", "has_e2", "has_e3", "has_e4", "has_e5", "has_e6", "has_lc")
+
+    def __init__(self, total_cycles: int | None = TOTAL_CYCLES) -> None:
+        """
+        Args:
+            total_cycles: Cycles simulated by each eidolon/light cone helper,
+                or None to use the long-run (infinite horizon) damage per cycle
+        """
         super().__init__()
+        self.atk = self.BASE_ATK
+        self.ult_energy = self.ULT_ENERGY
+        self.total_cycles = total_cycles
+        self.speed = self.SPEED
         self.skill_mult = 0.7
         self.ult_mult = 1.6
         self.qualitative_disclosure_mult = 0.3
-
-    def calculate_final_dmg(
+        self._helper_dmg_mults: dict[
+            tuple[int | None, float, float, int, float], dict[str, float]
+        ] = {}
+
+    @staticmethod
+    def calculate_dmg(atk: float, mult: float) -> float:
+        return atk * mult
+
+    @staticmethod
+    def calculate_percent_change(base_dmg: float, new_dmg: float) -> float:
+        return (new_dmg - base_dmg) / base_dmg
+
+    def helper_dmg_mults(self) -> dict[str, float]:
+        """
+        Damage increase from each eidolon/light cone simulation helper.
+
+        The helpers do not depend on which flags are set, only on
+        total_cycles, speed, atk, ult_energy and skill_mult, so their results
+        are memoized on those and reused until one of them changes.
+        """
+        key = (
+            self.total_cycles,
+            self.speed,
+            self.atk,
+            self.ult_energy,
+            self.skill_mult,
+        )
+        if key not in self._helper_dmg_mults:
+            self._helper_dmg_mults[key] = {
+                "e1": self.calculate_dmg_increased_from_e1(),
+                "e2": self.calculate_dmg_increased_from_e2(),
+                "e4": self.calculate_dmg_increased_from_e4(),
+                "e6": self.calculate_dmg_increased_from_e6(),
+                "lc": self.calculate_dmg_increased_from_lc(),
+            }
+        return dict(self._helper_dmg_mults[key])
+
+    def calculate_final_dmg_array(
         self,
-        has_e1: bool | None = None,
-        has_e2: bool | None = None,
-        has_e3: bool | None = None,
-        has_e4: bool | None = None,
-        has_e5: bool | None = None,
-        has_e6: bool | None = None,
-        has_lc: bool | None = None,
-    ) -> float:
-        if has_e1:
-            def_reduce_mult = 0.16
-            e1_mult = self.calculate_dmg_increased_from_e1()
-        else:
-            def_reduce_mult = 0.0
-            e1_mult = 0.0
-
-        if has_e2:
-            all_type_res_pen_mult = 0.2
-            e2_mult = self.calculate_dmg_increased_from_e2()
-        else:
-            all_type_res_pen_mult = 0.0
-            e2_mult = 0.0
-
-        if has_e3:
-            self.ult_mult = 1.76
-
-        if has_e4:
-            e4_mult = self.calculate_dmg_increased_from_e4()
-        else:
-            e4_mult = 0.0
-
-        if has_e5:
-            self.skill_mult = 0.77
-            self.qualitative_disclosure_mult = 0.324
-
-        if has_e6:
-            e6_buff_mult = self.calculate_dmg_increased_from_e6()
-        else:
-            e6_buff_mult = 0.0
-
-        if has_lc:
-            lc_mult = self.calculate_dmg_increased_from_lc()
+        has_e1: npt.ArrayLike,
+        has_e2: npt.ArrayLike,
+        has_e3: npt.ArrayLike,
+        has_e4: npt.ArrayLike,
+        has_e5: npt.ArrayLike,
+        has_e6: npt.ArrayLike,
+        has_lc: npt.ArrayLike,
+        *,
+        erudition_char_count: int | None = None,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Final damage for arrays of eidolon/light cone flags.
+
+        Args:
+            has_e1 ... has_lc: Boolean flags, broadcast against each other
+            erudition_char_count: Erudition characters in the team, counting
+                Anaxa; None compares E6 against the average of 1 and 2
+
+        Returns:
+            Final damage for each combination of flags
+        """
+        mults = self.helper_dmg_mults()
+        if erudition_char_count is None:
+            e6_mult = 1 + np.where(has_e6, mults["e6"], 0.0)
         else:
-            lc_mult = 0.0
+            # Both E6 effects against the one the team composition enables
+            base_dmg_avg = (
+                self.calculate_e6_rotation_dmg(1, False)
+                + self.calculate_e6_rotation_dmg(2, False)
+            ) / 2
+            e6_mult = (
+                np.where(
+                    has_e6,
+                    self.calculate_e6_rotation_dmg(erudition_char_count, True),
+                    self.calculate_e6_rotation_dmg(erudition_char_count, False),
+                )
+                / base_dmg_avg
+            )
+
+        def_reduce_mult = np.where(has_e1, 0.16, 0.0)
+        all_type_res_pen_mult = np.where(has_e2, 0.2, 0.0)
+        ult_mult = np.where(has_e3, 1.76, self.ult_mult)
+        skill_mult = np.where(has_e5, 0.77, self.skill_mult)
+        qualitative_disclosure_mult = np.where(
+            has_e5, 0.324, self.qualitative_disclosure_mult
+        )
 
         skill_dmg = (
-            self.calculate_dmg(self.atk, self.skill_mult)
+            self.atk
+            * skill_mult
             * (1 + def_reduce_mult)
             * (1 + all_type_res_pen_mult)
-            * (1 + self.qualitative_disclosure_mult)
+            * (1 + qualitative_disclosure_mult)
         )
         ult_dmg = (
-            self.calculate_dmg(self.atk, self.ult_mult)
+            self.atk
+            * ult_mult
             * (1 + def_reduce_mult)
             * (1 + all_type_res_pen_mult)
-            * (1 + self.qualitative_disclosure_mult)
+            * (1 + qualitative_disclosure_mult)
         )
 
         final_dmg = skill_dmg + ult_dmg
 
-        return (
+        return np.asarray(
             final_dmg
-            * (1 + e1_mult)
-            * (1 + e2_mult)
-            * (1 + e4_mult)
-            * (1 + e6_buff_mult)
-            * (1 + lc_mult)
+            * (1 + np.where(has_e1, mults["e1"], 0.0))
+            * (1 + np.where(has_e2, mults["e2"], 0.0))
+            * (1 + np.where(has_e4, mults["e4"], 0.0))
+            * e6_mult
+            * (1 + np.where(has_lc, mults["lc"], 0.0)),
+            dtype=np.float64,
         )
 
+    def calculate_final_dmg(
+        self,
+        has_e1: bool | None = None,
+        has_e2: bool | None = None,
+        has_e3: bool | None = None,
+        has_e4: bool | None = None,
+        has_e5: bool | None = None,
+        has_e6: bool | None = None,
+        has_lc: bool | None = None,
+    ) -> float:
+        return float(
+            self.calculate_final_dmg_array(
+                bool(has_e1),
+                bool(has_e2),
+                bool(has_e3),
+                bool(has_e4),
+                bool(has_e5),
+                bool(has_e6),
+                bool(has_lc),
+            )
+        )
+
+    def sweep_axes(self) -> dict[str, npt.ArrayLike]:
+        return {name: np.array([False, True]) for name in self.FLAG_NAMES}
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        final_dmg = self.calculate_final_dmg_array(
+            *(params[name] for name in self.FLAG_NAMES)
+        )
+        base_dmg = self.calculate_final_dmg()
+        return {
+            "final_dmg": final_dmg,
+            "dmg_increase": (final_dmg - base_dmg) / base_dmg,
+        }
+
+    def output_metadata(self) -> dict[str, str | float]:
+        return {
+            **super().output_metadata(),
+            "base_final_dmg": self.calculate_final_dmg(),
+        }
+
     def calculate_dmg_increased_from_e1(self) -> float:
         def calculate_dmg(has_e1: bool) -> float:
-            total_cycles = 1000
             skill_points = 3
-            total_dmg = 0
             if has_e1:
                 skill_points += 1
 
             skill_dmg = 1000
             basic_atk_dmg = 500
 
-            for _ in range(total_cycles):
+            def step(skill_points: int) -> tuple[int, float]:
                 if skill_points > 0:
-                    total_dmg += skill_dmg
-                    skill_points -= 1
-                else:
-                    total_dmg += basic_atk_dmg
-                    skill_points += 1
+                    return skill_points - 1, skill_dmg
+                return skill_points + 1, basic_atk_dmg
 
-            return total_dmg
+            return solve_rotation(skill_points, step, self.total_cycles)
 
         base_dmg = calculate_dmg(False)
         e1_dmg = calculate_dmg(True)
@@ -106,7 +265,6 @@ class Anaxa(Character):
 
     def calculate_dmg_increased_from_e2(self) -> float:
         # Constants for simulation
-        TOTAL_CYCLES = 1000
         BASE_WEAKNESS_COUNT = 3
         MAX_WEAKNESS_COUNT = 5
         E2_WEAKNESS_BONUS = 1
@@ -114,132 +272,236 @@ class Anaxa(Character):
         E2_MULTIPLIER = 1.3
 
         def calculate_dmg(has_e2: bool) -> float:
-            total_dmg = 0
-            enemy_weakness_count = BASE_WEAKNESS_COUNT
-            new_enemy = True
+            # State: (enemy weakness count, whether the enemy is new)
+            def step(state: tuple[int, bool]) -> tuple[tuple[int, bool], float]:
+                enemy_weakness_count, new_enemy = state
 
-            for _ in range(TOTAL_CYCLES):
                 # E2 increases initial weakness count for new enemy
                 if has_e2 and new_enemy:
                     enemy_weakness_count += E2_WEAKNESS_BONUS
-                new_enemy = False
 
                 if enemy_weakness_count >= MAX_WEAKNESS_COUNT:
                     # Apply E2 bonus multiplier when max weakness is reached
-                    total_dmg += SKILL_DMG * E2_MULTIPLIER
+                    dmg = SKILL_DMG * E2_MULTIPLIER
                     enemy_weakness_count = BASE_WEAKNESS_COUNT
                     new_enemy = True
                 else:
-                    total_dmg += SKILL_DMG
+                    dmg = SKILL_DMG
                     enemy_weakness_count += 1
+                    new_enemy = False
 
                 # Clamp weakness count to max
                 enemy_weakness_count = min(enemy_weakness_count, MAX_WEAKNESS_COUNT)
 
-            return total_dmg
+                return (enemy_weakness_count, new_enemy), dmg
+
+            return solve_rotation((BASE_WEAKNESS_COUNT, True), step, self.total_cycles)
 
         base_dmg = calculate_dmg(False)
         e2_dmg = calculate_dmg(True)
 
         return self.calculate_percent_change(base_dmg, e2_dmg)
 
-    def calculate_dmg_increased_from_e4(self) -> float:
-        # E4: When using Skill, increases ATK by 30%, lasting for 2 turns. Stacks up to 2 times.
-        TOTAL_CYCLES = 1000
-        BASE_SKILL_POINTS = 3
-        ATK_BUFF_PERCENT = 0.3
-        ATK_BUFF_DURATION = 2
-        ATK_BUFF_MAX_STACKS = 2
-
-        def calculate_dmg(has_e4: bool) -> float:
-            skill_points = BASE_SKILL_POINTS
-            total_dmg = 0
-            atk = self.atk
-            # Track active ATK buffs: list of remaining turns for each stack
-            atk_buffs = []
-
-            for _ in range(TOTAL_CYCLES):
-                # Remove expired buffs
-                atk_buffs = [turns for turns in atk_buffs if turns > 0]
-
-                # Calculate current ATK buff multiplier
-                buff_stacks = min(len(atk_buffs), ATK_BUFF_MAX_STACKS)
-                atk_buff_multiplier = (
-                    1.0 + (buff_stacks * ATK_BUFF_PERCENT) if has_e4 else 1.0
-                )
+    def e4_rotation_step(
+        self, has_e4: bool
+    ) -> RotationStep[tuple[int, tuple[int, ...]]]:
+        """
+        One cycle of the E4 rotation.
+
+        The state is (skill points, remaining turns of each active ATK buff
+        stack), starting from (BASE_SKILL_POINTS, ()).
+        """
+        ATK_BUFF_PERCENT = self.E4_ATK_BUFF_PERCENT
+        ATK_BUFF_DURATION = self.E4_ATK_BUFF_DURATION
+        ATK_BUFF_MAX_STACKS = self.E4_ATK_BUFF_MAX_STACKS
+        atk = self.atk
+
+        def step(
+            state: tuple[int, tuple[int, ...]],
+        ) -> tuple[tuple[int, tuple[int, ...]], float]:
+            # Only unexpired buffs are kept in the state
+            skill_points, atk_buffs = state
+
+            # Calculate current ATK buff multiplier
+            buff_stacks = min(len(atk_buffs), ATK_BUFF_MAX_STACKS)
+            atk_buff_multiplier = (
+                1.0 + (buff_stacks * ATK_BUFF_PERCENT) if has_e4 else 1.0
+            )
+
+            if skill_points > 0:
+                # Use Skill, gain ATK buff if E4
+                dmg = self.calculate_dmg(atk * atk_buff_multiplier, self.skill_mult)
+                skill_points -= 1
+                if has_e4 and len(atk_buffs) < ATK_BUFF_MAX_STACKS:
+                    atk_buffs += (ATK_BUFF_DURATION,)
+            else:
+                # Use Basic ATK, no buff gained
+                dmg = self.calculate_dmg(atk * atk_buff_multiplier, 1.0)
+                skill_points += 1
 
-                if skill_points > 0:
-                    # Use Skill, gain ATK buff if E4
-                    total_dmg += self.calculate_dmg(
-                        atk * atk_buff_multiplier, self.skill_mult
-                    )
-                    skill_points -= 1
-                    if has_e4 and len(atk_buffs) < ATK_BUFF_MAX_STACKS:
-                        atk_buffs.append(ATK_BUFF_DURATION)
-                else:
-                    # Use Basic ATK, no buff gained
-                    total_dmg += self.calculate_dmg(atk * atk_buff_multiplier, 1.0)
-                    skill_points += 1
+            # Decrement buff durations, dropping the ones that expire
+            atk_buffs = tuple(turns - 1 for turns in atk_buffs if turns > 1)
 
-                # Decrement buff durations
-                atk_buffs = [turns - 1 for turns in atk_buffs]
+            return (skill_points, atk_buffs), dmg
 
-            return total_dmg
+        return step
 
-        base_dmg = calculate_dmg(False)
-        e4_dmg = calculate_dmg(True)
+    def e4_transition_table(self) -> tuple[tuple[int, ...], tuple[float, ...]]:
+        """
+        One cycle of the E4 rotation from every possible state at once.
+
+        A state is whether Anaxa has E4, her skill points (0 to
+        MAX_SKILL_POINTS) and the StatusStacks code of her ATK buffs, numbered
+        as np.ravel_multi_index over e4_state_shape(). The table only depends
+        on constants, so it is built once per set of them.
+
+        Returns:
+            Next state and damage dealt from each state
+        """
+        return _e4_transition_table(
+            self.atk,
+            self.skill_mult,
+            self.E4_ATK_BUFF_PERCENT,
+            self.E4_ATK_BUFF_DURATION,
+            self.E4_ATK_BUFF_MAX_STACKS,
+            self.e4_state_shape(),
+        )
+
+    def e4_state_shape(self) -> tuple[int, int, int]:
+        """Sizes of the has_e4, skill point and ATK buff code parts of a state."""
+        buff_codes = (self.E4_ATK_BUFF_DURATION + 1) ** self.E4_ATK_BUFF_MAX_STACKS
+        return 2, self.MAX_SKILL_POINTS + 1, buff_codes
+
+    def simulate_e4_rotation_batch(
+        self,
+        has_e4: npt.ArrayLike,
+        total_cycles: int | None,
+        skill_points: npt.ArrayLike = BASE_SKILL_POINTS,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Damage of the E4 rotation for many setups.
+
+        Every state is stepped once, together, by e4_transition_table; each
+        setup then only follows integer table lookups to its repeating cycle,
+        so no buff tuples are built per cycle.
+
+        Args:
+            has_e4: Whether each setup has E4, shape (n,)
+            total_cycles: Cycles to simulate, or None for the long-run damage
+                per cycle
+            skill_points: Starting skill points, scalar or shape (n,), at most
+                MAX_SKILL_POINTS
+
+        Returns:
+            Damage of each setup, shape (n,)
+        """
+        has_e4 = np.atleast_1d(np.asarray(has_e4, dtype=np.bool_))
+        skill_points = np.asarray(skill_points, dtype=np.int64)
+        _, skill_point_states, buff_codes = self.e4_state_shape()
+        if ((skill_points < 0) | (skill_points >= skill_point_states)).any():
+            raise ValueError("skill_points must be between 0 and MAX_SKILL_POINTS")
+        # Setups start without buffs, buff code 0
+        initial_states = (has_e4 * skill_point_states + skill_points) * buff_codes
+
+        next_states, dmgs = self.e4_transition_table()
+
+        def step(state: int) -> tuple[int, float]:
+            return next_states[state], dmgs[state]
+
+        # Setups starting from the same state share one solve
+        dmg = {
+            state: solve_rotation(state, step, total_cycles)
+            for state in set(initial_states.tolist())
+        }
+        return np.array([dmg[state] for state in initial_states.tolist()])
+
+    def calculate_dmg_increased_from_e4(self) -> float:
+        base_dmg, e4_dmg = self.simulate_e4_rotation_batch(
+            [False, True], self.total_cycles
+        ).tolist()
         return self.calculate_percent_change(base_dmg, e4_dmg)
 
-    def calculate_dmg_increased_from_e6(self) -> float:
-        # Constants
-        TOTAL_CYCLES = 1000
-        BASE_SKILL_POINTS = 3
-        BASE_CRIT_RATE = 0.5
-        BASE_CRIT_DMG = 1.0
-        BASE_SKILL_DMG = 1000
-        BASE_BASIC_ATK_DMG = 500
-        E6_CRIT_DMG_BONUS = 1.4  # 140%
-        E6_ALLY_DMG_BONUS = 0.5  # 50%
-        ANAXA_DMG_MULT = 1.3
-
-        def calculate_dmg(erudition_char_count: int, has_e6: bool) -> float:
-            skill_points = BASE_SKILL_POINTS
-            total_dmg = 0
-            crit_rate = BASE_CRIT_RATE
-            crit_dmg = BASE_CRIT_DMG
-            skill_dmg = BASE_SKILL_DMG
-            basic_atk_dmg = BASE_BASIC_ATK_DMG
-
-            if has_e6:
-                # E6: Both effects are always active, regardless of team comp
-                crit_dmg += E6_CRIT_DMG_BONUS * 2
-                crit_rate = 1.0  # Double crit rate for comparison
-                skill_dmg *= (1 + E6_ALLY_DMG_BONUS) * (1 + ANAXA_DMG_MULT)
-                basic_atk_dmg *= (1 + E6_ALLY_DMG_BONUS) * (1 + ANAXA_DMG_MULT)
-            else:
-                # Pre-E6: Only one effect based on erudition_char_count
-                if erudition_char_count == 1:
-                    crit_dmg += E6_CRIT_DMG_BONUS * 2
-                    crit_rate = 1.0
-                    skill_dmg *= 1 + ANAXA_DMG_MULT
-                    basic_atk_dmg *= 1 + ANAXA_DMG_MULT
-                elif erudition_char_count >= 2:
-                    skill_dmg *= (1 + E6_ALLY_DMG_BONUS) * (1 + ANAXA_DMG_MULT)
-                    basic_atk_dmg *= (1 + E6_ALLY_DMG_BONUS) * (1 + ANAXA_DMG_MULT)
-
-            # Calculate average damage per hit (crit weighted)
-            avg_skill_dmg = skill_dmg * (1 + crit_rate * crit_dmg)
-            avg_basic_atk_dmg = basic_atk_dmg * (1 + crit_rate * crit_dmg)
-
-            for _ in range(TOTAL_CYCLES):
-                if skill_points > 0:
-                    total_dmg += avg_skill_dmg
-                    skill_points -= 1
-                else:
-                    total_dmg += avg_basic_atk_dmg
-                    skill_points += 1
+    def calculate_e4_rotation_dmg_per_cycle(
+        self,
+        has_e4: bool,
+        ally_skill_point_chance: float = 0.0,
+        crit_rate: float = 0.0,
+        crit_dmg: float = 0.0,
+    ) -> float:
+        """
+        Long-run expected damage per cycle of the E4 rotation with randomness.
+
+        After each of Anaxa's actions an ally generates a skill point with the
+        given chance, up to MAX_SKILL_POINTS, and every hit crits
+        independently. The rotation is solved as a Markov chain, so this costs
+        one small linear solve rather than simulating many turns.
+
+        Args:
+            has_e4: Whether Anaxa has E4
+            ally_skill_point_chance: Chance per cycle that an ally adds a
+                skill point
+            crit_rate: Chance that a hit crits
+            crit_dmg: Extra damage of a crit, as a multiplier of the hit
+
+        Returns:
+            Expected damage per cycle
+        """
+        step = self.e4_rotation_step(has_e4)
+
+        def outcomes(
+            state: tuple[int, tuple[int, ...]],
+        ) -> list[Outcome[tuple[int, tuple[int, ...]]]]:
+            (skill_points, atk_buffs), dmg = step(state)
+            ally_skill_points = min(skill_points + 1, self.MAX_SKILL_POINTS)
+            return [
+                (1 - ally_skill_point_chance, (skill_points, atk_buffs), dmg),
+                (ally_skill_point_chance, (ally_skill_points, atk_buffs), dmg),
+            ]
+
+        initial_state: tuple[int, tuple[int, ...]] = (self.BASE_SKILL_POINTS, ())
+        return solve_markov_rotation(
+            initial_state, with_crit(outcomes, crit_rate, crit_dmg)
+        )
+
+    def calculate_dmg_increased_from_e4_stochastic(
+        self,
+        ally_skill_point_chance: float = 0.0,
+        crit_rate: float = 0.0,
+        crit_dmg: float = 0.0,
+    ) -> float:
+        """Long-run damage increase from E4 when allies generate skill points."""
+        base_dmg = self.calculate_e4_rotation_dmg_per_cycle(
+            False, ally_skill_point_chance, crit_rate, crit_dmg
+        )
+        e4_dmg = self.calculate_e4_rotation_dmg_per_cycle(
+            True, ally_skill_point_chance, crit_rate, crit_dmg
+        )
+        return self.calculate_percent_change(base_dmg, e4_dmg)
+
+    def calculate_e6_rotation_dmg(
+        self, erudition_char_count: int, has_e6: bool
+    ) -> float:
+        """
+        Damage of the E6 rotation for a team with erudition_char_count
+        Erudition characters, counting Anaxa.
+        """
+        crit_rate, crit_dmg, dmg_mult = self.get_e6_stats(has_e6, erudition_char_count)
+        skill_dmg = self.E6_BASE_SKILL_DMG * dmg_mult
+        basic_atk_dmg = self.E6_BASE_BASIC_ATK_DMG * dmg_mult
+
+        # Calculate average damage per hit (crit weighted)
+        avg_skill_dmg = skill_dmg * (1 + crit_rate * crit_dmg)
+        avg_basic_atk_dmg = basic_atk_dmg * (1 + crit_rate * crit_dmg)
 
-            return total_dmg
+        def step(skill_points: int) -> tuple[int, float]:
+            if skill_points > 0:
+                return skill_points - 1, avg_skill_dmg
+            return skill_points + 1, avg_basic_atk_dmg
+
+        return solve_rotation(self.BASE_SKILL_POINTS, step, self.total_cycles)
+
+    def calculate_dmg_increased_from_e6(self) -> float:
+        calculate_dmg = self.calculate_e6_rotation_dmg
 
         # Scenario 1: 1 Erudition character, no E6
         base_dmg_1 = calculate_dmg(erudition_char_count=1, has_e6=False)
@@ -254,43 +516,217 @@ class Anaxa(Character):
         # Percent change from average base to E6
         return self.calculate_percent_change(base_dmg_avg, e6_dmg)
 
+    def lc_rotation_step(self, has_lc: bool) -> RotationStep[int]:
+        """One turn of the light cone rotation; the state is Anaxa's energy."""
+        ult_energy = self.ult_energy
+        energy_gain = 30
+
+        skill_dmg = 1000
+        ult_dmg = 1000
+
+        if has_lc:
+            lc_enery_gain = 10
+            increased_dmg_mult = 0.6
+            def_reduce_mult = 0.12
+        else:
+            lc_enery_gain = 0
+            increased_dmg_mult = 0.0
+            def_reduce_mult = 0.0
+
+        def step(current_energy: int) -> tuple[int, float]:
+            dmg = 0.0
+
+            # LC regenerates energy at the start of each turn
+            current_energy += lc_enery_gain
+            if current_energy >= ult_energy:
+                dmg += ult_dmg
+                current_energy = 0
+
+            dmg += skill_dmg * (1 + def_reduce_mult) * (1 + increased_dmg_mult)
+            current_energy += energy_gain
+            if current_energy >= ult_energy:
+                dmg += ult_dmg
+                current_energy = 0
+
+            return current_energy, dmg
+
+        return step
+
+    def iter_lc_rotation(
+        self, has_lc: bool, speed: float, total_action_value: float
+    ) -> Iterator[tuple[TurnRecord, float]]:
+        """
+        Run the light cone rotation on the action-value timeline.
+
+        Args:
+            has_lc: Whether Anaxa wears the light cone
+            speed: Anaxa's speed
+            total_action_value: Action value span to simulate
+
+        Yields:
+            Each of Anaxa's turns with the damage dealt on it
+        """
+        step = self.lc_rotation_step(has_lc)
+        energy = 0
+        dmg = 0.0
+
+        def on_turn(timeline: Timeline, actor: TimelineActor) -> None:
+            nonlocal energy, dmg
+            energy, dmg = step(energy)
+
+        timeline = Timeline()
+        timeline.add_actor(TimelineActor(self.__class__.__name__, speed, on_turn))
+        for turn in timeline.iter_turns(total_action_value):
+            yield turn, dmg
+
     def calculate_dmg_increased_from_lc(self) -> float:
-        def calculate_dmg(has_lc: bool) -> float:
-            total_cycles = 1000
-            total_dmg = 0
-            ult_energy = self.ult_energy
-            current_energy = 0
-            energy_gain = 30
+        if self.total_cycles is None:
+            # Speed only sets how many turns fit in the horizon, so the
+            # long-run damage per turn gives the same percent change
+            base_dmg = solve_rotation(0, self.lc_rotation_step(False))
+            lc_dmg = solve_rotation(0, self.lc_rotation_step(True))
+        else:
+            total_action_value = cycles_action_value(self.total_cycles)
+            base_dmg = sum(
+                dmg
+                for _, dmg in self.iter_lc_rotation(
+                    False, self.speed, total_action_value
+                )
+            )
+            lc_dmg = sum(
+                dmg
+                for _, dmg in self.iter_lc_rotation(
+                    True, self.speed, total_action_value
+                )
+            )
 
-            skill_dmg = 1000
-            ult_dmg = 1000
+        return self.calculate_percent_change(base_dmg, lc_dmg)
 
-            if has_lc:
-                lc_enery_gain = 10
-                increased_dmg_mult = 0.6
-                def_reduce_mult = 0.12
-            else:
-                lc_enery_gain = 0
-                increased_dmg_mult = 0.0
-                def_reduce_mult = 0.0
-
-            for _ in range(total_cycles):
-                ult_energy += lc_enery_gain
-                if current_energy >= ult_energy:
-                    total_dmg += ult_dmg
-                    current_energy = 0
-
-                total_dmg += (
-                    skill_dmg * (1 + def_reduce_mult) * (1 + increased_dmg_mult)
+    def get_e6_stats(
+        self, has_e6: bool, erudition_char_count: int
+    ) -> tuple[float, float, float]:
+        """
+        Crit and damage bonuses of the E6 simulation for a team setup.
+
+        E6 turns on both the crit effect and the ally damage effect. Before
+        E6 only one applies: the crit effect when Anaxa is the only Erudition
+        character, the ally damage effect when there are more.
+
+        Returns:
+            Tuple of (crit rate, crit DMG, damage multiplier)
+        """
+        crit_effect = has_e6 or erudition_char_count == 1
+        ally_effect = has_e6 or erudition_char_count >= 2
+
+        crit_rate, crit_dmg = self.BASE_CRIT_RATE, self.BASE_CRIT_DMG
+        if crit_effect:
+            # Double crit rate for comparison
+            crit_rate, crit_dmg = 1.0, crit_dmg + self.E6_CRIT_DMG_BONUS * 2
+
+        dmg_mult = 1.0
+        if ally_effect:
+            dmg_mult = (1 + self.E6_ALLY_DMG_BONUS) * (1 + self.E6_ANAXA_DMG_MULT)
+        elif crit_effect:
+            dmg_mult = 1 + self.E6_ANAXA_DMG_MULT
+        return crit_rate, crit_dmg, dmg_mult
+
+    def get_crit_stats(
+        self, has_e6: bool, erudition_char_count: int
+    ) -> tuple[float, float]:
+        """
+        Crit rate and crit DMG used by the E6 simulation for a team setup.
+
+        Returns:
+            Tuple of (crit rate, crit DMG)
+        """
+        crit_rate, crit_dmg, _ = self.get_e6_stats(has_e6, erudition_char_count)
+        return crit_rate, crit_dmg
+
+    def simulate_crit_distributions(
+        self,
+        actions: int = 100,
+        erudition_char_count: int = 2,
+        seed: int = 0,
+        threshold: float | None = None,
+        max_workers: int | None = None,
+        **monte_carlo_kwargs: Any,
+    ) -> dict[str, list[str | float]]:
+        """
+        Monte Carlo damage distributions for every eidolon/light cone combination.
+
+        calculate_final_dmg gives the crit-weighted expected damage per action;
+        here each of the actions rolls crit independently, so the summaries
+        describe the spread around that expectation.
+
+        Args:
+            actions: Actions per simulated fight
+            erudition_char_count: Erudition characters on the team, which sets
+                both the damage per action and the pre-E6 crit stats
+            seed: Root seed; each combination gets its own spawned stream
+            threshold: Total damage to report the probability of exceeding
+            max_workers: Worker processes to use; 1 runs in-process, None uses
+                one worker per CPU
+            **monte_carlo_kwargs: Passed to run_monte_carlo, e.g. rel_ci_width
+
+        Returns:
+            One row per combination with its flags and distribution summary
+        """
+        combinations = list(
+            itertools.product((False, True), repeat=len(self.FLAG_NAMES))
+        )
+        seeds = np.random.SeedSequence(seed).spawn(len(combinations))
+
+        data_dict: dict[str, list[str | float]] = {
+            **{name: [] for name in self.FLAG_NAMES},
+            "trials": [],
+            "mean_dmg": [],
+            "std_dmg": [],
+            "ci_low": [],
+            "ci_high": [],
+            **{f"p{q}_dmg": [] for q in PERCENTILES},
+            "prob_above_threshold": [],
+        }
+
+        executor = (
+            ProcessPoolExecutor(max_workers=max_workers) if max_workers != 1 else None
+        )
+        workers = max_workers or os.cpu_count() or 1
+        try:
+            for flags, combination_seed in zip(combinations, seeds, strict=True):
+                dmg_per_action = float(
+                    self.calculate_final_dmg_array(
+                        *flags, erudition_char_count=erudition_char_count
+                    )
+                )
+                crit_rate, crit_dmg = self.get_crit_stats(
+                    has_e6=flags[5], erudition_char_count=erudition_char_count
                 )
-                current_energy += energy_gain
-                if current_energy >= ult_energy:
-                    total_dmg += ult_dmg
-                    current_energy = 0
 
-            return total_dmg
+                summary = run_monte_carlo(
+                    CritDamageSampler(dmg_per_action, crit_rate, crit_dmg, actions),
+                    seed=combination_seed,
+                    threshold=threshold,
+                    executor=executor,
+                    workers=workers,
+                    **monte_carlo_kwargs,
+                )
 
-        base_dmg = calculate_dmg(False)
-        lc_dmg = calculate_dmg(True)
+                for name, flag in zip(self.FLAG_NAMES, flags, strict=True):
+                    data_dict[name].append(flag)
+                data_dict["trials"].append(summary.trials)
+                data_dict["mean_dmg"].append(summary.mean)
+                data_dict["std_dmg"].append(summary.std)
+                data_dict["ci_low"].append(summary.ci_low)
+                data_dict["ci_high"].append(summary.ci_high)
+                for q, value in summary.percentiles.items():
+                    data_dict[f"p{q}_dmg"].append(value)
+                data_dict["prob_above_threshold"].append(
+                    summary.prob_above_threshold
+                    if summary.prob_above_threshold is not None
+                    else float("nan")
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-        return self.calculate_percent_change(base_dmg, lc_dmg)
+        return data_dict
@@ -1,15 +1,37 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations import relics
 from simulations.characters.base_character import Character
+from simulations.sweep import cartesian_grid, value_range
 
 
 class RuanMei(Character):
     START_BREAK_EFFECT: float = 1.0
     END_BREAK_EFFECT: float = 2.0
+    BREAK_EFFECT_STEP: float = 0.01
     BASE_SKILL_DMG_MULT: float = 0.32
     A6_BREAK_EFFECT_THRESHOLD: float = 1.2  # 120%
     A6_DMG_PER_10_PERCENT: float = 0.06  # 6% per 10% break effect
     A6_MAX_ADDITIONAL_DMG: float = 0.36  # 36% maximum
-
-    def __init__(self):
+    BASE_SPEED: float = 104
+    TRACE_BREAK_EFFECT: float = 0.373
+    FEET_RELICS_SPEED: float = 25.032
+    # Thief of Shooting Meteor 4-piece, or its 2-piece with Messenger 2-piece
+    THIEF_4PC_BREAK_EFFECT: float = 0.32
+    THIEF_2PC_BREAK_EFFECT: float = 0.16
+    MESSENGER_2PC_SPEED_MULT: float = 0.06
+    # Talia: Kingdom of Banditry, with more break effect at high speed
+    TALIA_BREAK_EFFECT: float = 0.16
+    TALIA_SPEED_THRESHOLD: float = 145
+    TALIA_SPEED_BREAK_EFFECT: float = 0.20
+    BUILD_OBJECTIVES = ("additional_dmg_from_a6", "speed", "energy_regen_rate")
+    LOD_X_COLUMN = "break_effect"
+
+    def __init__(self) -> None:
         super().__init__()
         self.ruan_mei_ult_energy: int = 130
 
@@ -36,6 +58,69 @@ class RuanMei(Character):
 
         return min(self.A6_MAX_ADDITIONAL_DMG, additional_dmg)
 
+    def calculate_additional_skill_dmg_by_break_effect_array(
+        self, break_effect: npt.ArrayLike
+    ) -> npt.NDArray[np.float64]:
+        """
+        Vectorized calculate_additional_skill_dmg_by_break_effect.
+
+        Args:
+            break_effect: Break effect values as decimals (1.0 = 100%)
+
+        Returns:
+            Additional damage multiplier from A6 trace for each value
+        """
+        break_effect = np.asarray(break_effect, dtype=np.float64)
+        excess_break_effect = break_effect - self.A6_BREAK_EFFECT_THRESHOLD
+        additional_dmg = np.minimum(
+            self.A6_MAX_ADDITIONAL_DMG,
+            (excess_break_effect / 0.1) * self.A6_DMG_PER_10_PERCENT,
+        )
+        return np.where(
+            break_effect <= self.A6_BREAK_EFFECT_THRESHOLD, 0.0, additional_dmg
+        )
+
+    def sweep_skill_dmg(
+        self,
+        break_effect: npt.ArrayLike,
+        base_skill_dmg_increase: npt.ArrayLike = BASE_SKILL_DMG_MULT,
+        team_dmg_buff: npt.ArrayLike = 0.0,
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Evaluate skill damage increase over a grid of parameters.
+
+        Every argument is a scalar or 1-D array of values; the result covers
+        the Cartesian product of all of them.
+
+        Args:
+            break_effect: Break effect values as decimals (1.0 = 100%)
+            base_skill_dmg_increase: Skill DMG increase before A6 (e.g. by
+                skill level)
+            team_dmg_buff: Other DMG% buffs on the team, added to the total
+
+        Returns:
+            Column name to flat array, one entry per grid point
+        """
+        grid = cartesian_grid(
+            break_effect=break_effect,
+            base_skill_dmg_increase=base_skill_dmg_increase,
+            team_dmg_buff=team_dmg_buff,
+        )
+        additional_a6_dmg = self.calculate_additional_skill_dmg_by_break_effect_array(
+            grid["break_effect"]
+        )
+
+        return {
+            "break_effect": grid["break_effect"],
+            "break_effect_percentage": grid["break_effect"] * 100,
+            "base_skill_dmg_increase": grid["base_skill_dmg_increase"],
+            "team_dmg_buff": grid["team_dmg_buff"],
+            "additional_dmg_from_a6": additional_a6_dmg,
+            "total_skill_dmg_increase": grid["base_skill_dmg_increase"]
+            + additional_a6_dmg
+            + grid["team_dmg_buff"],
+        }
+
     def calculate_skill_dmg_over_break_effect_range(
         self,
     ) -> dict[str, list[str | float]]:
@@ -45,38 +130,120 @@ class RuanMei(Character):
         Returns:
             Dictionary with break effect values and corresponding damage increases
         """
-        data_dict: dict[str, list[str | float]] = {
-            "character": [],
-            "break_effect": [],
-            "break_effect_percentage": [],
-            "base_skill_dmg_increase": [],
-            "additional_dmg_from_a6": [],
-            "total_skill_dmg_increase": [],
-        }
+        return self.sweep_data()
 
-        # Generate data points from 100% to 300% break effect
-        current_break_effect = self.START_BREAK_EFFECT
-        while current_break_effect <= self.END_BREAK_EFFECT:
-            # Calculate damage components
-            base_dmg = self.BASE_SKILL_DMG_MULT
-            additional_a6_dmg = self.calculate_additional_skill_dmg_by_break_effect(
-                current_break_effect
+    def sweep_axes(self) -> dict[str, npt.ArrayLike]:
+        return {
+            "break_effect": value_range(
+                self.START_BREAK_EFFECT, self.END_BREAK_EFFECT, self.BREAK_EFFECT_STEP
             )
-            total_dmg = base_dmg + additional_a6_dmg
+        }
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        sweep = self.sweep_skill_dmg(params["break_effect"])
+        return {
+            "break_effect_percentage": sweep["break_effect_percentage"],
+            "additional_dmg_from_a6": sweep["additional_dmg_from_a6"],
+            "total_skill_dmg_increase": sweep["total_skill_dmg_increase"],
+        }
 
-            # Store data
-            data_dict["character"].append(self.__class__.__name__)
-            data_dict["break_effect"].append(current_break_effect)
-            data_dict["break_effect_percentage"].append(current_break_effect * 100)
-            data_dict["base_skill_dmg_increase"].append(base_dmg)
-            data_dict["additional_dmg_from_a6"].append(additional_a6_dmg)
-            data_dict["total_skill_dmg_increase"].append(total_dmg)
+    def build_axes(self) -> dict[str, npt.ArrayLike]:
+        return {
+            "rope_break_effect": np.array([False, True]),
+            "feet_speed": np.array([False, True]),
+            "messenger_relic_set": np.array([False, True]),
+            "talia_planetary_set": np.array([False, True]),
+            "break_effect_rolls": relics.substat_roll_axis(),
+            "speed_rolls": relics.substat_roll_axis(),
+        }
 
-            # Increment by 1% (0.01)
-            current_break_effect = round(current_break_effect + 0.01, 2)
+    def score_builds(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Score builds on A6 skill DMG, speed and energy regeneration rate.
 
-        return data_dict
+        The link rope rolls either break effect or energy regeneration rate.
+        Break effect beyond the A6 cap is wasted, so the front shows where
+        speed or energy regeneration start to cost A6 damage. Builds whose
+        substat rolls no set of relics can hold are infeasible.
+        """
+        rope_break_effect = params["rope_break_effect"]
+        feet_speed = params["feet_speed"]
+        messenger_relic_set = params["messenger_relic_set"]
+        talia_planetary_set = params["talia_planetary_set"]
+        break_effect_rolls = params["break_effect_rolls"]
+        speed_rolls = params["speed_rolls"]
+
+        speed = (
+            self.BASE_SPEED * (1 + messenger_relic_set * self.MESSENGER_2PC_SPEED_MULT)
+            + feet_speed * self.FEET_RELICS_SPEED
+            + speed_rolls * relics.SPD_SUBSTAT_ROLL
+        )
+        break_effect = (
+            self.TRACE_BREAK_EFFECT
+            + rope_break_effect * relics.BREAK_EFFECT_MAIN_STAT
+            + np.where(
+                messenger_relic_set,
+                self.THIEF_2PC_BREAK_EFFECT,
+                self.THIEF_4PC_BREAK_EFFECT,
+            )
+            + talia_planetary_set
+            * (
+                self.TALIA_BREAK_EFFECT
+                + np.where(
+                    speed >= self.TALIA_SPEED_THRESHOLD,
+                    self.TALIA_SPEED_BREAK_EFFECT,
+                    0.0,
+                )
+            )
+            + break_effect_rolls * relics.BREAK_EFFECT_SUBSTAT_ROLL
+        )
+
+        # Which of break effect and SPD each piece can roll as a substat
+        feasible = relics.substat_rolls_feasible(
+            (break_effect_rolls, speed_rolls),
+            (
+                # Head, hands, body and planar sphere
+                (True, True),
+                (True, True),
+                (True, True),
+                (True, True),
+                # Feet roll SPD or another stat, link rope break effect or ERR
+                (True, ~feet_speed),
+                (~rope_break_effect, True),
+            ),
+        )
+        return {
+            "additional_dmg_from_a6": np.where(
+                feasible,
+                self.calculate_additional_skill_dmg_by_break_effect_array(break_effect),
+                np.nan,
+            ),
+            "speed": np.where(feasible, speed, np.nan),
+            "energy_regen_rate": np.where(
+                feasible,
+                ~rope_break_effect * relics.ENERGY_REGEN_RATE_MAIN_STAT,
+                np.nan,
+            ),
+        }
 
     def output_data(self) -> dict[str, list[str | float]]:
         """Main output method for data visualization."""
         return self.calculate_skill_dmg_over_break_effect_range()
+
+    def lod_breakpoints(self, cache_dir: Path | None = None) -> list[float]:
+        # A6 starts at its threshold and stops growing at its cap
+        a6_cap_break_effect = (
+            self.A6_BREAK_EFFECT_THRESHOLD
+            + self.A6_MAX_ADDITIONAL_DMG / self.A6_DMG_PER_10_PERCENT * 0.1
+        )
+        return [self.A6_BREAK_EFFECT_THRESHOLD, round(a6_cap_break_effect, 10)]
+
+    def output_metadata(self) -> dict[str, str | float]:
+        return {
+            **super().output_metadata(),
+            "base_skill_dmg_increase": self.BASE_SKILL_DMG_MULT,
+        }
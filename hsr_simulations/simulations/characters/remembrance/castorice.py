@@ -1,4 +1,16 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.build_cache import compute_character_hash
 from simulations.characters.base_character import Character
+from simulations.inverse_index import (
+    ThresholdIndex,
+    build_threshold_index,
+    load_or_build_threshold_index,
+)
 
 
 class Castorice(Character):
@@ -16,13 +28,79 @@ class Castorice(Character):
     MIN_COMBINED_ALLIES_HP = 15000  # Updated to match actual data range
     MAX_COMBINED_ALLIES_HP = 33000  # Updated to match actual data range
     CASTORICE_BASE_HP = 9000
+    COMBINED_ALLIES_HP_STEP = 1000
     GALLAGHER_HEAL_AMOUNT = 1600
     SKILL_HP_CONSUMPTION_RATE = 0.30  # 30% of current HP consumed per skill
+    MAX_SKILL_COUNT = 50  # Safety limit on skills simulated per configuration
+    # Combined HP range covered by the inverse-query index
+    INDEX_MIN_COMBINED_ALLIES_HP = CASTORICE_BASE_HP
+    INDEX_MAX_COMBINED_ALLIES_HP = 100000
+    LOD_X_COLUMN = "combined_allies_hp"
 
     def __init__(self) -> None:
         super().__init__()
         self.current_combined_allies_hp = 0.0
 
+    def simulate_newbud_batch(
+        self,
+        ally_hps: npt.ArrayLike,
+        heal_amount: npt.ArrayLike = GALLAGHER_HEAL_AMOUNT,
+        castorice_hp: float = CASTORICE_BASE_HP,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        Simulate many team configurations in lock-step until ultimate is ready.
+
+        Every configuration follows the same rotation: Castorice's skill
+        consumes 30% of each team member's current HP as Newbud energy, then
+        Gallagher heals the next member (Castorice, ally 1, ally 2, ally 3, ...).
+        Configurations that reach NEWBUD_REQUIRED are masked out while the rest
+        keep advancing, up to MAX_SKILL_COUNT + 1 skills.
+
+        Args:
+            ally_hps: HP of the three allies, shape (n, 3); splits may be unequal
+            heal_amount: Gallagher's heal per action, scalar or shape (n,)
+            castorice_hp: Castorice's starting HP
+
+        Returns:
+            Skill count and heal count before getting ultimate, each shape (n,)
+        """
+        allies = np.asarray(ally_hps, dtype=np.float64)
+        n = allies.shape[0]
+        heals = np.broadcast_to(np.asarray(heal_amount, dtype=np.float64), (n,))
+
+        team = np.empty((n, 4), dtype=np.float64)
+        team[:, 0] = castorice_hp
+        team[:, 1:] = allies
+
+        newbud = np.zeros(n, dtype=np.float64)
+        skill_counts = np.zeros(n, dtype=np.int64)
+        heal_counts = np.zeros(n, dtype=np.int64)
+        active = np.arange(n)
+
+        for step in range(self.MAX_SKILL_COUNT + 1):
+            if active.size == 0:
+                break
+
+            # Castorice uses skill: consume 30% of each member's current HP,
+            # summed in team order to match the scalar simulation exactly
+            active_team = team[active]
+            hp_consumed = active_team * self.SKILL_HP_CONSUMPTION_RATE
+            team[active] = active_team - hp_consumed
+            newbud[active] += (
+                hp_consumed[:, 0]
+                + hp_consumed[:, 1]
+                + hp_consumed[:, 2]
+                + hp_consumed[:, 3]
+            )
+            skill_counts[active] += 1
+
+            # Configurations with ultimate ready stop; the rest get healed
+            active = active[newbud[active] < self.NEWBUD_REQUIRED]
+            team[active, step % 4] += heals[active]
+            heal_counts[active] += 1
+
+        return skill_counts, heal_counts
+
     def calculate_allies_hp_vs_newbud(self) -> dict[str, list[str | float]]:
         """
         Calculate the relationship between team HP and actions needed for ultimate.
@@ -34,68 +112,137 @@ class Castorice(Character):
         4. Gallagher heals one ally rotationally for 1,600 HP
         5. Repeat until 34,000 Newbud energy is reached
         """
-        data_dict: dict[str, list[str | float]] = {
-            "character": [],
-            "combined_allies_hp": [],
-            "skill_count_before_getting_ult": [],
-            "heal_count_before_getting_ult": [],
+        return self.sweep_data()
+
+    def sweep_axes(self) -> dict[str, npt.ArrayLike]:
+        return {
+            "combined_allies_hp": np.arange(
+                self.MIN_COMBINED_ALLIES_HP,
+                self.MAX_COMBINED_ALLIES_HP + 1,
+                self.COMBINED_ALLIES_HP_STEP,
+            )
+        }
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        skill_counts, heal_counts = self.simulate_combined_hp_batch(
+            params["combined_allies_hp"]
+        )
+        return {
+            "skill_count_before_getting_ult": skill_counts,
+            "heal_count_before_getting_ult": heal_counts,
         }
 
-        # Test different team HP configurations
-        for base_combined_hp in range(
-            self.MIN_COMBINED_ALLIES_HP, self.MAX_COMBINED_ALLIES_HP + 1, 1000
-        ):
-            current_newbud = 0.0
-            skill_counter = 0
-            heal_counter = 0
-
-            # Initialize team HP (3 equal allies + Castorice)
-            ally_hp = (base_combined_hp - self.CASTORICE_BASE_HP) / 3
-            team = {
-                "castorice": float(self.CASTORICE_BASE_HP),
-                "ally1": ally_hp,
-                "ally2": ally_hp,
-                "ally3": ally_hp,
-            }
-
-            # Gallagher heals rotationally
-            heal_rotation = ["castorice", "ally1", "ally2", "ally3"]
-            heal_index = 0
-
-            # Simulate until ultimate is ready
-            while current_newbud < self.NEWBUD_REQUIRED:
-                # Castorice uses skill: consume 30% of each ally's current HP
-                hp_consumed_total = 0.0
-                for ally in team:
-                    hp_consumed = team[ally] * self.SKILL_HP_CONSUMPTION_RATE
-                    hp_consumed_total += hp_consumed
-                    team[ally] -= hp_consumed  # Ally loses 30% of current HP
-
-                # HP consumed becomes Newbud energy
-                current_newbud += hp_consumed_total
-                skill_counter += 1
-
-                # Check if ultimate is ready
-                if current_newbud >= self.NEWBUD_REQUIRED:
-                    break
-
-                # Gallagher heals next ally in rotation
-                target_ally = heal_rotation[heal_index]
-                team[target_ally] += self.GALLAGHER_HEAL_AMOUNT
-                heal_counter += 1
-                heal_index = (heal_index + 1) % len(heal_rotation)
-
-                # Safety check to prevent infinite loops
-                if skill_counter > 50:  # Reasonable upper limit
-                    break
-
-            # Store results
-            data_dict["character"].append(self.__class__.__name__)
-            data_dict["combined_allies_hp"].append(base_combined_hp)
-            data_dict["skill_count_before_getting_ult"].append(skill_counter)
-            data_dict["heal_count_before_getting_ult"].append(heal_counter)
-
-        return data_dict
+    def simulate_combined_hp_batch(
+        self,
+        combined_allies_hp: npt.ArrayLike,
+        heal_amount: npt.ArrayLike = GALLAGHER_HEAL_AMOUNT,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Simulate teams whose combined HP is split equally among 3 allies."""
+        # Initialize team HP (3 equal allies + Castorice)
+        ally_hp = (np.asarray(combined_allies_hp) - self.CASTORICE_BASE_HP) / 3
+        return self.simulate_newbud_batch(
+            np.repeat(ally_hp[:, np.newaxis], 3, axis=1), heal_amount
+        )
+
+    def build_skill_count_index(
+        self,
+        column: str = "skill_count",
+        heal_amount: float = GALLAGHER_HEAL_AMOUNT,
+        resolution: float = 1.0,
+        cache_dir: Path | None = None,
+    ) -> ThresholdIndex:
+        """
+        Index the minimum combined allies' HP for each skill or heal count.
+
+        Skill and heal counts only fall as combined HP rises, so each count's
+        threshold is found by binary search over the HP grid instead of
+        simulating every HP value.
+
+        Args:
+            column: 'skill_count' or 'heal_count' before getting ultimate
+            heal_amount: Gallagher's heal per action
+            resolution: HP spacing of the thresholds
+            cache_dir: Directory to cache the index in, or None to not cache
+
+        Returns:
+            Threshold index over combined allies' HP
+        """
+        output = {"skill_count": 0, "heal_count": 1}[column]
+
+        def count(combined_allies_hp: npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
+            return self.simulate_combined_hp_batch(combined_allies_hp, heal_amount)[
+                output
+            ]
+
+        def build() -> ThresholdIndex:
+            return build_threshold_index(
+                count,
+                self.INDEX_MIN_COMBINED_ALLIES_HP,
+                self.INDEX_MAX_COMBINED_ALLIES_HP,
+                resolution,
+                max_value=self.MAX_SKILL_COUNT,
+            )
+
+        key = f"{compute_character_hash(self)}:{column}:{heal_amount}:{resolution}"
+        path = (
+            cache_dir / f"castorice_{column}_index.json"
+            if cache_dir is not None
+            else None
+        )
+        return load_or_build_threshold_index(path, key, build)
+
+    def min_combined_allies_hp(
+        self,
+        max_skill_count: int | None = None,
+        max_heal_count: int | None = None,
+        heal_amount: float = GALLAGHER_HEAL_AMOUNT,
+        resolution: float = 1.0,
+        cache_dir: Path | None = None,
+    ) -> float | None:
+        """
+        Minimum combined allies' HP to get ultimate within a skill/heal budget.
+
+        Args:
+            max_skill_count: Skills Castorice may use before getting ultimate
+            max_heal_count: Heals Gallagher may give before getting ultimate
+            heal_amount: Gallagher's heal per action
+            resolution: HP spacing of the answer
+            cache_dir: Directory to cache the indexes in, or None to not cache
+
+        Returns:
+            Minimum combined HP, or None if no HP up to
+            INDEX_MAX_COMBINED_ALLIES_HP is enough
+        """
+        limits = {"skill_count": max_skill_count, "heal_count": max_heal_count}
+        answer = float(self.INDEX_MIN_COMBINED_ALLIES_HP)
+        for column, limit in limits.items():
+            if limit is None:
+                continue
+            if limit > self.MAX_SKILL_COUNT:
+                raise ValueError(
+                    f"{column} limit must be at most MAX_SKILL_COUNT "
+                    f"({self.MAX_SKILL_COUNT})"
+                )
+            threshold = self.build_skill_count_index(
+                column, heal_amount, resolution, cache_dir
+            ).min_input(limit)
+            if threshold is None:
+                return None
+            answer = max(answer, threshold)
+        return answer
 
     def output_data(self) -> dict[str, list[str | float]]:
-        return self.calculate_allies_hp_vs_newbud()
\ No newline at end of file
+        return self.calculate_allies_hp_vs_newbud()
+
+    def lod_breakpoints(self, cache_dir: Path | None = None) -> list[float]:
+        # The skill and heal counts are step functions of combined HP
+        thresholds = {
+            threshold
+            for column in ("skill_count", "heal_count")
+            for threshold in self.build_skill_count_index(
+                column, cache_dir=cache_dir
+            ).thresholds.values()
+        }
+        return sorted(thresholds)
@@ -1,4 +1,12 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations import relics
 from simulations.characters.base_character import Character
+from simulations.timeline import Timeline, TimelineActor
 
 
 class Hyacine(Character):
@@ -10,6 +18,13 @@ class Hyacine(Character):
     RELICS_SPEED_MULT = 0.12
     PLANETARY_SPEED_MULT = 0.06
     FEET_RELICS_SPEED = 25.032
+    # HP% granted instead when a speed set is not used
+    HP_RELIC_SET_HP_PERCENT = 0.12
+    HP_PLANETARY_SET_HP_PERCENT = 0.12
+    # Planar sphere and link rope always roll HP% as main stat
+    FIXED_HP_PERCENT_MAIN_STAT_PIECES = 2
+    BUILD_OBJECTIVES = ("outgoing_healing", "hp_percent", "effect_res")
+    LOD_X_COLUMN = "speed"
 
     def __init__(self) -> None:
         self.speed = self.BASE_SPEED
@@ -33,41 +48,145 @@ class Hyacine(Character):
             + self.MINOR_TRACES_SPEED
         )
 
-    def calculate_increased_outgoing_healing_by_spd(
-        self,
-    ) -> dict[str, list[str | float]]:
-        data_dict: dict[str, list[str | float]] = {
-            "character": [],
-            "speed": [],
-            "increased_outgoing_healing": [],
-            "base_speed": [],
-            "speed_after_minor_traces": [],
-            "speed_after_relics_and_planetary_sets": [],
-            "speed_after_signature_lightcone": [],
+    def sweep_axes(self) -> dict[str, npt.ArrayLike]:
+        return {"speed": np.arange(self.speed, self.MAX_SPEED + 1)}
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        return {
+            "increased_outgoing_healing": self.calculate_increased_outgoing_healing(
+                params["speed"]
+            )
+        }
+
+    def calculate_increased_outgoing_healing(
+        self, speed: npt.ArrayLike
+    ) -> npt.NDArray[np.float64]:
+        """Outgoing healing gained from speed above the conditioned speed."""
+        speed = np.asarray(speed)
+        exceed_speed = speed - self.CONDITIONED_SPEED
+        return np.where(speed > self.CONDITIONED_SPEED, exceed_speed * 0.01, 0.0)
+
+    def build_axes(self) -> dict[str, npt.ArrayLike]:
+        return {
+            "body_outgoing_healing": np.array([False, True]),
+            "feet_speed": np.array([False, True]),
+            "speed_relic_set": np.array([False, True]),
+            "speed_planetary_set": np.array([False, True]),
+            "speed_rolls": relics.substat_roll_axis(),
+            "hp_rolls": relics.substat_roll_axis(),
+            "effect_res_rolls": relics.substat_roll_axis(),
         }
 
-        for speed in range(self.speed, self.MAX_SPEED + 1):
-            if speed > self.CONDITIONED_SPEED:
-                exceed_speed = speed - self.CONDITIONED_SPEED
-                increased_healing = exceed_speed * 0.01
-                data_dict["character"].append(self.__class__.__name__)
-                data_dict["speed"].append(speed)
-                data_dict["increased_outgoing_healing"].append(increased_healing)
-            else:
-                data_dict["character"].append(self.__class__.__name__)
-                data_dict["speed"].append(speed)
-                data_dict["increased_outgoing_healing"].append(0.0)
-
-            data_dict["base_speed"].append(self.speed)
-            data_dict["speed_after_minor_traces"].append(self.speed_after_minor_traces)
-            data_dict["speed_after_signature_lightcone"].append(
-                self.speed_after_signature_lightcone
+    def score_builds(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Score builds on outgoing healing, HP% and effect RES.
+
+        Each main stat and set trades speed (and so outgoing healing above
+        200 SPD) against HP%, reported as the total HP% from relics and
+        sets. Builds whose substat rolls no set of relics can hold are
+        infeasible.
+        """
+        body_heal = params["body_outgoing_healing"]
+        feet_speed = params["feet_speed"]
+        speed_relic_set = params["speed_relic_set"]
+        speed_planetary_set = params["speed_planetary_set"]
+        speed_rolls = params["speed_rolls"]
+        hp_rolls = params["hp_rolls"]
+        effect_res_rolls = params["effect_res_rolls"]
+
+        speed = (
+            self.speed
+            * (
+                1
+                + speed_relic_set * self.RELICS_SPEED_MULT
+                + speed_planetary_set * self.PLANETARY_SPEED_MULT
             )
-            data_dict["speed_after_relics_and_planetary_sets"].append(
-                self.speed_after_relics_and_planetary_sets
+            + feet_speed * self.FEET_RELICS_SPEED
+            + self.MINOR_TRACES_SPEED
+            + speed_rolls * relics.SPD_SUBSTAT_ROLL
+        )
+        outgoing_healing = body_heal * relics.OUTGOING_HEALING_MAIN_STAT + (
+            self.calculate_increased_outgoing_healing(speed)
+        )
+        hp_main_stat_pieces = (
+            self.FIXED_HP_PERCENT_MAIN_STAT_PIECES
+            + (~body_heal).astype(np.int64)
+            + (~feet_speed).astype(np.int64)
+        )
+        hp_percent = (
+            hp_main_stat_pieces * relics.HP_PERCENT_MAIN_STAT
+            + ~speed_relic_set * self.HP_RELIC_SET_HP_PERCENT
+            + ~speed_planetary_set * self.HP_PLANETARY_SET_HP_PERCENT
+            + hp_rolls * relics.HP_PERCENT_SUBSTAT_ROLL
+        )
+        effect_res = effect_res_rolls * relics.EFFECT_RES_SUBSTAT_ROLL
+
+        # Which of SPD, HP% and effect RES each piece can roll as a substat
+        feasible = relics.substat_rolls_feasible(
+            (speed_rolls, hp_rolls, effect_res_rolls),
+            (
+                # Head and hands have flat HP and ATK main stats
+                (True, True, True),
+                (True, True, True),
+                # Body rolls outgoing healing or HP%, feet SPD or HP%
+                (True, body_heal, True),
+                (~feet_speed, feet_speed, True),
+                # Planar sphere and link rope
+                (True, False, True),
+                (True, False, True),
+            ),
+        )
+        return {
+            name: np.where(feasible, objective, np.nan)
+            for name, objective in (
+                ("outgoing_healing", outgoing_healing),
+                ("hp_percent", hp_percent),
+                ("effect_res", effect_res),
             )
+        }
+
+    def calculate_increased_outgoing_healing_by_spd(
+        self,
+    ) -> dict[str, list[str | float]]:
+        return self.sweep_data()
+
+    def calculate_turns_in_action_value(
+        self, speed: float, total_action_value: float
+    ) -> int:
+        """
+        Count Hyacine's turns within a span of action value at a given speed.
+
+        Args:
+            speed: Hyacine's speed
+            total_action_value: Action value span, e.g. 150 for the first cycle
 
-        return data_dict
+        Returns:
+            Number of turns taken
+        """
+        timeline = Timeline()
+        hyacine = TimelineActor(self.__class__.__name__, speed)
+        timeline.add_actor(hyacine)
+        timeline.run(total_action_value)
+        return hyacine.turns_taken
 
     def output_data(self) -> dict[str, list[str | float]]:
         return self.calculate_increased_outgoing_healing_by_spd()
+
+    def lod_breakpoints(self, cache_dir: Path | None = None) -> list[float]:
+        # Outgoing healing only starts growing past the conditioned speed
+        return [self.CONDITIONED_SPEED]
+
+    def output_metadata(self) -> dict[str, str | float]:
+        return {
+            **super().output_metadata(),
+            "base_speed": self.speed,
+            "speed_after_minor_traces": self.speed_after_minor_traces,
+            "speed_after_relics_and_planetary_sets": (
+                self.speed_after_relics_and_planetary_sets
+            ),
+            "speed_after_signature_lightcone": self.speed_after_signature_lightcone,
+        }
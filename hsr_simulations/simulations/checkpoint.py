@@ -0,0 +1,172 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from simulations.characters.base_character import Character
+from simulations.data_transformer import write_bytes_atomic
+from simulations.output_backends import Columns
+from simulations.sweep import DEFAULT_CHUNK_SIZE
+
+
+class CheckpointJournal:
+    """
+    Completed batches of a character's sweep, kept so a killed run can resume.
+
+    The journal is a JSON lines file: a header identifying the sweep, then
+    one line per completed batch, in order, with its row count and the
+    SHA-256 of its saved columns. Each batch's columns are saved to their own
+    .npz file before the batch is journaled, so every journaled batch can be
+    reloaded as it was computed.
+
+    Args:
+        directory: Directory to keep the journal and batch files in, e.g. a
+            checkpoints directory in the build cache
+        character_name: File name prefix
+        key: Identifies everything the batches depend on, e.g. the
+            character's build hash; batches journaled under another key are
+            never reused
+        rows: Number of rows in the sweep
+    """
+
+    def __init__(
+        self, directory: Path, character_name: str, key: str, rows: int
+    ) -> None:
+        self.path = directory / f"{character_name}_checkpoint.jsonl"
+        self.chunk_dir = directory / f"{character_name}_checkpoint"
+        self.header = {"key": key, "rows": rows}
+        self.rows = rows
+        # Row count and digest of each journaled batch, in order
+        self.completed: list[tuple[int, str]] = []
+        self.resumed_rows = 0
+
+    def get_chunk_path(self, index: int) -> Path:
+        return self.chunk_dir / f"chunk_{index:06d}.npz"
+
+    def start(self, resume: bool = False) -> None:
+        """
+        Open the journal for a run.
+
+        Args:
+            resume: Keep the batches an earlier run of the same sweep
+                completed; otherwise any earlier journal is discarded
+        """
+        self.completed = self._read() if resume else []
+        if not self.completed:
+            self.clear()
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self._rewrite()
+
+    def truncate(self, count: int) -> None:
+        """Forget every journaled batch after the first count."""
+        self.completed = self.completed[:count]
+        self._rewrite()
+
+    def _rewrite(self) -> None:
+        # Rewrite rather than append, dropping any line a killed run left
+        # half written
+        lines = [self.header] + [
+            {"rows": rows, "sha256": digest} for rows, digest in self.completed
+        ]
+        write_bytes_atomic(
+            "".join(json.dumps(line) + "\n" for line in lines).encode(), self.path
+        )
+
+    def _read(self) -> list[tuple[int, str]]:
+        if not self.path.exists():
+            return []
+        header, *lines = self.path.read_text().splitlines() or [""]
+        try:
+            if json.loads(header) != self.header:
+                return []
+        except json.JSONDecodeError:
+            return []
+
+        completed = []
+        total_rows = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            total_rows += entry["rows"]
+            if total_rows > self.rows:
+                break
+            completed.append((entry["rows"], entry["sha256"]))
+        return completed
+
+    def record(self, columns: Columns) -> None:
+        """Save the next batch's columns, then journal the batch as completed."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            allow_pickle=False,
+            **{name: np.asarray(values) for name, values in columns.items()},
+        )
+        data = buffer.getvalue()
+        write_bytes_atomic(data, self.get_chunk_path(len(self.completed)))
+
+        rows = len(next(iter(columns.values()), []))
+        digest = hashlib.sha256(data).hexdigest()
+        with self.path.open("a") as journal:
+            journal.write(json.dumps({"rows": rows, "sha256": digest}) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.completed.append((rows, digest))
+
+    def load(self, index: int) -> Columns | None:
+        """Columns of a journaled batch, or None if it is missing or damaged."""
+        path = self.get_chunk_path(index)
+        if index >= len(self.completed) or not path.exists():
+            return None
+        data = path.read_bytes()
+        if hashlib.sha256(data).hexdigest() != self.completed[index][1]:
+            return None
+        with np.load(io.BytesIO(data), allow_pickle=False) as chunk:
+            return {name: chunk[name].tolist() for name in chunk.files}
+
+    def clear(self) -> None:
+        """Delete the journal and its batches, e.g. once the output is written."""
+        self.path.unlink(missing_ok=True)
+        shutil.rmtree(self.chunk_dir, ignore_errors=True)
+
+
+def iter_checkpointed_batches(
+    character: Character,
+    journal: CheckpointJournal,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = False,
+) -> Iterator[Columns]:
+    """
+    Stream a character's iter_batches, journaling every batch.
+
+    A resumed run reloads the batches the journal holds, up to the first
+    missing or damaged one, then continues iter_batches from the row after
+    them.
+
+    Args:
+        character: Character declaring sweep_axes
+        journal: Journal of this sweep
+        batch_size: Maximum number of rows per batch
+        resume: Reuse the batches an earlier run journaled
+
+    Yields:
+        Column name to list of values for each batch, in row order
+    """
+    journal.start(resume)
+    for index in range(len(journal.completed)):
+        batch = journal.load(index)
+        if batch is None:
+            journal.truncate(index)
+            break
+        journal.resumed_rows += journal.completed[index][0]
+        yield batch
+
+    for batch in character.iter_batches(batch_size, offset=journal.resumed_rows):
+        journal.record(batch)
+        yield batch
@@ -1,8 +1,273 @@
-import pandas as pd
+import filecmp
+import json
+import os
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
 from simulations.characters.base_character import Character
+from simulations.output_backends import BatchWriter, Columns, CsvBackend, OutputBackend
+from simulations.sweep import DEFAULT_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def output_columns(
+    character: Character,
+    include_metadata: bool = True,
+    data: Columns | None = None,
+) -> Columns:
+    """
+    Collect a character's output columns in file order.
+
+    Args:
+        character: Character to simulate
+        include_metadata: Repeat each scalar from output_metadata() as a
+            constant column, with 'character' first and the rest last
+        data: Result of character.output_data() if already computed
+
+    Returns:
+        Column name to list of values, one entry per data point
+    """
+    data = character.output_data() if data is None else data
+    metadata = character.output_metadata() if include_metadata else {}
+    return _add_metadata_columns(data, metadata)
+
+
+def iter_output_batches(
+    character: Character,
+    include_metadata: bool = True,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    batches: Iterable[Columns] | None = None,
+) -> Iterator[Columns]:
+    """
+    Stream a character's output columns batch by batch.
+
+    Args:
+        character: Character to simulate
+        include_metadata: Repeat each scalar from output_metadata() as a
+            constant column, with 'character' first and the rest last
+        batch_size: Maximum number of rows per batch
+        batches: The character's data batches if produced some other way,
+            e.g. by a checkpointed sweep, instead of character.iter_batches
+
+    Yields:
+        Column name to list of values for each batch, in file order
+    """
+    metadata = character.output_metadata() if include_metadata else {}
+    if batches is None:
+        batches = character.iter_batches(batch_size)
+    for batch in batches:
+        yield _add_metadata_columns(batch, metadata)
+
+
+def _add_metadata_columns(data: Columns, metadata: dict[str, str | float]) -> Columns:
+    if not metadata:
+        return data
+
+    row_count = len(next(iter(data.values()), []))
+    columns: Columns = {}
+    if "character" in metadata:
+        columns["character"] = [metadata["character"]] * row_count
+    columns.update(data)
+    for column, value in metadata.items():
+        if column != "character":
+            columns[column] = [value] * row_count
+    return columns
+
+
+def output_df(
+    character: Character,
+    include_metadata: bool = True,
+    data: dict[str, list[str | float]] | None = None,
+) -> "pd.DataFrame":
+    """
+    Build a DataFrame from a character's per-row series.
+
+    Args:
+        character: Character to simulate
+        include_metadata: Repeat each scalar from output_metadata() as a
+            constant column, with 'character' first and the rest last
+        data: Result of character.output_data() if already computed
+
+    Returns:
+        DataFrame with one row per data point
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(character.output_data() if data is None else data)
+
+    if include_metadata:
+        # Broadcast scalars rather than building a list per metadata column
+        metadata = character.output_metadata()
+        for column, value in metadata.items():
+            if column == "character":
+                df.insert(0, column, value)
+            else:
+                df[column] = value
+
+    return df
+
+
+def output_metadata_json(character: Character) -> bytes:
+    """Serialize a character's scalar metadata as a JSON sidecar document."""
+    return (json.dumps(character.output_metadata(), indent=2) + "\n").encode()
+
+
+def _default_file_mode(path: Path) -> int:
+    if path.exists():
+        return path.stat().st_mode & 0o777
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _make_temp_file(path: Path) -> tuple[int, Path]:
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    return fd, Path(tmp_name)
+
+
+def _replace_with_temp_file(tmp_path: Path, path: Path) -> None:
+    # mkstemp creates owner-only files; use the mode a plain open() would
+    os.chmod(tmp_path, _default_file_mode(path))
+    os.replace(tmp_path, path)
+
+
+def write_bytes_atomic(data: bytes, path: Path) -> None:
+    """
+    Write bytes via a temporary file in the same directory.
+
+    The temporary file is renamed over path only once it is fully written,
+    so readers never observe a partially written file.
+
+    Args:
+        data: Content to write
+        path: Destination path
+    """
+    fd, tmp_path = _make_temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        _replace_with_temp_file(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_bytes_if_changed(data: bytes, path: Path) -> bool:
+    """
+    Atomically write bytes unless the file already has that content.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    if path.exists() and path.read_bytes() == data:
+        return False
+
+    write_bytes_atomic(data, path)
+    return True
+
+
+def _commit_temp_file(tmp_path: Path, path: Path) -> bool:
+    # Rename the finished temporary file over path unless path already has
+    # the same content
+    if path.exists() and filecmp.cmp(tmp_path, path, shallow=False):
+        tmp_path.unlink()
+        return False
+    _replace_with_temp_file(tmp_path, path)
+    return True
+
+
+def write_file_if_changed(path: Path, write: Callable[[IO[bytes]], None]) -> bool:
+    """
+    Atomically write a file produced piece by piece, unless it is unchanged.
+
+    Like write_bytes_if_changed for content too large to hold in memory:
+    write streams it to a temporary file, which is then compared with path.
+
+    Args:
+        path: Destination path
+        write: Writes the content to the open temporary file
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    fd, tmp_path = _make_temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            write(tmp_file)
+        return _commit_temp_file(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_batches_if_changed(
+    batches: Iterable[Columns], outputs: dict[Path, OutputBackend]
+) -> bool:
+    """
+    Stream batches of columns to one or more output files in a single pass.
+
+    Each batch is appended to a temporary file per output as soon as it is
+    produced, so memory stays bounded by one batch however many rows there
+    are. Once every batch is written, each temporary file is compared with
+    the existing output and renamed over it only if the content changed.
+
+    Args:
+        batches: Batches of columns, e.g. from iter_output_batches
+        outputs: Destination path to the backend that serializes it
+
+    Returns:
+        True if any file was written, False if all were already up to date
+    """
+    tmp_paths: dict[Path, Path] = {}
+    try:
+        with ExitStack() as stack:
+            writers: list[BatchWriter] = []
+            for path, backend in outputs.items():
+                fd, tmp_paths[path] = _make_temp_file(path)
+                tmp_file = stack.enter_context(os.fdopen(fd, "wb"))
+                writers.append(stack.enter_context(backend.batch_writer(tmp_file)))
+
+            for batch in batches:
+                for write in writers:
+                    write(batch)
+
+        written = False
+        for path, tmp_path in tmp_paths.items():
+            written |= _commit_temp_file(tmp_path, path)
+    except BaseException:
+        for tmp_path in tmp_paths.values():
+            tmp_path.unlink(missing_ok=True)
+        raise
+
+    return written
+
+
+def write_output_atomic(
+    df: "pd.DataFrame", path: Path, backend: OutputBackend | None = None
+) -> bool:
+    """
+    Atomically write a DataFrame unless the file already has that content.
+
+    Leaving identical files untouched keeps their mtime stable, so downstream
+    deploys only see a change when the data really changed.
+
+    Args:
+        df: DataFrame to write
+        path: Destination path
+        backend: Output format to serialize with, CSV by default
 
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    return write_bytes_if_changed((backend or CsvBackend()).serialize(df), path)
 
-def output_df(character: Character) -> pd.DataFrame:
-    data = character.output_data()
 
-    return pd.DataFrame(data)
+def write_csv_atomic(df: "pd.DataFrame", csv_path: Path) -> bool:
+    return write_output_atomic(df, csv_path, CsvBackend())
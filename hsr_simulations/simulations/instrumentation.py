@@ -0,0 +1,141 @@
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+TRACEMALLOC_TOP_STATS = 25
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int | None = None
+    peak_rss_bytes: int | None = None
+
+
+def get_peak_rss_bytes() -> int | None:
+    """High-water mark of this process's resident set size, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@contextmanager
+def measure_stage(stages: list[StageMetrics], stage: str) -> Iterator[StageMetrics]:
+    """
+    Record wall time, CPU time and peak RSS of the enclosed block.
+
+    The yielded metrics are appended to stages; the caller may set rows.
+    """
+    metrics = StageMetrics(stage)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics.wall_s = time.perf_counter() - wall_start
+        metrics.cpu_s = time.process_time() - cpu_start
+        metrics.peak_rss_bytes = get_peak_rss_bytes()
+        stages.append(metrics)
+
+
+def measure_iteration[T](
+    items: Iterable[T],
+    metrics: StageMetrics,
+    count_rows: Callable[[T], int] | None = None,
+) -> Iterator[T]:
+    """
+    Accumulate the time spent producing each item into metrics.
+
+    Used for lazily evaluated stages, such as a character's batches, that
+    are interleaved with the stage consuming them. Time spent by the
+    consumer between items is not counted.
+
+    Args:
+        items: Lazily produced items to pass through
+        metrics: Metrics to add wall time, CPU time and rows to
+        count_rows: Number of rows in an item, if rows should be counted
+    """
+    iterator = iter(items)
+    while True:
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            metrics.wall_s += time.perf_counter() - wall_start
+            metrics.cpu_s += time.process_time() - cpu_start
+            metrics.peak_rss_bytes = get_peak_rss_bytes()
+
+        if count_rows is not None:
+            metrics.rows = (metrics.rows or 0) + count_rows(item)
+        yield item
+
+
+@contextmanager
+def profile_to(profile_dir: Path | None, name: str) -> Iterator[None]:
+    """
+    Optionally profile the enclosed block with cProfile and tracemalloc.
+
+    Writes <name>.prof (loadable with pstats or snakeviz) and
+    <name>_tracemalloc.txt with the largest allocation sites to profile_dir.
+    Does nothing when profile_dir is None.
+    """
+    if profile_dir is None:
+        yield
+        return
+
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(profile_dir / f"{name}.prof")
+        top_stats = snapshot.statistics("lineno")[:TRACEMALLOC_TOP_STATS]
+        (profile_dir / f"{name}_tracemalloc.txt").write_text(
+            f"Peak traced memory: {peak} bytes\n"
+            + "\n".join(str(stat) for stat in top_stats)
+            + "\n"
+        )
+
+
+def write_run_report(
+    path: Path, characters: list[dict[str, Any]], total_wall_s: float
+) -> None:
+    """Write a machine-readable JSON report of a pipeline run."""
+    report = {
+        "finished_at": datetime.now(UTC).isoformat(),
+        "total_wall_s": total_wall_s,
+        "characters": characters,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, default=str) + "\n")
+
+
+def stage_metrics_as_dicts(stages: list[StageMetrics]) -> list[dict[str, Any]]:
+    return [asdict(stage) for stage in stages]
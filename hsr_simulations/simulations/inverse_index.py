@@ -0,0 +1,154 @@
+import json
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+# Evaluates a monotone non-increasing integer function for an array of inputs
+MonotoneFunction = Callable[[npt.NDArray[np.float64]], npt.NDArray[np.int64]]
+
+
+@dataclass(frozen=True)
+class ThresholdIndex:
+    """
+    Smallest input at which a non-increasing function reaches each value.
+
+    Args:
+        low: Smallest input covered by the index
+        high: Largest input covered by the index
+        resolution: Spacing of the input grid the thresholds lie on
+        low_value: Output at low (capped at max_value + 1 when built)
+        high_value: Output at high
+        thresholds: Output value to the smallest input giving that value or
+            less, for every value from high_value to low_value - 1
+    """
+
+    low: float
+    high: float
+    resolution: float
+    low_value: int
+    high_value: int
+    thresholds: dict[int, float]
+
+    def min_input(self, target: int) -> float | None:
+        """
+        Smallest input whose output is at most target.
+
+        Returns:
+            The threshold, low if every input qualifies, or None if no input
+            up to high does
+        """
+        if target >= self.low_value:
+            return self.low
+        if target < self.high_value:
+            return None
+        return self.thresholds[target]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "low": self.low,
+            "high": self.high,
+            "resolution": self.resolution,
+            "low_value": self.low_value,
+            "high_value": self.high_value,
+            "thresholds": {str(value): x for value, x in self.thresholds.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ThresholdIndex":
+        return cls(
+            low=data["low"],
+            high=data["high"],
+            resolution=data["resolution"],
+            low_value=data["low_value"],
+            high_value=data["high_value"],
+            thresholds={int(value): x for value, x in data["thresholds"].items()},
+        )
+
+
+def build_threshold_index(
+    function: MonotoneFunction,
+    low: float,
+    high: float,
+    resolution: float = 1.0,
+    max_value: int | None = None,
+) -> ThresholdIndex:
+    """
+    Index a non-increasing integer function by binary search.
+
+    Every output value gets its own search over the input grid
+    low, low + resolution, ..., and all searches advance in lock-step, so each
+    step evaluates the function once on a batch of inputs. Building the index
+    takes about log2((high - low) / resolution) batches instead of one
+    evaluation per grid point.
+
+    Args:
+        function: Vectorized non-increasing function of the input
+        low: Smallest input to index
+        high: Largest input to index
+        resolution: Spacing of the input grid
+        max_value: Ignore outputs above this, e.g. a simulation's safety cap
+
+    Returns:
+        Threshold for each output value reached within [low, high]
+    """
+    steps = math.floor((high - low) / resolution + 1e-9)
+    ends = function(np.array([low, low + steps * resolution]))
+    low_value = int(ends[0]) if max_value is None else min(int(ends[0]), max_value + 1)
+    high_value = int(ends[1])
+    targets = np.arange(high_value, low_value)
+
+    # Invariant per target: f(grid[lo]) > target and f(grid[hi]) <= target
+    lo = np.zeros(len(targets), dtype=np.int64)
+    hi = np.full(len(targets), steps, dtype=np.int64)
+    active = hi - lo > 1
+    while active.any():
+        mid = (lo[active] + hi[active]) // 2
+        inputs = np.asarray(low + mid * resolution, dtype=np.float64)
+        reached = function(inputs) <= targets[active]
+        hi[active] = np.where(reached, mid, hi[active])
+        lo[active] = np.where(reached, lo[active], mid)
+        active = hi - lo > 1
+
+    return ThresholdIndex(
+        low=low,
+        high=low + steps * resolution,
+        resolution=resolution,
+        low_value=low_value,
+        high_value=high_value,
+        thresholds={
+            int(target): float(low + index * resolution)
+            for target, index in zip(targets, hi, strict=True)
+        },
+    )
+
+
+def load_or_build_threshold_index(
+    path: Path | None, key: str, build: Callable[[], ThresholdIndex]
+) -> ThresholdIndex:
+    """
+    Load an index cached at path, rebuilding it if missing or stale.
+
+    Args:
+        path: JSON cache file, or None to skip caching
+        key: Identifies everything the index depends on; a cached index with
+            a different key is rebuilt
+        build: Builds the index on a cache miss
+
+    Returns:
+        The cached or freshly built index
+    """
+    if path is not None and path.exists():
+        cached = json.loads(path.read_text())
+        if cached.get("key") == key:
+            return ThresholdIndex.from_json(cached["index"])
+
+    index = build()
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"key": key, "index": index.to_json()}, indent=2))
+    return index
@@ -0,0 +1,441 @@
+import json
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.data_transformer import write_bytes_if_changed, write_file_if_changed
+from simulations.output_backends import Columns
+
+# Row counts of the downsampled tiers; the full data is always the last tier
+DEFAULT_TIER_ROWS = (256, 1024, 4096, 16384)
+# Column blocks start on multiples of this, so browsers can view them in place
+# as typed arrays (Float64Array needs 8-byte alignment)
+COLUMN_ALIGNMENT = 8
+# Rows copied at a time when assembling the full-resolution tier
+SPOOL_CHUNK_ROWS = 65536
+
+
+def _restore_kind(values: npt.NDArray[np.float64], kind: str) -> npt.NDArray[Any]:
+    # Series are buffered as float64; give each column its own type back
+    if kind == "b":
+        return values.astype(np.bool_)
+    if kind in "iu":
+        return values.astype(np.int64)
+    return values
+
+
+def _column_dtype(kind: str, low: float, high: float, rows: int) -> np.dtype[Any]:
+    """The smallest little-endian dtype browsers can view for a column."""
+    if kind == "b":
+        return np.dtype("<u1")
+    if kind in "iu":
+        info = np.iinfo(np.int32)
+        if not rows or (low >= info.min and high <= info.max):
+            return np.dtype("<i4")
+    return np.dtype("<f8")
+
+
+def _encode_column(values: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    """Store a column in the smallest little-endian dtype browsers can view."""
+    if not len(values):
+        return values.astype(_column_dtype(values.dtype.kind, 0, 0, 0))
+    return values.astype(
+        _column_dtype(values.dtype.kind, values.min(), values.max(), len(values))
+    )
+
+
+def encode_tier(
+    columns: dict[str, npt.NDArray[Any]],
+) -> tuple[bytes, list[dict[str, Any]]]:
+    """
+    Pack columns into one binary blob of aligned, typed column blocks.
+
+    Args:
+        columns: Column name to 1-D numeric array, all of the same length
+
+    Returns:
+        The blob and, per column, its name, dtype ('uint8', 'int32' or
+        'float64'), byte offset and length in rows
+    """
+    blob = bytearray()
+    layout = []
+    for name, values in columns.items():
+        encoded = _encode_column(values)
+        blob.extend(b"\0" * _padding(len(blob)))
+        layout.append(
+            {
+                "name": name,
+                "dtype": encoded.dtype.name,
+                "offset": len(blob),
+                "length": len(encoded),
+            }
+        )
+        blob.extend(encoded.tobytes())
+    return bytes(blob), layout
+
+
+def get_lod_index_path(directory: Path, character_name: str) -> Path:
+    return directory / f"{character_name}_lod_index.json"
+
+
+def _padding(offset: int) -> int:
+    return -offset % COLUMN_ALIGNMENT
+
+
+class _LttbTier:
+    """
+    Largest-Triangle-Three-Buckets downsampling of rows as they stream past.
+
+    The interior rows are split into buckets over the known row count. Each
+    bucket keeps the row that spans the largest triangle with the row kept
+    from the previous bucket and the average of the next bucket, so only the
+    rows of the bucket being decided and the next one are buffered. The
+    first and last rows are always kept.
+
+    Each y column is scaled by its range over the rows up to the end of the
+    next bucket, so the result does not depend on how rows are batched.
+    """
+
+    def __init__(self, total_rows: int, target_rows: int, reserved_rows: int) -> None:
+        interior = max(total_rows - 2, 0)
+        buckets = min(max(target_rows - 2 - reserved_rows, 0), interior)
+        # Bucket i holds rows edges[i] to edges[i + 1] - 1, split like
+        # np.array_split; edges[-1] is the last row
+        sizes = np.zeros(buckets, dtype=np.int64)
+        if buckets:
+            sizes += interior // buckets
+            sizes[: interior % buckets] += 1
+        self.edges = [1, *(1 + np.cumsum(sizes)).tolist()]
+        self.target_rows = target_rows
+        self.total_rows = total_rows
+        self.bucket = 0
+        self.buffer_start = 1
+        self.buffer: npt.NDArray[np.float64] | None = None
+        # Range of each column over the rows before buffer_start
+        self.low: npt.NDArray[np.float64] | None = None
+        self.high: npt.NDArray[np.float64] | None = None
+        self.previous: npt.NDArray[np.float64] | None = None
+        self.selected: dict[int, npt.NDArray[np.float64]] = {}
+
+    @property
+    def buckets(self) -> int:
+        return len(self.edges) - 1
+
+    def add(self, start: int, rows: npt.NDArray[np.float64], x_index: int) -> None:
+        """
+        Take the next rows, deciding every bucket they complete.
+
+        Args:
+            start: Row index of the first of rows
+            rows: Values of every series, shape (rows, series)
+            x_index: Series charted on the x axis
+        """
+        if start == 0:
+            self.previous = self.low = self.high = rows[0]
+            self.selected[0] = rows[0]
+        if self.bucket == self.buckets:
+            return
+
+        # Rows before the current bucket are never needed again
+        new_rows = rows[max(self.buffer_start - start, 0) :]
+        self.buffer = (
+            new_rows if self.buffer is None else np.concatenate([self.buffer, new_rows])
+        )
+
+        while self.bucket < self.buckets:
+            bucket_start, next_start = self.edges[self.bucket : self.bucket + 2]
+            next_stop = (
+                self.edges[self.bucket + 2]
+                if self.bucket + 1 < self.buckets
+                else self.total_rows
+            )
+            if self.buffer_start + len(self.buffer) < next_stop:
+                break
+            self._decide(bucket_start, next_start, next_stop, x_index)
+
+    def _decide(
+        self, bucket_start: int, next_start: int, next_stop: int, x_index: int
+    ) -> None:
+        if self.buffer is None or self.previous is None:
+            raise ValueError("LOD rows must start at row 0")
+        if self.low is None or self.high is None:
+            raise ValueError("LOD rows must start at row 0")
+        offset = self.buffer_start
+        seen = self.buffer[: next_stop - offset]
+        spans = np.maximum(self.high, seen.max(axis=0)) - np.minimum(
+            self.low, seen.min(axis=0)
+        )
+        scale = np.where(spans > 0, spans, 1.0)
+        scale[x_index] = 1.0
+
+        bucket_rows = self.buffer[bucket_start - offset : next_start - offset]
+        next_rows = self.buffer[next_start - offset : next_stop - offset]
+        chosen = _largest_triangle(
+            self.previous / scale,
+            bucket_rows / scale,
+            next_rows.mean(axis=0) / scale,
+            x_index,
+        )
+        self.previous = bucket_rows[chosen]
+        self.selected[bucket_start + chosen] = bucket_rows[chosen]
+
+        self.low = np.minimum(self.low, bucket_rows.min(axis=0))
+        self.high = np.maximum(self.high, bucket_rows.max(axis=0))
+        self.buffer = self.buffer[next_start - offset :]
+        self.buffer_start = next_start
+        self.bucket += 1
+
+    def finish(self, last_row: npt.NDArray[np.float64]) -> None:
+        self.selected[self.total_rows - 1] = last_row
+
+
+def _largest_triangle(
+    previous: npt.NDArray[np.float64],
+    bucket: npt.NDArray[np.float64],
+    next_point: npt.NDArray[np.float64],
+    x_index: int,
+) -> int:
+    # With several y columns the triangle areas of each are summed
+    y = np.delete(np.arange(bucket.shape[1]), x_index)
+    areas = np.abs(
+        (previous[x_index] - next_point[x_index]) * (bucket[:, y] - previous[y])
+        - (previous[x_index] - bucket[:, [x_index]]) * (next_point[y] - previous[y])
+    ).sum(axis=1)
+    return int(np.argmax(areas))
+
+
+class LodWriter:
+    """
+    Downsamples a character's series into level-of-detail tiers as batches
+    stream past, then writes the tiers and their index.
+
+    Memory stays bounded however many rows there are: each downsampled tier
+    buffers only the LTTB buckets being decided, and the full-resolution
+    tier is spooled to a temporary file. For each breakpoint the first row
+    at or past it and the row before are kept in every tier, so both kinks
+    and steps stay exact. Use the writer as a context manager, so the spool
+    is deleted on exit.
+
+    Args:
+        total_rows: Rows the batches hold, e.g. the character's grid size
+        x_column: Column charted on the x axis; rows must be sorted by it
+        breakpoints: x values kept exactly in every tier
+        tier_rows: Row counts of the downsampled tiers
+        exclude: Column names to leave out, e.g. broadcast metadata
+    """
+
+    def __init__(
+        self,
+        total_rows: int,
+        x_column: str,
+        breakpoints: Sequence[float],
+        tier_rows: Sequence[int] = DEFAULT_TIER_ROWS,
+        exclude: Iterable[str] = (),
+    ) -> None:
+        self.total_rows = total_rows
+        self.x_column = x_column
+        self.breakpoints = list(breakpoints)
+        self.exclude = set(exclude)
+        # Each breakpoint keeps at most two rows, so leave room for them
+        reserved_rows = 2 * len(self.breakpoints)
+        self.tiers = [
+            _LttbTier(total_rows, rows, reserved_rows)
+            for rows in sorted({r for r in tier_rows if r < total_rows})
+        ]
+        self._pending_breakpoints = np.sort(
+            np.asarray(self.breakpoints, dtype=np.float64)
+        )
+        self._kept: dict[int, npt.NDArray[np.float64]] = {}
+        self._names: list[str] = []
+        self._kinds: list[str] = []
+        self._low = np.empty(0)
+        self._high = np.empty(0)
+        self._last_row: npt.NDArray[np.float64] | None = None
+        self._rows = 0
+        # Closed, and so deleted, by close()
+        self._spool: IO[bytes] = tempfile.TemporaryFile()  # noqa: SIM115
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Delete the spooled full-resolution data."""
+        self._spool.close()
+
+    def collect(self, batches: Iterable[Columns]) -> Iterator[Columns]:
+        """Yield each batch unchanged after downsampling its series."""
+        for batch in batches:
+            self.add(batch)
+            yield batch
+
+    def add(self, batch: Columns) -> None:
+        arrays = {
+            name: np.asarray(values)
+            for name, values in batch.items()
+            if name not in self.exclude
+        }
+        if not self._names:
+            self._names = [
+                name for name, array in arrays.items() if array.dtype.kind in "biuf"
+            ]
+            self._kinds = [arrays[name].dtype.kind for name in self._names]
+            self._low = np.full(len(self._names), np.inf)
+            self._high = np.full(len(self._names), -np.inf)
+        self._kinds = [
+            kind if arrays[name].dtype.kind == kind else "f"
+            for name, kind in zip(self._names, self._kinds, strict=True)
+        ]
+        rows = np.column_stack(
+            [arrays[name].astype(np.float64) for name in self._names]
+        )
+        if not len(rows):
+            return
+
+        start = self._rows
+        self._rows += len(rows)
+        self._low = np.minimum(self._low, rows.min(axis=0))
+        self._high = np.maximum(self._high, rows.max(axis=0))
+        # Row-major spool; the full tier is transposed into column blocks
+        self._spool.write(rows.tobytes())
+
+        x_index = self._names.index(self.x_column)
+        self._keep_breakpoint_rows(start, rows, x_index)
+        for tier in self.tiers:
+            tier.add(start, rows, x_index)
+        self._last_row = rows[-1]
+
+    def _keep_breakpoint_rows(
+        self, start: int, rows: npt.NDArray[np.float64], x_index: int
+    ) -> None:
+        after = np.searchsorted(rows[:, x_index], self._pending_breakpoints)
+        reached = after < len(rows)
+        for position in np.unique(after[reached]).tolist():
+            self._kept[start + position] = rows[position]
+            if position > 0:
+                self._kept[start + position - 1] = rows[position - 1]
+            elif self._last_row is not None:
+                self._kept[start - 1] = self._last_row
+        self._pending_breakpoints = self._pending_breakpoints[~reached]
+
+    def _tier_columns(
+        self, selected: dict[int, npt.NDArray[np.float64]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        indices = sorted(selected.keys() | self._kept.keys())
+        rows = np.array(
+            [self._kept[i] if i in self._kept else selected[i] for i in indices]
+        ).reshape(len(indices), len(self._names))
+        return {
+            name: _restore_kind(rows[:, i], kind)
+            for i, (name, kind) in enumerate(zip(self._names, self._kinds, strict=True))
+        }
+
+    def _write_full_tier(self, file: IO[bytes]) -> list[dict[str, Any]]:
+        layout = []
+        offset = 0
+        row_bytes = len(self._names) * np.dtype(np.float64).itemsize
+        for i, (name, kind) in enumerate(zip(self._names, self._kinds, strict=True)):
+            dtype = _column_dtype(kind, self._low[i], self._high[i], self._rows)
+            padding = _padding(offset)
+            file.write(b"\0" * padding)
+            offset += padding
+            layout.append(
+                {
+                    "name": name,
+                    "dtype": dtype.name,
+                    "offset": offset,
+                    "length": self._rows,
+                }
+            )
+            self._spool.seek(0)
+            while chunk := self._spool.read(SPOOL_CHUNK_ROWS * row_bytes):
+                rows = np.frombuffer(chunk, dtype=np.float64).reshape(
+                    -1, len(self._names)
+                )
+                data = _restore_kind(rows[:, i], kind).astype(dtype).tobytes()
+                file.write(data)
+                offset += len(data)
+        return layout
+
+    def write(self, directory: Path, character_name: str) -> tuple[bool, list[Path]]:
+        """
+        Write every tier and the index once all batches have been added.
+
+        Returns:
+            Whether any file changed, and the paths of the index and tier files
+        """
+        if self._rows != self.total_rows:
+            raise ValueError(
+                f"Expected {self.total_rows} rows for the LOD tiers, got {self._rows}"
+            )
+
+        tiers = []
+        paths: list[Path] = []
+        written = False
+        for tier in self.tiers:
+            if self._last_row is not None:
+                tier.finish(self._last_row)
+            columns = self._tier_columns(tier.selected)
+            blob, layout = encode_tier(columns)
+            path = directory / f"{character_name}_lod_{tier.target_rows}.bin"
+            written |= write_bytes_if_changed(blob, path)
+            paths.append(path)
+            tiers.append(
+                {
+                    "target_rows": tier.target_rows,
+                    "rows": len(columns[self.x_column]),
+                    "path": path.name,
+                    "bytes": len(blob),
+                    "columns": layout,
+                }
+            )
+
+        # The full data is always the last tier
+        full_layout: list[dict[str, Any]] = []
+
+        def write_full(file: IO[bytes]) -> None:
+            full_layout.extend(self._write_full_tier(file))
+
+        path = directory / f"{character_name}_lod_{self.total_rows}.bin"
+        written |= write_file_if_changed(path, write_full)
+        paths.append(path)
+        tiers.append(
+            {
+                "target_rows": self.total_rows,
+                "rows": self.total_rows,
+                "path": path.name,
+                "bytes": path.stat().st_size,
+                "columns": full_layout,
+            }
+        )
+
+        # Tiers from an earlier run with other tier sizes would go stale
+        for stale in directory.glob(f"{character_name}_lod_*.bin"):
+            if stale not in paths:
+                stale.unlink()
+                written = True
+
+        index = {
+            "x": self.x_column,
+            "rows": self.total_rows,
+            "breakpoints": self.breakpoints,
+            "byte_order": "little",
+            "tiers": tiers,
+        }
+        index_path = get_lod_index_path(directory, character_name)
+        written |= write_bytes_if_changed(
+            json.dumps(index, indent=2).encode() + b"\n", index_path
+        )
+        return written, [index_path, *paths]
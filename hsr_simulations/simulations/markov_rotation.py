@@ -0,0 +1,307 @@
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.rotation import RotationStep
+
+# One possible result of a cycle: (probability, next state, damage dealt)
+type Outcome[State] = tuple[float, State, float]
+# A stochastic rotation step lists the outcomes of a cycle from a state; the
+# probabilities must sum to 1
+type StochasticStep[State] = Callable[[State], Iterable[Outcome[State]]]
+
+# Largest allowed deviation of a state's outcome probabilities from 1
+PROBABILITY_TOLERANCE = 1e-9
+
+
+def deterministic_step[State](step: RotationStep[State]) -> StochasticStep[State]:
+    """Wrap a solve_rotation step as a stochastic step with a single outcome."""
+
+    def outcomes(state: State) -> tuple[Outcome[State]]:
+        next_state, dmg = step(state)
+        return ((1.0, next_state, dmg),)
+
+    return outcomes
+
+
+def with_crit[State](
+    step: StochasticStep[State], crit_rate: float, crit_dmg: float
+) -> StochasticStep[State]:
+    """
+    Let the damage of every outcome crit independently.
+
+    A crit multiplies the damage by 1 + crit_dmg and leaves the next state
+    unchanged, so it only splits each outcome in two.
+    """
+
+    def outcomes(state: State) -> Iterator[Outcome[State]]:
+        for probability, next_state, dmg in step(state):
+            yield probability * crit_rate, next_state, dmg * (1 + crit_dmg)
+            yield probability * (1 - crit_rate), next_state, dmg
+
+    return outcomes
+
+
+@dataclass(frozen=True)
+class MarkovRotation[State: Hashable]:
+    """
+    A rotation compiled into a sparse transition matrix.
+
+    Row i of the matrix, stored as compressed sparse rows, holds the
+    probabilities of moving from states[i] to each next state in one cycle.
+
+    Args:
+        states: Every state reachable from the initial one, initial first
+        indptr: Row i's entries are indptr[i]:indptr[i + 1] of the arrays below
+        indices: Next state of each entry
+        probabilities: Probability of each entry
+        rewards: Expected damage of a cycle started in each state
+    """
+
+    states: tuple[State, ...]
+    indptr: npt.NDArray[np.int64]
+    indices: npt.NDArray[np.int64]
+    probabilities: npt.NDArray[np.float64]
+    rewards: npt.NDArray[np.float64]
+
+    def advance(self, distribution: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """Distribution over states one cycle after the given one."""
+        weights = np.repeat(distribution, np.diff(self.indptr)) * self.probabilities
+        return np.bincount(self.indices, weights=weights, minlength=len(self.states))
+
+    def expected_dmg(self, total_cycles: int) -> float:
+        """Expected total damage over total_cycles cycles from the initial state."""
+        if total_cycles < 0:
+            raise ValueError("total_cycles must be non-negative")
+        distribution = np.zeros(len(self.states))
+        distribution[0] = 1.0
+        total_dmg = 0.0
+        for _ in range(total_cycles):
+            total_dmg += float(distribution @ self.rewards)
+            distribution = self.advance(distribution)
+        return total_dmg
+
+    def block(
+        self, rows: npt.NDArray[np.int64], columns: npt.NDArray[np.int64]
+    ) -> npt.NDArray[np.float64]:
+        """Dense submatrix of the transition matrix."""
+        size = len(self.states)
+        row_position = np.full(size, -1)
+        row_position[rows] = np.arange(len(rows))
+        column_position = np.full(size, -1)
+        column_position[columns] = np.arange(len(columns))
+
+        entry_rows = row_position[np.repeat(np.arange(size), np.diff(self.indptr))]
+        entry_columns = column_position[self.indices]
+        inside = (entry_rows >= 0) & (entry_columns >= 0)
+        block = np.zeros((len(rows), len(columns)))
+        block[entry_rows[inside], entry_columns[inside]] = self.probabilities[inside]
+        return block
+
+    def closed_classes(self) -> list[npt.NDArray[np.int64]]:
+        """States of each class the rotation can never leave once entered."""
+        classes = []
+        for component in _strongly_connected_components(self.indptr, self.indices):
+            members = np.array(sorted(component), dtype=np.int64)
+            targets = np.concatenate(
+                [self.indices[self.indptr[i] : self.indptr[i + 1]] for i in members]
+            )
+            if np.isin(targets, members).all():
+                classes.append(members)
+        return classes
+
+    def stationary_distribution(self) -> npt.NDArray[np.float64]:
+        """
+        Long-run share of cycles spent in each state, from the initial state.
+
+        The rotation ends up in one of its closed classes. Within a class the
+        shares solve pi P = pi, sum(pi) = 1; if the initial state is
+        transient, each class is weighted by the probability of ending up in
+        it, from the expected visits to the transient states. Periodic
+        rotations are fine: the shares are averages over cycles.
+
+        Returns:
+            Probability of each state in states
+        """
+        size = len(self.states)
+        classes = self.closed_classes()
+
+        weights: list[float]
+        closed = np.concatenate(classes)
+        if np.isin(0, closed):
+            weights = [float(np.isin(0, members)) for members in classes]
+        else:
+            transient = np.setdiff1d(np.arange(size), closed)
+            visits = np.linalg.solve(
+                (np.eye(len(transient)) - self.block(transient, transient)).T,
+                (transient == 0).astype(np.float64),
+            )
+            weights = [
+                float(visits @ self.block(transient, members).sum(axis=1))
+                for members in classes
+            ]
+
+        distribution = np.zeros(size)
+        for members, weight in zip(classes, weights, strict=True):
+            if weight == 0:
+                continue
+            # Replace one balance equation, which the others imply, by the sum
+            system = self.block(members, members).T - np.eye(len(members))
+            system[-1] = 1.0
+            target = np.zeros(len(members))
+            target[-1] = 1.0
+            distribution[members] = weight * np.linalg.solve(system, target)
+        return distribution
+
+    def dmg_per_cycle(self) -> float:
+        """Long-run expected damage per cycle."""
+        return float(self.stationary_distribution() @ self.rewards)
+
+
+def _strongly_connected_components(
+    indptr: npt.NDArray[np.int64], indices: npt.NDArray[np.int64]
+) -> list[list[int]]:
+    # Tarjan's algorithm with an explicit stack, so long chains cannot hit
+    # the recursion limit
+    starts = indptr.tolist()
+    targets = indices.tolist()
+    size = len(starts) - 1
+    order = [-1] * size
+    low = [0] * size
+    on_stack = [False] * size
+    stack: list[int] = []
+    components = []
+    counter = 0
+
+    for root in range(size):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, starts[root])]
+
+        while work:
+            state, edge = work[-1]
+            if edge < starts[state + 1]:
+                work[-1] = (state, edge + 1)
+                target = targets[edge]
+                if order[target] == -1:
+                    order[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, starts[target]))
+                elif on_stack[target]:
+                    low[state] = min(low[state], order[target])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[state])
+            if low[state] == order[state]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == state:
+                        break
+                components.append(component)
+
+    return components
+
+
+def compile_rotation[State: Hashable](
+    initial_state: State, step: StochasticStep[State], max_states: int = 100_000
+) -> MarkovRotation[State]:
+    """
+    Explore every state reachable from initial_state into a transition matrix.
+
+    Outcomes leading to the same next state are merged, and outcomes with zero
+    probability are dropped.
+
+    Args:
+        initial_state: Hashable state before the first cycle
+        step: Function listing the outcomes of a cycle from a state
+        max_states: Fail rather than explore more states than this
+
+    Returns:
+        The compiled rotation
+    """
+    index: dict[State, int] = {initial_state: 0}
+    states = [initial_state]
+    indptr = [0]
+    indices: list[int] = []
+    probabilities: list[float] = []
+    rewards = []
+
+    position = 0
+    while position < len(states):
+        state = states[position]
+        row: dict[int, float] = {}
+        reward = 0.0
+        total_probability = 0.0
+        for probability, next_state, dmg in step(state):
+            if probability < 0:
+                raise ValueError(f"Negative probability {probability} from {state!r}")
+            total_probability += probability
+            if probability == 0:
+                continue
+            reward += probability * dmg
+            if next_state not in index:
+                if len(states) == max_states:
+                    raise ValueError(f"Rotation has more than {max_states} states")
+                index[next_state] = len(states)
+                states.append(next_state)
+            target = index[next_state]
+            row[target] = row.get(target, 0.0) + probability
+        if abs(total_probability - 1) > PROBABILITY_TOLERANCE:
+            raise ValueError(
+                f"Outcome probabilities from {state!r} sum to {total_probability}"
+            )
+
+        indices.extend(row)
+        probabilities.extend(row.values())
+        indptr.append(len(indices))
+        rewards.append(reward)
+        position += 1
+
+    return MarkovRotation(
+        tuple(states),
+        np.array(indptr, dtype=np.int64),
+        np.array(indices, dtype=np.int64),
+        np.array(probabilities, dtype=np.float64),
+        np.array(rewards, dtype=np.float64),
+    )
+
+
+def solve_markov_rotation[State: Hashable](
+    initial_state: State,
+    step: StochasticStep[State],
+    total_cycles: int | None = None,
+) -> float:
+    """
+    Evaluate a stochastic rotation exactly, by its transition matrix.
+
+    The stochastic counterpart of solve_rotation: instead of simulating many
+    random cycles, the expected damage follows from linear algebra on the
+    compiled rotation.
+
+    Args:
+        initial_state: Hashable state before the first cycle
+        step: Function listing the outcomes of a cycle from a state
+        total_cycles: Number of cycles to evaluate, or None for infinite horizon
+
+    Returns:
+        Expected total damage over total_cycles, or the long-run expected
+        damage per cycle when total_cycles is None
+    """
+    rotation = compile_rotation(initial_state, step)
+    if total_cycles is None:
+        return rotation.dmg_per_cycle()
+    return rotation.expected_dmg(total_cycles)
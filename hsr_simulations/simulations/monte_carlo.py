@@ -0,0 +1,174 @@
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+import numpy.typing as npt
+
+# A sampler draws n independent trials from the given generator
+Sampler = Callable[[np.random.Generator, int], npt.NDArray[np.float64]]
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class CritDamageSampler:
+    """
+    Total damage over a number of actions with independent crit rolls.
+
+    Each action deals dmg_per_action on average. A crit multiplies the
+    non-crit damage by 1 + crit_dmg, so the non-crit damage is
+    dmg_per_action / (1 + crit_rate * crit_dmg) and the expected total matches
+    the crit-weighted expected value used by the deterministic simulations.
+    """
+
+    dmg_per_action: float
+    crit_rate: float
+    crit_dmg: float
+    actions: int
+
+    def __call__(self, rng: np.random.Generator, n: int) -> npt.NDArray[np.float64]:
+        non_crit_dmg = self.dmg_per_action / (1 + self.crit_rate * self.crit_dmg)
+        # The number of crits among independent actions is binomial, so one
+        # draw per trial replaces one draw per action
+        crits = rng.binomial(self.actions, self.crit_rate, size=n)
+        return np.asarray(
+            non_crit_dmg * (self.actions + self.crit_dmg * crits), dtype=np.float64
+        )
+
+
+@dataclass(frozen=True)
+class MonteCarloSummary:
+    trials: int
+    mean: float
+    std: float
+    ci_low: float
+    ci_high: float
+    percentiles: dict[int, float]
+    prob_above_threshold: float | None
+
+
+def _run_batch(
+    sampler: Sampler, seed: np.random.SeedSequence, batch_size: int
+) -> npt.NDArray[np.float64]:
+    return sampler(np.random.default_rng(seed), batch_size)
+
+
+def run_monte_carlo(
+    sampler: Sampler,
+    seed: int | np.random.SeedSequence = 0,
+    batch_size: int = 100_000,
+    min_trials: int = 10_000,
+    max_trials: int = 10_000_000,
+    rel_ci_width: float = 0.001,
+    confidence: float = 0.95,
+    threshold: float | None = None,
+    executor: Executor | None = None,
+    workers: int = 1,
+) -> MonteCarloSummary:
+    """
+    Sample a damage distribution in batches until the mean is precise enough.
+
+    Batches follow a fixed schedule: batch i always has the same size and
+    child seed spawned from seed, and the stopping rule is checked after each
+    batch in order. Sampling stops once the confidence interval of the mean
+    is narrower than rel_ci_width times the mean, or when max_trials is
+    reached, so the result depends only on the seed and these settings, not
+    on the executor or number of workers.
+
+    Args:
+        sampler: Picklable callable drawing n trials from a generator
+        seed: Root seed for all per-batch streams
+        batch_size: Trials per batch
+        min_trials: Trials to draw before checking the stopping rule
+        max_trials: Upper bound on trials
+        rel_ci_width: Target confidence interval width relative to the mean
+        confidence: Confidence level of the interval
+        threshold: Damage to report the probability of exceeding
+        executor: Process pool to run batches on; None runs in-process
+        workers: Batches drawn ahead in parallel when an executor is given
+
+    Returns:
+        Distribution summary of the sampled damage
+    """
+    seed_sequence = (
+        seed
+        if isinstance(seed, np.random.SeedSequence)
+        else np.random.SeedSequence(seed)
+    )
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    # The schedule is fixed by the settings alone: batch i has its own child
+    # seed and size, and the stopping rule is checked after every batch in
+    # order. Workers only draw upcoming batches ahead of time, so the result
+    # does not depend on how many there are.
+    batch_sizes = [
+        min(batch_size, max_trials - start)
+        for start in range(0, max_trials, batch_size)
+    ]
+    seeds = seed_sequence.spawn(len(batch_sizes))
+    in_flight: deque[Future[npt.NDArray[np.float64]]] = deque()
+    lookahead = max(1, workers) if executor is not None else 0
+
+    batches: list[npt.NDArray[np.float64]] = []
+    # Running mean and sum of squared deviations, merged batch by batch
+    trials = 0
+    mean = 0.0
+    m2 = 0.0
+    try:
+        for i, size in enumerate(batch_sizes):
+            if executor is None:
+                batch = _run_batch(sampler, seeds[i], size)
+            else:
+                ahead = i + len(in_flight)
+                while ahead < min(i + lookahead, len(batch_sizes)):
+                    in_flight.append(
+                        executor.submit(
+                            _run_batch, sampler, seeds[ahead], batch_sizes[ahead]
+                        )
+                    )
+                    ahead += 1
+                batch = in_flight.popleft().result()
+
+            batch_mean = float(batch.mean())
+            batch_m2 = float(((batch - batch_mean) ** 2).sum())
+            total = trials + len(batch)
+            delta = batch_mean - mean
+            mean += delta * len(batch) / total
+            m2 += batch_m2 + delta**2 * trials * len(batch) / total
+            trials = total
+            batches.append(batch)
+
+            if trials < min_trials:
+                continue
+
+            half_width = z * np.sqrt(m2 / (trials - 1) / trials)
+            if 2 * half_width <= rel_ci_width * abs(mean):
+                break
+    finally:
+        # Batches drawn ahead past the stopping point are discarded
+        for future in in_flight:
+            future.cancel()
+
+    samples = np.concatenate(batches)
+    std = float(np.sqrt(m2 / (trials - 1))) if trials > 1 else 0.0
+    half_width = float(z * std / np.sqrt(trials))
+
+    return MonteCarloSummary(
+        trials=trials,
+        mean=mean,
+        std=std,
+        ci_low=mean - half_width,
+        ci_high=mean + half_width,
+        percentiles={
+            q: float(value)
+            for q, value in zip(
+                PERCENTILES, np.percentile(samples, PERCENTILES), strict=True
+            )
+        },
+        prob_above_threshold=(
+            float(np.mean(samples > threshold)) if threshold is not None else None
+        ),
+    )
@@ -0,0 +1,246 @@
+import csv
+import io
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+Columns = dict[str, list[str | float]]
+
+# Appends one batch of columns to an open output file
+BatchWriter = Callable[[Columns], None]
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow output require pyarrow. "
+            "Install it with the 'columnar' extra."
+        ) from e
+    return pa
+
+
+def _format_csv_column(values: list[str | float]) -> list[str | float]:
+    # Match pandas: a column holding any float is written as floats
+    # throughout, and NaN is written as an empty field
+    if not any(isinstance(value, float) for value in values):
+        return values
+    return [
+        ""
+        if isinstance(value, float) and math.isnan(value)
+        else float(value)
+        if isinstance(value, int) and not isinstance(value, bool)
+        else value
+        for value in values
+    ]
+
+
+def columns_to_csv(columns: Columns, header: bool = True) -> bytes:
+    """
+    Serialize columns to CSV without importing pandas.
+
+    Produces the same bytes as DataFrame(columns).to_csv(index=False) for the
+    str, int, float and bool values characters emit, so the fast path and the
+    DataFrame path are interchangeable.
+
+    Args:
+        columns: Column name to list of values
+        header: Write the header row; False when appending a later batch
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    writer.writerows(
+        zip(*(_format_csv_column(values) for values in columns.values()), strict=True)
+    )
+    return buffer.getvalue().encode()
+
+
+def encode_categoricals(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Convert string columns (e.g. 'character') to categorical dtype."""
+    import pandas as pd
+
+    string_columns = [
+        column
+        for column in df.columns
+        if pd.api.types.is_object_dtype(df[column])
+        or pd.api.types.is_string_dtype(df[column])
+    ]
+    return df.astype({column: "category" for column in string_columns})
+
+
+def _columns_to_table(columns: Columns) -> Any:
+    import pandas as pd
+
+    pa = _import_pyarrow()
+    return pa.Table.from_pandas(
+        encode_categoricals(pd.DataFrame(columns)), preserve_index=False
+    )
+
+
+class OutputBackend(ABC):
+    """Serializes a character's DataFrame to a single output file format."""
+
+    name: str = ""
+    extension: str = ""
+
+    @abstractmethod
+    def serialize(self, df: "pd.DataFrame") -> bytes:
+        """Encode a whole DataFrame as the contents of one output file."""
+
+    @abstractmethod
+    def batch_writer(self, file: IO[bytes]) -> AbstractContextManager[BatchWriter]:
+        """
+        Open a writer that appends batches of columns to file.
+
+        Every batch must have the same columns and column types. The file is
+        complete once the context exits.
+        """
+
+
+class CsvBackend(OutputBackend):
+    name = "csv"
+    extension = "csv"
+
+    def serialize(self, df: "pd.DataFrame") -> bytes:
+        return df.to_csv(index=False).encode()
+
+    @contextmanager
+    def batch_writer(self, file: IO[bytes]) -> Iterator[BatchWriter]:
+        header = True
+
+        def write(columns: Columns) -> None:
+            nonlocal header
+            file.write(columns_to_csv(columns, header))
+            header = False
+
+        yield write
+
+
+class ParquetBackend(OutputBackend):
+    name = "parquet"
+    extension = "parquet"
+
+    def __init__(self, compression: str = "zstd") -> None:
+        self.compression = compression
+
+    def serialize(self, df: "pd.DataFrame") -> bytes:
+        pa = _import_pyarrow()
+        table = pa.Table.from_pandas(encode_categoricals(df), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        pa.parquet.write_table(table, sink, compression=self.compression)
+        return bytes(sink.getvalue().to_pybytes())
+
+    @contextmanager
+    def batch_writer(self, file: IO[bytes]) -> Iterator[BatchWriter]:
+        pa = _import_pyarrow()
+        writer: Any = None
+
+        def write(columns: Columns) -> None:
+            nonlocal writer
+            table = _columns_to_table(columns)
+            if writer is None:
+                writer = pa.parquet.ParquetWriter(
+                    file, table.schema, compression=self.compression
+                )
+            # Each batch becomes one row group
+            writer.write_table(table)
+
+        try:
+            yield write
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+class ArrowBackend(OutputBackend):
+    name = "arrow"
+    extension = "arrow"
+
+    def __init__(self, compression: str = "zstd") -> None:
+        self.compression = compression
+
+    def serialize(self, df: "pd.DataFrame") -> bytes:
+        pa = _import_pyarrow()
+        table = pa.Table.from_pandas(encode_categoricals(df), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return bytes(sink.getvalue().to_pybytes())
+
+    @contextmanager
+    def batch_writer(self, file: IO[bytes]) -> Iterator[BatchWriter]:
+        pa = _import_pyarrow()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        writer: Any = None
+
+        def write(columns: Columns) -> None:
+            nonlocal writer
+            table = _columns_to_table(columns)
+            if writer is None:
+                writer = pa.ipc.new_file(file, table.schema, options=options)
+            writer.write_table(table)
+
+        try:
+            yield write
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+OUTPUT_BACKENDS: dict[str, OutputBackend] = {
+    backend.name: backend
+    for backend in (CsvBackend(), ParquetBackend(), ArrowBackend())
+}
+
+
+def get_output_backend(name: str) -> OutputBackend:
+    try:
+        return OUTPUT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown output format '{name}', expected one of {sorted(OUTPUT_BACKENDS)}"
+        ) from None
+
+
+def load_output(path: Path) -> "pd.DataFrame":
+    """
+    Load a file written by one of the output backends.
+
+    Parquet and Arrow IPC files are memory-mapped rather than read into a
+    buffer first, and keep their column types without re-parsing text.
+
+    Args:
+        path: Path to a .csv, .parquet or .arrow file
+
+    Returns:
+        DataFrame with the file's contents
+    """
+    import pandas as pd
+
+    suffix = path.suffix.lstrip(".")
+    if suffix == CsvBackend.extension:
+        return pd.read_csv(path)
+
+    pa = _import_pyarrow()
+    if suffix == ParquetBackend.extension:
+        table = pa.parquet.read_table(path, memory_map=True)
+    elif suffix == ArrowBackend.extension:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        raise ValueError(f"Unsupported output file: {path}")
+
+    df: pd.DataFrame = table.to_pandas()
+    return df
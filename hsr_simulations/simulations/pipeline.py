@@ -0,0 +1,347 @@
+import hashlib
+import json
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+
+from simulations.build_cache import BuildManifest, compute_character_hash
+from simulations.characters.base_character import Character
+from simulations.checkpoint import CheckpointJournal, iter_checkpointed_batches
+from simulations.data_transformer import (
+    iter_output_batches,
+    output_metadata_json,
+    write_batches_if_changed,
+    write_bytes_if_changed,
+)
+from simulations.instrumentation import (
+    StageMetrics,
+    measure_iteration,
+    measure_stage,
+    profile_to,
+)
+from simulations.lod import LodWriter, get_lod_index_path
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import get_output_backend
+from simulations.result_store import sweep_rows
+
+logger = get_default_logger()
+
+
+class OutputStatus(StrEnum):
+    WRITTEN = "written"
+    UNCHANGED = "unchanged"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class CharacterResult:
+    character_name: str
+    status: OutputStatus
+    output_paths: list[Path] = field(default_factory=list)
+    error: str | None = None
+    stages: list[StageMetrics] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status != OutputStatus.FAILED
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """
+    How each character's data is written.
+
+    Args:
+        output_formats: Output backends to write, e.g. ("csv", "parquet")
+        normalize: Leave scalar metadata out of the data files; it is always
+            written to the <character>_metadata.json sidecar. False repeats
+            it as columns of every row, the wide layout
+        profile_dir: Write per-character cProfile and tracemalloc dumps here
+        lod_tiers: Row counts of the level-of-detail tiers written for
+            characters with an LOD_X_COLUMN and sweep_axes; empty writes no
+            tiers
+        cache_dir: Directory for caches that outlive a run, e.g. the
+            threshold indexes behind Castorice's LOD breakpoints; None
+            caches nothing
+        checkpoint: Journal each completed batch of a sweep under
+            cache_dir until the output is written, so a killed run can
+            resume; needs cache_dir
+        resume: Reuse the batches a killed run journaled for the same build
+            hash instead of recomputing them
+    """
+
+    output_formats: tuple[str, ...] = ("csv",)
+    normalize: bool = True
+    profile_dir: Path | None = None
+    lod_tiers: tuple[int, ...] = ()
+    cache_dir: Path | None = None
+    checkpoint: bool = False
+    resume: bool = False
+
+    def __post_init__(self) -> None:
+        if self.checkpoint and self.cache_dir is None:
+            raise ValueError("Checkpointing needs a cache_dir for its journals")
+
+    def build_key(self, character_hash: str) -> str:
+        """
+        Key recorded in the build manifest for a character built with these
+        options, so changing any option that shapes the files rebuilds it.
+        """
+        shape = {
+            "output_formats": sorted(self.output_formats),
+            "normalize": self.normalize,
+            "lod_tiers": sorted(self.lod_tiers),
+        }
+        digest = hashlib.sha256(character_hash.encode())
+        digest.update(json.dumps(shape, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def lod_x_column(self, character: Character) -> str | None:
+        """The character's LOD_X_COLUMN if tiers are written for it, else None."""
+        if not self.lod_tiers or not character.sweep_axes():
+            return None
+        return character.LOD_X_COLUMN
+
+
+def get_character_name(character: Character) -> str:
+    return character.__class__.__name__.lower()
+
+
+def get_output_path(
+    base_dir: Path, character_name: str, output_format: str = "csv"
+) -> Path:
+    extension = get_output_backend(output_format).extension
+    return base_dir / character_name / f"{character_name}_data.{extension}"
+
+
+def get_metadata_path(base_dir: Path, character_name: str) -> Path:
+    return base_dir / character_name / f"{character_name}_metadata.json"
+
+
+def _count_rows(batch: dict[str, list[str | float]]) -> int:
+    return len(next(iter(batch.values()), []))
+
+
+def generate_character_data(
+    character: Character, base_dir: Path, options: OutputOptions
+) -> CharacterResult:
+    """
+    Simulate a character and write its data to base_dir/<character>/.
+
+    Args:
+        character: Character to simulate
+        base_dir: Directory containing one subdirectory per character
+        options: Output formats, normalization and profiling settings
+
+    Returns:
+        Result recording whether any output file content changed, with
+        metrics for the simulate and serialize stages
+    """
+    character_name = get_character_name(character)
+    stages: list[StageMetrics] = []
+
+    # Create character-specific directory
+    (base_dir / character_name).mkdir(parents=True, exist_ok=True)
+
+    with profile_to(options.profile_dir, character_name), ExitStack() as stack:
+        # Batches are simulated lazily while they are written, so the time
+        # spent producing them is split out of the serialize stage
+        simulate = StageMetrics("simulate")
+        with measure_stage(stages, "serialize") as serialize:
+            metadata_path = get_metadata_path(base_dir, character_name)
+            written = write_bytes_if_changed(
+                output_metadata_json(character), metadata_path
+            )
+
+            outputs = {
+                get_output_path(base_dir, character_name, output_format): (
+                    get_output_backend(output_format)
+                )
+                for output_format in options.output_formats
+            }
+            journal = None
+            if (
+                options.checkpoint
+                and options.cache_dir is not None
+                and character.sweep_axes()
+            ):
+                journal = CheckpointJournal(
+                    options.cache_dir / "checkpoints",
+                    character_name,
+                    compute_character_hash(character),
+                    sweep_rows(character),
+                )
+            batches = iter_output_batches(
+                character,
+                include_metadata=not options.normalize,
+                batches=(
+                    iter_checkpointed_batches(character, journal, resume=options.resume)
+                    if journal is not None
+                    else None
+                ),
+            )
+            # Downsample the series while they stream past
+            lod_x_column = options.lod_x_column(character)
+            lod = None
+            if lod_x_column is not None:
+                lod = stack.enter_context(
+                    LodWriter(
+                        sweep_rows(character),
+                        lod_x_column,
+                        character.lod_breakpoints(options.cache_dir),
+                        options.lod_tiers,
+                        exclude=character.output_metadata(),
+                    )
+                )
+                batches = lod.collect(batches)
+            written |= write_batches_if_changed(
+                measure_iteration(batches, simulate, _count_rows), outputs
+            )
+            output_paths = [metadata_path, *outputs]
+
+        if lod is not None:
+            with measure_stage(stages, "downsample") as downsample:
+                lod_written, lod_paths = lod.write(
+                    base_dir / character_name, character_name
+                )
+                downsample.rows = lod.total_rows
+            written |= lod_written
+            output_paths += lod_paths
+
+    if journal is not None:
+        if journal.resumed_rows:
+            logger.info(
+                f"{character_name}: resumed {journal.resumed_rows} of "
+                f"{journal.rows} rows from checkpoint"
+            )
+        # Every output is written, so the chunks are no longer needed
+        journal.clear()
+
+    serialize.wall_s -= simulate.wall_s
+    serialize.cpu_s -= simulate.cpu_s
+    serialize.rows = simulate.rows
+    stages.insert(0, simulate)
+
+    status = OutputStatus.WRITTEN if written else OutputStatus.UNCHANGED
+    return CharacterResult(character_name, status, output_paths, stages=stages)
+
+
+def run_character(
+    character: Character, base_dir: Path, options: OutputOptions
+) -> CharacterResult:
+    """
+    Generate a character's data, recording any failure in the result instead
+    of raising, so one broken character does not stop the others.
+    """
+    try:
+        return generate_character_data(character, base_dir, options)
+    except Exception as e:
+        logger.debug(f"{get_character_name(character)} failed", exc_info=True)
+        return _failed_result(character, e)
+
+
+def _failed_result(character: Character, e: BaseException) -> CharacterResult:
+    return CharacterResult(
+        get_character_name(character),
+        OutputStatus.FAILED,
+        error=f"{type(e).__name__}: {e}",
+    )
+
+
+def run_pipeline(
+    characters: list[Character],
+    base_dir: Path,
+    max_workers: int | None = None,
+    manifest_path: Path | None = None,
+    force: bool = False,
+    options: OutputOptions | None = None,
+) -> list[CharacterResult]:
+    """
+    Generate data for every character, optionally across a process pool.
+
+    A failure for one character, including a crashed worker process, is
+    recorded in its result and does not stop the others.
+
+    When a manifest is given, characters whose source and constants hash to
+    the value recorded for their last successful build, written with the
+    same output formats, normalization and LOD tiers, are skipped.
+
+    Args:
+        characters: Characters to simulate
+        base_dir: Directory containing one subdirectory per character
+        max_workers: Worker processes to use; 1 runs in-process, None uses
+            one worker per CPU
+        manifest_path: JSON build manifest used for incremental regeneration
+        force: Regenerate every character even if its hash is unchanged
+        options: Output formats, normalization and profiling settings
+
+    Returns:
+        One result per character, in the same order as characters
+    """
+    base_dir.mkdir(parents=True, exist_ok=True)
+    options = options or OutputOptions()
+
+    # Fail fast on unknown formats before any simulation work
+    for output_format in options.output_formats:
+        get_output_backend(output_format)
+
+    manifest = BuildManifest(manifest_path) if manifest_path is not None else None
+    build_keys = [
+        options.build_key(compute_character_hash(character)) for character in characters
+    ]
+
+    results: dict[int, CharacterResult] = {}
+    pending: list[int] = []
+    for i, character in enumerate(characters):
+        character_name = get_character_name(character)
+        output_paths = [get_metadata_path(base_dir, character_name)] + [
+            get_output_path(base_dir, character_name, output_format)
+            for output_format in options.output_formats
+        ]
+        if options.lod_x_column(character) is not None:
+            output_paths.append(
+                get_lod_index_path(base_dir / character_name, character_name)
+            )
+        if (
+            not force
+            and manifest is not None
+            and manifest.is_up_to_date(character_name, build_keys[i])
+            and all(path.exists() for path in output_paths)
+        ):
+            results[i] = CharacterResult(
+                character_name, OutputStatus.SKIPPED, output_paths
+            )
+        else:
+            pending.append(i)
+
+    if max_workers == 1:
+        for i in pending:
+            results[i] = run_character(characters[i], base_dir, options)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures: dict[int, Future[CharacterResult]] = {
+                i: executor.submit(run_character, characters[i], base_dir, options)
+                for i in pending
+            }
+
+            for i, future in futures.items():
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # The character never reached run_character's handler,
+                    # e.g. it could not be pickled or its worker process died
+                    logger.debug(
+                        f"{get_character_name(characters[i])} failed", exc_info=True
+                    )
+                    results[i] = _failed_result(characters[i], e)
+
+    if manifest is not None:
+        for i in pending:
+            if results[i].ok:
+                manifest.update(results[i].character_name, build_keys[i])
+        manifest.save()
+
+    return [results[i] for i in range(len(characters))]
@@ -0,0 +1,476 @@
+import argparse
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.castorice import Castorice
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import Columns
+from simulations.sweep import iter_grid_chunks, value_range
+
+logger = get_default_logger()
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL_S = 600.0
+# Largest grid a single query may ask for, to keep responses interactive
+MAX_QUERY_ROWS = 1_000_000
+# Largest range of a query solving one Markov rotation per value
+MAX_MARKOV_QUERY_ROWS = 1_000
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    A parameterized simulation the service can answer.
+
+    Args:
+        parse: Turns URL query parameters into keyword arguments for run,
+            filling in defaults; raises ValueError on bad input
+        run: Runs the simulation; must be a module-level function so it can
+            be sent to a worker process
+    """
+
+    parse: Callable[[Mapping[str, str]], dict[str, Any]]
+    run: Callable[..., Columns]
+
+
+def _float_param(params: Mapping[str, str], name: str, default: float) -> float:
+    if name not in params:
+        return default
+    try:
+        value = float(params[name])
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    return value
+
+
+def _bool_param(params: Mapping[str, str], name: str) -> bool | None:
+    if name not in params:
+        return None
+    value = params[name].lower()
+    if value in ("1", "true"):
+        return True
+    if value in ("0", "false"):
+        return False
+    raise ValueError(f"{name} must be true or false")
+
+
+def _range_params(
+    params: Mapping[str, str],
+    prefix: str,
+    start: float,
+    end: float,
+    step: float,
+) -> dict[str, float]:
+    """Parse <prefix>_start, <prefix>_end and <prefix>_step as a value_range."""
+    values = {
+        f"{prefix}_start": _float_param(params, f"{prefix}_start", start),
+        f"{prefix}_end": _float_param(params, f"{prefix}_end", end),
+        f"{prefix}_step": _float_param(params, f"{prefix}_step", step),
+    }
+    low, high, spacing = values.values()
+    if spacing <= 0:
+        raise ValueError(f"{prefix}_step must be positive")
+    if high < low:
+        raise ValueError(f"{prefix}_end must not be below {prefix}_start")
+    if (high - low) / spacing + 1 > MAX_QUERY_ROWS:
+        raise ValueError(f"{prefix} range exceeds {MAX_QUERY_ROWS:,} values")
+    return values
+
+
+def parse_ruan_mei(params: Mapping[str, str]) -> dict[str, Any]:
+    return {
+        **_range_params(
+            params,
+            "break_effect",
+            RuanMei.START_BREAK_EFFECT,
+            RuanMei.END_BREAK_EFFECT,
+            RuanMei.BREAK_EFFECT_STEP,
+        ),
+        "base_skill_dmg_increase": _float_param(
+            params, "base_skill_dmg_increase", RuanMei.BASE_SKILL_DMG_MULT
+        ),
+        "team_dmg_buff": _float_param(params, "team_dmg_buff", 0.0),
+    }
+
+
+def run_ruan_mei(
+    break_effect_start: float,
+    break_effect_end: float,
+    break_effect_step: float,
+    base_skill_dmg_increase: float,
+    team_dmg_buff: float,
+) -> Columns:
+    sweep = RuanMei().sweep_skill_dmg(
+        value_range(break_effect_start, break_effect_end, break_effect_step),
+        base_skill_dmg_increase,
+        team_dmg_buff,
+    )
+    return {column: values.tolist() for column, values in sweep.items()}
+
+
+def parse_castorice(params: Mapping[str, str]) -> dict[str, Any]:
+    heal_amount = _float_param(params, "heal_amount", Castorice.GALLAGHER_HEAL_AMOUNT)
+    if heal_amount < 0:
+        raise ValueError("heal_amount must not be negative")
+    hp_range = _range_params(
+        params,
+        "combined_allies_hp",
+        Castorice.MIN_COMBINED_ALLIES_HP,
+        Castorice.MAX_COMBINED_ALLIES_HP,
+        Castorice.COMBINED_ALLIES_HP_STEP,
+    )
+    if hp_range["combined_allies_hp_start"] < Castorice.CASTORICE_BASE_HP:
+        raise ValueError(
+            "combined_allies_hp_start must be at least Castorice's base HP "
+            f"({Castorice.CASTORICE_BASE_HP})"
+        )
+    return {**hp_range, "heal_amount": heal_amount}
+
+
+def run_castorice(
+    combined_allies_hp_start: float,
+    combined_allies_hp_end: float,
+    combined_allies_hp_step: float,
+    heal_amount: float,
+) -> Columns:
+    combined_allies_hp = value_range(
+        combined_allies_hp_start, combined_allies_hp_end, combined_allies_hp_step
+    )
+    skill_counts, heal_counts = Castorice().simulate_combined_hp_batch(
+        combined_allies_hp, heal_amount
+    )
+    return {
+        "combined_allies_hp": combined_allies_hp.tolist(),
+        "skill_count_before_getting_ult": skill_counts.tolist(),
+        "heal_count_before_getting_ult": heal_counts.tolist(),
+    }
+
+
+def parse_anaxa(params: Mapping[str, str]) -> dict[str, Any]:
+    return {name: _bool_param(params, name) for name in Anaxa.FLAG_NAMES}
+
+
+def run_anaxa(**flags: bool | None) -> Columns:
+    # Flags left out of the query are swept over both values
+    axes = {
+        name: np.array([False, True] if flag is None else [flag])
+        for name, flag in flags.items()
+    }
+    anaxa = Anaxa()
+    columns: Columns = {}
+    for params in iter_grid_chunks(axes):
+        for column, values in {**params, **anaxa.evaluate_sweep(params)}.items():
+            columns.setdefault(column, []).extend(values.tolist())
+    return columns
+
+
+def parse_anaxa_e4(params: Mapping[str, str]) -> dict[str, Any]:
+    chance_range = _range_params(params, "ally_skill_point_chance", 0.0, 1.0, 0.05)
+    if chance_range["ally_skill_point_chance_start"] < 0 or (
+        chance_range["ally_skill_point_chance_end"] > 1
+    ):
+        raise ValueError("ally_skill_point_chance must be between 0 and 1")
+    low, high, spacing = chance_range.values()
+    if (high - low) / spacing + 1 > MAX_MARKOV_QUERY_ROWS:
+        raise ValueError(
+            f"ally_skill_point_chance range exceeds {MAX_MARKOV_QUERY_ROWS:,} values"
+        )
+    crit_rate = _float_param(params, "crit_rate", 0.0)
+    if not 0 <= crit_rate <= 1:
+        raise ValueError("crit_rate must be between 0 and 1")
+    crit_dmg = _float_param(params, "crit_dmg", 0.0)
+    if crit_dmg < 0:
+        raise ValueError("crit_dmg must not be negative")
+    return {**chance_range, "crit_rate": crit_rate, "crit_dmg": crit_dmg}
+
+
+def run_anaxa_e4(
+    ally_skill_point_chance_start: float,
+    ally_skill_point_chance_end: float,
+    ally_skill_point_chance_step: float,
+    crit_rate: float,
+    crit_dmg: float,
+) -> Columns:
+    # Each chance is one small Markov solve, so the range is evaluated point
+    # by point
+    chances = value_range(
+        ally_skill_point_chance_start,
+        ally_skill_point_chance_end,
+        ally_skill_point_chance_step,
+    )
+    anaxa = Anaxa()
+    return {
+        "ally_skill_point_chance": chances.tolist(),
+        "dmg_increased_from_e4": [
+            anaxa.calculate_dmg_increased_from_e4_stochastic(
+                float(chance), crit_rate, crit_dmg
+            )
+            for chance in chances
+        ],
+    }
+
+
+QUERIES: dict[str, Query] = {
+    "ruanmei": Query(parse_ruan_mei, run_ruan_mei),
+    "castorice": Query(parse_castorice, run_castorice),
+    "anaxa": Query(parse_anaxa, run_anaxa),
+    "anaxa_e4": Query(parse_anaxa_e4, run_anaxa_e4),
+}
+
+
+def run_query(name: str, kwargs: dict[str, Any]) -> Columns:
+    """Run a registered query; the entry point for worker processes."""
+    return QUERIES[name].run(**kwargs)
+
+
+class ResultCache:
+    """
+    Least-recently-used cache whose entries also expire after a fixed time.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+        ttl_s: Seconds an entry stays valid, or None to never expire
+        clock: Monotonic time source, in seconds
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttl_s: float | None = DEFAULT_CACHE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Columns]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Columns | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Columns) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = math.inf if self.ttl_s is None else self.clock() + self.ttl_s
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class QueryService:
+    """
+    Answers queries from the cache, sharing one run between identical
+    concurrent queries and sending the simulation to an executor.
+
+    Args:
+        executor: Runs simulations, e.g. a process pool; None uses the event
+            loop's default thread pool
+        cache: Cache of finished results
+    """
+
+    def __init__(self, executor: Executor | None, cache: ResultCache) -> None:
+        self.executor = executor
+        self.cache = cache
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self._in_flight: dict[Hashable, asyncio.Future[Columns]] = {}
+
+    async def query(self, name: str, params: Mapping[str, str]) -> dict[str, Any]:
+        """
+        Answer a query for a registered character.
+
+        Args:
+            name: Key of QUERIES
+            params: URL query parameters
+
+        Returns:
+            Parsed parameters, row count and result columns
+        """
+        if name not in QUERIES:
+            raise KeyError(name)
+        kwargs = QUERIES[name].parse(params)
+        key = (name, tuple(sorted(kwargs.items())))
+
+        columns = self.cache.get(key)
+        if columns is not None:
+            self.stats["hits"] += 1
+        elif key in self._in_flight:
+            self.stats["coalesced"] += 1
+            columns = await asyncio.shield(self._in_flight[key])
+        else:
+            self.stats["misses"] += 1
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, run_query, name, kwargs
+            )
+            self._in_flight[key] = future
+            # Finish in a callback so the result is cached even if every
+            # waiting client disconnects first
+            future.add_done_callback(functools.partial(self._finish, key))
+            columns = await asyncio.shield(future)
+
+        rows = len(next(iter(columns.values()), []))
+        return {"query": name, "params": kwargs, "rows": rows, "columns": columns}
+
+    def _finish(self, key: Hashable, future: "asyncio.Future[Columns]") -> None:
+        del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            self.stats["errors"] += 1
+        else:
+            self.cache.put(key, future.result())
+
+    async def handle(self, method: str, target: str) -> tuple[int, Any]:
+        """Route one HTTP request to a status code and JSON body."""
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        path = url.path.rstrip("/")
+        if path == "/queries":
+            return 200, {"queries": sorted(QUERIES)}
+        if path == "/stats":
+            return 200, {**self.stats, "cached": len(self.cache)}
+        if path.startswith("/query/"):
+            name = path.removeprefix("/query/")
+            if name not in QUERIES:
+                return 404, {"error": f"unknown query '{name}'"}
+            try:
+                return 200, await self.query(name, params)
+            except ValueError as e:
+                return 400, {"error": str(e)}
+            except Exception as e:
+                logger.exception(f"Query {name} failed")
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+        return 404, {"error": f"no route for {url.path}"}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a single HTTP/1.1 request, then close the connection."""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # Skip the headers; queries are fully described by the URL
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            if len(request_line) != 3:
+                status, body = 400, {"error": "malformed request line"}
+            else:
+                status, body = await self.handle(request_line[0], request_line[1])
+
+            payload = json.dumps(body).encode()
+            writer.write(
+                (
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    "Access-Control-Allow-Origin: *\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + payload
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_workers: int | None = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    cache_ttl_s: float | None = DEFAULT_CACHE_TTL_S,
+) -> None:
+    """Run the query service until cancelled."""
+    # Spawned workers do not inherit the server's client sockets, which would
+    # otherwise stay open in forked workers and keep responses from ending
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        service = QueryService(executor, ResultCache(cache_size, cache_ttl_s))
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        logger.info(f"Serving queries {sorted(QUERIES)} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve on-demand character simulations over local HTTP."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Simulation worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Query results kept in memory",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL_S,
+        help="Seconds a cached result stays valid; 0 disables expiry",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                args.workers,
+                args.cache_size,
+                args.cache_ttl or None,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.info("Query service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import importlib
+
+from simulations.characters.base_character import Character
+
+# Character name to "module:ClassName"; modules are only imported when selected
+CHARACTERS: dict[str, str] = {
+    "hyacine": "simulations.characters.remembrance.hyacine:Hyacine",
+    "castorice": "simulations.characters.remembrance.castorice:Castorice",
+    "ruanmei": "simulations.characters.harmony.ruan_mei:RuanMei",
+    "anaxa": "simulations.characters.erudition.anaxa:Anaxa",
+}
+
+
+def load_character_class(name: str) -> type[Character]:
+    """
+    Import and return a registered character class.
+
+    Args:
+        name: Registered character name, e.g. 'castorice'
+
+    Returns:
+        Character subclass
+    """
+    try:
+        target = CHARACTERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown character '{name}', expected one of {sorted(CHARACTERS)}"
+        ) from None
+
+    module_name, class_name = target.split(":")
+    character_class: type[Character] = getattr(
+        importlib.import_module(module_name), class_name
+    )
+    return character_class
+
+
+def load_characters(names: list[str] | None = None) -> list[Character]:
+    """Instantiate the named characters, or every registered one if None."""
+    return [load_character_class(name)() for name in names or CHARACTERS]
@@ -0,0 +1,133 @@
+import functools
+import itertools
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+# Head, hands, body, feet, planar sphere and link rope
+RELIC_PIECES = 6
+# A 5-star relic has 4 substats with one roll each and upgrades one of them
+# 5 times
+SUBSTATS_PER_PIECE = 4
+SUBSTAT_ROLLS_PER_PIECE = 9
+MAX_ROLLS_PER_SUBSTAT_PER_PIECE = 6
+
+# Value of one substat roll, average of the low, mid and high roll
+SPD_SUBSTAT_ROLL = 2.3
+HP_PERCENT_SUBSTAT_ROLL = 0.03888
+EFFECT_RES_SUBSTAT_ROLL = 0.03888
+BREAK_EFFECT_SUBSTAT_ROLL = 0.05832
+
+# Fully upgraded 5-star main stats
+HP_PERCENT_MAIN_STAT = 0.432
+OUTGOING_HEALING_MAIN_STAT = 0.3456
+BREAK_EFFECT_MAIN_STAT = 0.648
+ENERGY_REGEN_RATE_MAIN_STAT = 0.1944
+
+
+def substat_roll_axis() -> npt.NDArray[np.int64]:
+    """Every possible number of rolls into a single substat."""
+    return np.arange(RELIC_PIECES * MAX_ROLLS_PER_SUBSTAT_PER_PIECE + 1)
+
+
+def _piece_roll_options(can_roll: tuple[bool, ...]) -> list[tuple[int, ...]]:
+    # Rolls one piece can put into each wanted substat. A substat the piece
+    # has starts with one roll, and the piece's upgrades go to any of its
+    # substats, so k wanted substats share at most k + upgrades rolls
+    upgrades = SUBSTAT_ROLLS_PER_PIECE - SUBSTATS_PER_PIECE
+    ranges = [
+        range(MAX_ROLLS_PER_SUBSTAT_PER_PIECE + 1) if allowed else range(1)
+        for allowed in can_roll
+    ]
+    options = []
+    for rolls in itertools.product(*ranges):
+        present = sum(1 for r in rolls if r > 0)
+        if present <= SUBSTATS_PER_PIECE and sum(rolls) <= present + upgrades:
+            options.append(rolls)
+    return options
+
+
+@functools.cache
+def feasible_roll_table(
+    pieces: tuple[tuple[bool, ...], ...],
+) -> npt.NDArray[np.bool_]:
+    """
+    Which combinations of substat rolls some set of relics can reach.
+
+    Built piece by piece: the combinations reachable with one more piece are
+    those reachable without it, shifted by each way that piece can roll.
+
+    Args:
+        pieces: For each relic piece, whether it can roll each wanted
+            substat; False where the substat is the piece's main stat
+
+    Returns:
+        Read-only boolean array indexed by the rolls into each wanted
+        substat, with RELIC_PIECES * MAX_ROLLS_PER_SUBSTAT_PER_PIECE + 1
+        entries per axis
+    """
+    size = RELIC_PIECES * MAX_ROLLS_PER_SUBSTAT_PER_PIECE + 1
+    stat_count = len(pieces[0]) if pieces else 0
+    reachable = np.zeros((size,) * stat_count, dtype=np.bool_)
+    reachable[(0,) * stat_count] = True
+    for can_roll in pieces:
+        shifted = np.zeros_like(reachable)
+        for rolls in _piece_roll_options(can_roll):
+            target = tuple(slice(r, None) for r in rolls)
+            source = tuple(slice(None, size - r) for r in rolls)
+            shifted[target] |= reachable[source]
+        reachable = shifted
+    reachable.flags.writeable = False
+    return reachable
+
+
+def substat_rolls_feasible(
+    rolls: Sequence[npt.NDArray[np.int64]],
+    can_roll: Sequence[Sequence[npt.ArrayLike]],
+) -> npt.NDArray[np.bool_]:
+    """
+    Whether builds' substat rolls fit on their relics.
+
+    Each piece has SUBSTATS_PER_PIECE substats with one roll each, plus
+    upgrades for any of them, and never has its main stat as a substat.
+
+    Args:
+        rolls: Rolls into each wanted substat, one 1-D array per substat
+        can_roll: For each relic piece, whether it can roll each wanted
+            substat, as booleans broadcast against the rolls
+
+    Returns:
+        Whether each build is feasible
+    """
+    rolls_array = np.stack(np.broadcast_arrays(*rolls))
+    builds = rolls_array.shape[1]
+    flags = np.array(
+        [
+            [
+                np.broadcast_to(np.asarray(value, dtype=np.bool_), builds)
+                for value in piece
+            ]
+            for piece in can_roll
+        ]
+    )
+    # Group builds by which pieces can roll which substats, i.e. by their
+    # main stats, encoded as one bit per piece and substat
+    bits = flags.reshape(-1, builds)
+    codes = np.left_shift(1, np.arange(len(bits)), dtype=np.int64) @ bits
+    layouts, layout_index = np.unique(codes, return_inverse=True)
+
+    feasible = np.zeros(builds, dtype=np.bool_)
+    for i, code in enumerate(layouts.tolist()):
+        # The order of the pieces does not matter, so sort it for the cache
+        pieces = tuple(
+            sorted(
+                tuple(
+                    bool((code >> (p * len(rolls) + k)) & 1) for k in range(len(rolls))
+                )
+                for p in range(len(can_roll))
+            )
+        )
+        rows = layout_index == i
+        feasible[rows] = feasible_roll_table(pieces)[tuple(rolls_array[:, rows])]
+    return feasible
@@ -0,0 +1,267 @@
+import math
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.characters.base_character import Character
+from simulations.output_backends import Columns, _import_pyarrow
+from simulations.sweep import DEFAULT_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns start on cache-line boundaries
+COLUMN_ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class StoreLayout:
+    """
+    Where each column of a result store lives; small enough to send to workers.
+
+    Args:
+        rows: Number of rows in every column
+        columns: Name, NumPy dtype string and byte offset of each column
+        nbytes: Total size of the buffer
+        shm_name: Name of the shared memory block, if backed by one
+        path: File of the memory map, if backed by one
+    """
+
+    rows: int
+    columns: tuple[tuple[str, str, int], ...]
+    nbytes: int
+    shm_name: str | None = None
+    path: Path | None = None
+
+    @classmethod
+    def for_columns(
+        cls, dtypes: dict[str, np.dtype[Any]], rows: int, path: Path | None = None
+    ) -> "StoreLayout":
+        """Lay out one aligned block per column, in the given order."""
+        columns = []
+        offset = 0
+        for name, dtype in dtypes.items():
+            if dtype.kind not in "biuf":
+                raise ValueError(f"Column '{name}' has non-numeric dtype {dtype}")
+            offset += -offset % COLUMN_ALIGNMENT
+            columns.append((name, dtype.str, offset))
+            offset += dtype.itemsize * rows
+        return cls(rows, tuple(columns), max(offset, 1), path=path)
+
+
+class ResultStore:
+    """
+    Preallocated typed columns in shared memory or a memory-mapped file.
+
+    Worker processes attach to the same buffer by layout and write their rows
+    in place, so results never travel back through pickling. Use the store as
+    a context manager; the process that created it frees the buffer on exit.
+
+    Args:
+        layout: Column layout; its shm_name or path locates the buffer
+        create: Allocate the buffer rather than attach to an existing one
+    """
+
+    def __init__(self, layout: StoreLayout, create: bool = False) -> None:
+        self._shm: shared_memory.SharedMemory | None = None
+        self._mmap: np.memmap[Any, np.dtype[np.uint8]] | None = None
+        self._owner = create
+
+        buffer: Any
+        if layout.path is not None:
+            self._mmap = np.memmap(
+                layout.path,
+                dtype=np.uint8,
+                mode="w+" if create else "r+",
+                shape=(layout.nbytes,),
+            )
+            buffer = self._mmap
+        elif create:
+            self._shm = shared_memory.SharedMemory(create=True, size=layout.nbytes)
+            layout = StoreLayout(
+                layout.rows, layout.columns, layout.nbytes, shm_name=self._shm.name
+            )
+            buffer = self._shm.buf
+        else:
+            # Attached workers must not unlink the parent's block on exit
+            self._shm = shared_memory.SharedMemory(name=layout.shm_name, track=False)
+            buffer = self._shm.buf
+
+        self.layout = layout
+        self.columns: dict[str, npt.NDArray[Any]] = {
+            name: np.ndarray(
+                layout.rows, dtype=np.dtype(dtype), buffer=buffer, offset=offset
+            )
+            for name, dtype, offset in layout.columns
+        }
+
+    @classmethod
+    def create(
+        cls, dtypes: dict[str, np.dtype[Any]], rows: int, path: Path | None = None
+    ) -> "ResultStore":
+        """
+        Allocate a store for rows of the given columns.
+
+        Args:
+            dtypes: Column name to dtype
+            rows: Number of rows to preallocate
+            path: Back the store with a memory-mapped file here instead of
+                shared memory, e.g. for sweeps larger than RAM
+        """
+        return cls(StoreLayout.for_columns(dtypes, rows, path), create=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release this process's views; the creator also frees shared memory.
+
+        DataFrames and tables from to_dataframe or to_arrow share the buffer,
+        so drop them first; shared memory cannot close while they are alive.
+        """
+        # Views must go before the buffer they point into can be closed
+        self.columns = {}
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+
+    def write(self, start: int, chunk: dict[str, npt.NDArray[Any]]) -> None:
+        """Copy a chunk of columns into rows start, start + 1, ..."""
+        for name, values in chunk.items():
+            self.columns[name][start : start + len(values)] = values
+
+    def iter_batches(self, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Columns]:
+        """Stream the rows as lists in bounded batches, for the batch writers."""
+        for start in range(0, self.layout.rows, batch_size):
+            yield {
+                name: values[start : start + batch_size].tolist()
+                for name, values in self.columns.items()
+            }
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """Wrap the columns as a DataFrame without copying them."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, copy=False)
+
+    def to_arrow(self) -> Any:
+        """
+        Wrap the columns as a pyarrow Table.
+
+        Numeric columns share the store's buffer; Arrow packs booleans into
+        bits, so bool columns are copied.
+        """
+        pa = _import_pyarrow()
+        return pa.table(
+            {name: pa.array(values) for name, values in self.columns.items()}
+        )
+
+
+def sweep_dtypes(character: Character) -> dict[str, np.dtype[Any]]:
+    """Column dtypes of a character's sweep, from evaluating its first point."""
+    first = next(character.iter_sweep(chunk_size=1), None)
+    if first is None:
+        raise ValueError(f"{character.__class__.__name__} declares no sweep axes")
+    return {name: values.dtype for name, values in first.items()}
+
+
+def sweep_rows(character: Character) -> int:
+    return math.prod(
+        len(np.atleast_1d(np.asarray(values)))
+        for values in character.sweep_axes().values()
+    )
+
+
+def fill_shard(
+    character: Character,
+    layout: StoreLayout,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Evaluate one shard of a character's sweep straight into a result store.
+
+    Shards are the contiguous row ranges iter_sweep yields, so each lands at
+    its own offset and workers never overlap.
+
+    Returns:
+        Number of rows written
+    """
+    start = layout.rows * shard_index // shard_count
+    position = start
+    with ResultStore(layout) as store:
+        for chunk in character.iter_sweep(chunk_size, shard_index, shard_count):
+            store.write(position, chunk)
+            position += len(next(iter(chunk.values())))
+    return position - start
+
+
+def run_shared_sweep(
+    character: Character,
+    shard_count: int = 1,
+    max_workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    path: Path | None = None,
+) -> ResultStore:
+    """
+    Evaluate a character's sweep into a result store, across worker processes.
+
+    Args:
+        character: Character declaring sweep_axes
+        shard_count: Number of contiguous shards to split the grid into
+        max_workers: Worker processes to use; 1 runs in-process, None uses
+            one per CPU
+        chunk_size: Maximum grid points evaluated at once per worker
+        path: Back the store with a memory-mapped file here
+
+    Returns:
+        The filled store; close it (or use it as a context manager) when done
+    """
+    rows = sweep_rows(character)
+    store = ResultStore.create(sweep_dtypes(character), rows, path)
+    try:
+        if max_workers == 1:
+            written = [
+                fill_shard(character, store.layout, i, shard_count, chunk_size)
+                for i in range(shard_count)
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                written = list(
+                    executor.map(
+                        fill_shard,
+                        [character] * shard_count,
+                        [store.layout] * shard_count,
+                        range(shard_count),
+                        [shard_count] * shard_count,
+                        [chunk_size] * shard_count,
+                    )
+                )
+        if sum(written) != rows:
+            raise RuntimeError(f"Sweep wrote {sum(written)} of {rows} rows")
+    except BaseException:
+        store.close()
+        raise
+    return store
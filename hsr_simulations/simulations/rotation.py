@@ -0,0 +1,57 @@
+from collections.abc import Callable, Hashable
+
+# A rotation step takes the current state and returns the next state together
+# with the damage dealt during that cycle.
+type RotationStep[State] = Callable[[State], tuple[State, float]]
+
+
+def solve_rotation[State: Hashable](
+    initial_state: State,
+    step: RotationStep[State],
+    total_cycles: int | None = None,
+) -> float:
+    """
+    Evaluate a deterministic rotation by detecting its repeating cycle.
+
+    The rotation is stepped until a state repeats. Everything after that point
+    is periodic, so the damage over any horizon follows from the prefix and a
+    single period, in O(prefix + period) steps instead of O(total_cycles).
+
+    Args:
+        initial_state: Hashable state before the first cycle
+        step: Function mapping a state to (next state, damage dealt this cycle)
+        total_cycles: Number of cycles to evaluate, or None for infinite horizon
+
+    Returns:
+        Total damage over total_cycles, or the long-run damage per cycle when
+        total_cycles is None
+    """
+    if total_cycles is not None and total_cycles < 0:
+        raise ValueError("total_cycles must be non-negative")
+
+    seen: dict[State, int] = {}
+    cumulative_dmg: list[float] = [0.0]
+    state = initial_state
+
+    while state not in seen:
+        cycle = len(cumulative_dmg) - 1
+        if total_cycles is not None and cycle == total_cycles:
+            return cumulative_dmg[cycle]
+
+        seen[state] = cycle
+        state, dmg = step(state)
+        cumulative_dmg.append(cumulative_dmg[cycle] + dmg)
+
+    cycle_start = seen[state]
+    cycle_length = len(cumulative_dmg) - 1 - cycle_start
+    cycle_dmg = cumulative_dmg[-1] - cumulative_dmg[cycle_start]
+
+    if total_cycles is None:
+        return cycle_dmg / cycle_length
+
+    full_cycles, remainder = divmod(total_cycles - cycle_start, cycle_length)
+    return (
+        cumulative_dmg[cycle_start]
+        + full_cycles * cycle_dmg
+        + (cumulative_dmg[cycle_start + remainder] - cumulative_dmg[cycle_start])
+    )
@@ -0,0 +1,150 @@
+from typing import Self
+
+import numpy as np
+import numpy.typing as npt
+
+
+class StatusStacks:
+    """
+    Timed stacks of one status effect, e.g. an ATK buff, on many entities.
+
+    Every entity has its own turn counter, stack cap and duration, and a
+    fixed number of slots holding the turn each of its stacks expires, all in
+    arrays allocated up front. A stack is active while its expiry is after
+    the entity's current turn, so ticking only advances the counters and
+    stacks expire without being touched. Every operation works on all
+    entities at once and allocates nothing per stack.
+
+    A stack applied on turn t with duration d stays active through turn
+    t + d - 1, like a list of remaining turns decremented at the end of each
+    turn and pruned of zeros at the start of the next. Read the counts before
+    applying a turn's new stacks to see only those from earlier turns.
+
+    Args:
+        entities: Number of independently simulated entities
+        max_stacks: Stacks an entity can hold at once, scalar or per entity
+        duration: Turns a stack lasts, counting the turn it is applied on,
+            scalar or per entity
+        refresh: When an entity is at max_stacks, replace its oldest stack
+            instead of ignoring the new one
+    """
+
+    __slots__ = ("_expiry", "_turn", "duration", "max_stacks", "refresh")
+
+    def __init__(
+        self,
+        entities: int,
+        max_stacks: npt.ArrayLike,
+        duration: npt.ArrayLike,
+        refresh: bool = False,
+    ) -> None:
+        self.max_stacks = np.array(
+            np.broadcast_to(max_stacks, (entities,)), dtype=np.int64
+        )
+        self.duration = np.array(np.broadcast_to(duration, (entities,)), dtype=np.int64)
+        if (self.max_stacks < 1).any() or (self.duration < 1).any():
+            raise ValueError("max_stacks and duration must be at least 1")
+        self.refresh = refresh
+        capacity = int(self.max_stacks.max(initial=1))
+        self._expiry = np.zeros((entities, capacity), dtype=np.int64)
+        self._turn = np.zeros(entities, dtype=np.int64)
+
+    @classmethod
+    def from_codes(
+        cls,
+        codes: npt.ArrayLike,
+        max_stacks: npt.ArrayLike,
+        duration: npt.ArrayLike,
+        refresh: bool = False,
+    ) -> Self:
+        """
+        Entities whose stacks have the remaining turns encoded by codes.
+
+        Args:
+            codes: State of each entity, as returned by codes(); any order of
+                the remaining turns is accepted
+            max_stacks, duration, refresh: As for the constructor
+
+        Returns:
+            Stacks of one entity per code, all on turn 0
+        """
+        codes = np.atleast_1d(np.asarray(codes, dtype=np.int64))
+        stacks = cls(len(codes), max_stacks, duration, refresh)
+        if ((codes < 0) | (codes >= stacks.code_count)).any():
+            raise ValueError("Codes out of range for max_stacks and duration")
+        base = stacks.code_base
+        for slot in range(stacks._expiry.shape[1]):
+            stacks._expiry[:, slot] = codes // base**slot % base
+        if (stacks.remaining() > stacks.duration[:, np.newaxis]).any():
+            raise ValueError("Codes hold stacks longer than their duration")
+        if (stacks.counts() > stacks.max_stacks).any():
+            raise ValueError("Codes hold more stacks than max_stacks")
+        return stacks
+
+    @property
+    def code_base(self) -> int:
+        """Radix of codes(): one more than the longest duration."""
+        return int(self.duration.max(initial=0)) + 1
+
+    @property
+    def code_count(self) -> int:
+        """Number of distinct values codes() can return."""
+        return int(self.code_base ** self._expiry.shape[1])
+
+    def active(self) -> npt.NDArray[np.bool_]:
+        """Whether each slot holds an active stack, shape (entities, slots)."""
+        return self._expiry > self._turn[:, np.newaxis]
+
+    def counts(self) -> npt.NDArray[np.int64]:
+        """Active stacks of each entity."""
+        return np.asarray(np.count_nonzero(self.active(), axis=1), dtype=np.int64)
+
+    def remaining(self) -> npt.NDArray[np.int64]:
+        """Turns left on each slot's stack, 0 for empty slots."""
+        return np.asarray(
+            np.maximum(self._expiry - self._turn[:, np.newaxis], 0), dtype=np.int64
+        )
+
+    def codes(self) -> npt.NDArray[np.int64]:
+        """
+        One integer per entity identifying the remaining turns of its stacks.
+
+        Entities holding stacks with the same remaining turns, in any slots,
+        get the same code, so the codes can key the state of a rotation.
+        """
+        remaining = np.sort(self.remaining(), axis=1)
+        powers = self.code_base ** np.arange(remaining.shape[1], dtype=np.int64)
+        return np.asarray(remaining @ powers, dtype=np.int64)
+
+    def apply(self, mask: npt.ArrayLike = True) -> None:
+        """
+        Add a stack with the full duration to the entities selected by mask.
+
+        Args:
+            mask: Boolean per entity, or a scalar for all of them
+        """
+        selected = np.broadcast_to(np.asarray(mask, dtype=np.bool_), self._turn.shape)
+        active = self.active()
+        in_cap = np.arange(active.shape[1]) < self.max_stacks[:, np.newaxis]
+        free = ~active & in_cap
+        has_free = free.any(axis=1)
+        slot = np.argmax(free, axis=1)
+        if self.refresh:
+            oldest = np.argmin(
+                np.where(in_cap, self._expiry, np.iinfo(np.int64).max), axis=1
+            )
+            slot = np.where(has_free, slot, oldest)
+        else:
+            selected = selected & has_free
+
+        rows = np.flatnonzero(selected)
+        self._expiry[rows, slot[rows]] = self._turn[rows] + self.duration[rows]
+
+    def tick(self, mask: npt.ArrayLike = True) -> None:
+        """Advance the entities selected by mask by one turn."""
+        self._turn += np.asarray(mask, dtype=np.int64)
+
+    def clear(self, mask: npt.ArrayLike = True) -> None:
+        """Remove every stack from the entities selected by mask, e.g. a dispel."""
+        selected = np.broadcast_to(np.asarray(mask, dtype=np.bool_), self._turn.shape)
+        self._expiry[selected] = 0
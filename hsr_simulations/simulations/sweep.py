@@ -0,0 +1,115 @@
+import math
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def value_range(start: float, end: float, step: float) -> npt.NDArray[np.float64]:
+    """
+    Evenly spaced values from start to end inclusive, free of float drift.
+
+    Values are computed from their index rather than by repeated addition and
+    rounded to 10 decimal places, so e.g. a 0.01 step yields exactly the same
+    floats as writing 1.01, 1.02, ... by hand.
+
+    Args:
+        start: First value
+        end: Last value (included when it lies on the step grid)
+        step: Spacing between values
+
+    Returns:
+        1-D array of values
+    """
+    count = int(np.floor((end - start) / step + 1e-9)) + 1
+    values = np.round(start + np.arange(count) * step, 10)
+    return values
+
+
+def cartesian_grid(**axes: npt.ArrayLike) -> dict[str, npt.NDArray[np.float64]]:
+    """
+    Build the Cartesian product of named parameter axes as flat columns.
+
+    Args:
+        **axes: Axis name to scalar or 1-D array of values
+
+    Returns:
+        Axis name to flattened array, one entry per grid point; the last axis
+        varies fastest
+    """
+    arrays = [
+        np.atleast_1d(np.asarray(values, dtype=np.float64)) for values in axes.values()
+    ]
+    mesh = np.meshgrid(*arrays, indexing="ij")
+    return {name: grid.ravel() for name, grid in zip(axes, mesh, strict=True)}
+
+
+def iter_grid_chunks(
+    axes: Mapping[str, npt.ArrayLike],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    offset: int = 0,
+) -> Iterator[dict[str, npt.NDArray[Any]]]:
+    """
+    Lazily yield the Cartesian product of named axes in bounded chunks.
+
+    Grid points are numbered in the same order as cartesian_grid (last axis
+    fastest) and materialized chunk by chunk from their flat index, so memory
+    stays proportional to chunk_size however large the grid is. Each axis keeps
+    its own dtype.
+
+    Args:
+        axes: Axis name to scalar or 1-D array of values
+        chunk_size: Maximum number of grid points per chunk
+        shard_index: Which contiguous shard of the grid to yield
+        shard_count: Number of shards the grid is split into
+        offset: Grid points at the start of the shard to skip, e.g. those an
+            interrupted run already evaluated
+
+    Yields:
+        Axis name to array of values, one entry per grid point in the chunk
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError("shard_index must be in [0, shard_count)")
+    if not axes:
+        return
+
+    arrays = {name: np.atleast_1d(np.asarray(values)) for name, values in axes.items()}
+    shape = tuple(len(values) for values in arrays.values())
+    total = math.prod(shape)
+
+    start = total * shard_index // shard_count
+    stop = total * (shard_index + 1) // shard_count
+
+    for chunk_start in range(start + offset, stop, chunk_size):
+        yield _grid_points(
+            arrays, shape, chunk_start, min(chunk_start + chunk_size, stop)
+        )
+
+
+def grid_slice(
+    axes: Mapping[str, npt.ArrayLike], start: int, stop: int
+) -> dict[str, npt.NDArray[Any]]:
+    """
+    Grid points start to stop - 1 of the Cartesian product of named axes.
+
+    Points are numbered as in iter_grid_chunks, so any range of the grid can
+    be evaluated on its own, e.g. to redo one chunk of an interrupted sweep.
+    """
+    arrays = {name: np.atleast_1d(np.asarray(values)) for name, values in axes.items()}
+    shape = tuple(len(values) for values in arrays.values())
+    return _grid_points(arrays, shape, start, min(stop, math.prod(shape)))
+
+
+def _grid_points(
+    arrays: dict[str, npt.NDArray[Any]], shape: tuple[int, ...], start: int, stop: int
+) -> dict[str, npt.NDArray[Any]]:
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    return {
+        name: values[index]
+        for (name, values), index in zip(arrays.items(), indices, strict=True)
+    }
@@ -0,0 +1,533 @@
+import argparse
+import heapq
+import itertools
+import math
+import os
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.castorice import Castorice
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.logger_config import get_default_logger
+from simulations.output_backends import Columns, columns_to_csv
+from simulations.sweep import iter_grid_chunks
+
+logger = get_default_logger()
+
+TEAM_SIZE = 4
+DEFAULT_TOP_K = 10
+# Castorice's team HP when scoring her teams, the middle of her sweep
+DEFAULT_COMBINED_ALLIES_HP = 24000
+# Allies without a character model; they only count toward team conditions
+ERUDITION_ALLY = "erudition_ally"
+HEALER_ALLY = "healer_ally"
+
+
+@dataclass(frozen=True)
+class MemberOptions:
+    """
+    Builds a supporting team member can bring and the team effect of each.
+
+    Args:
+        name: Character or filler ally name
+        builds: Label of each build
+        dmg_bonus: DMG% each build adds for the whole team
+        heal_amount: HP each build heals per heal action; the team uses its
+            strongest healer
+        erudition: Whether the member counts as an Erudition character
+    """
+
+    name: str
+    builds: tuple[str, ...]
+    dmg_bonus: npt.NDArray[np.float64]
+    heal_amount: npt.NDArray[np.float64]
+    erudition: bool = False
+
+    def select(self, keep: npt.NDArray[np.int64]) -> "MemberOptions":
+        return MemberOptions(
+            self.name,
+            tuple(self.builds[i] for i in keep),
+            self.dmg_bonus[keep],
+            self.heal_amount[keep],
+            self.erudition,
+        )
+
+
+@dataclass(frozen=True)
+class CarryTable:
+    """
+    Precomputed output of a damage dealer in every team context.
+
+    Args:
+        name: Character name
+        builds: Label of each eidolon/light cone build
+        output: Output relative to the carry's baseline team, shape
+            (erudition count + 1, heal level, build)
+        erudition: Whether the carry counts as an Erudition character
+    """
+
+    name: str
+    builds: tuple[str, ...]
+    output: npt.NDArray[np.float64]
+    erudition: bool = False
+
+
+@dataclass(frozen=True)
+class TeamTables:
+    """Per-character sub-results shared by every team evaluation."""
+
+    carries: dict[str, CarryTable]
+    members: dict[str, MemberOptions]
+    # Sorted heal amounts that CarryTable.output is indexed by
+    heal_levels: npt.NDArray[np.float64]
+
+
+@dataclass(frozen=True)
+class TeamResult:
+    score: float
+    team: tuple[str, ...]
+    builds: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class TeamSearchResult:
+    """
+    Best teams found by search_teams.
+
+    Args:
+        results: Best team builds, highest score first
+        candidates: Team builds in the full combination space
+        evaluated: Team builds actually scored after pruning
+        teams: Team compositions considered
+        pruned_teams: Compositions skipped because their upper bound could
+            not beat the results already found
+    """
+
+    results: list[TeamResult]
+    candidates: int
+    evaluated: int
+    teams: int
+    pruned_teams: int
+
+    def as_columns(self) -> Columns:
+        columns: Columns = {"rank": [], "score": [], "team": [], "builds": []}
+        for rank, result in enumerate(self.results, start=1):
+            columns["rank"].append(rank)
+            columns["score"].append(result.score)
+            columns["team"].append(" + ".join(result.team))
+            columns["builds"].append(
+                "; ".join(
+                    f"{name}: {build}"
+                    for name, build in zip(result.team, result.builds, strict=True)
+                    if build
+                )
+            )
+        return columns
+
+
+def _anaxa_build_label(flags: Sequence[bool]) -> str:
+    names = [
+        name.removeprefix("has_").upper()
+        for name, flag in zip(Anaxa.FLAG_NAMES, flags, strict=True)
+        if flag
+    ]
+    return " ".join(names) or "E0"
+
+
+def build_team_tables(
+    combined_allies_hp: float = DEFAULT_COMBINED_ALLIES_HP,
+) -> TeamTables:
+    """
+    Run each character's model once for every option a team search needs.
+
+    Args:
+        combined_allies_hp: Team HP used for Castorice's Newbud simulation
+
+    Returns:
+        Carry outputs by team context and support options with their effects
+    """
+    ruan_mei = RuanMei()
+    break_effect = np.asarray(ruan_mei.sweep_axes()["break_effect"])
+    hyacine = Hyacine()
+    speed = np.asarray(hyacine.sweep_axes()["speed"])
+    # Hyacine's heals are modeled as Gallagher-sized heals scaled by her
+    # outgoing healing from speed
+    hyacine_heal = Castorice.GALLAGHER_HEAL_AMOUNT * (
+        1 + hyacine.calculate_increased_outgoing_healing(speed)
+    )
+
+    members = {
+        "ruanmei": MemberOptions(
+            "ruanmei",
+            tuple(f"break_effect={value:.2f}" for value in break_effect),
+            ruan_mei.sweep_skill_dmg(break_effect)["total_skill_dmg_increase"],
+            np.zeros(len(break_effect)),
+        ),
+        "hyacine": MemberOptions(
+            "hyacine",
+            tuple(f"speed={value}" for value in speed),
+            np.zeros(len(speed)),
+            hyacine_heal,
+        ),
+        ERUDITION_ALLY: MemberOptions(
+            ERUDITION_ALLY, ("",), np.zeros(1), np.zeros(1), erudition=True
+        ),
+        HEALER_ALLY: MemberOptions(
+            HEALER_ALLY,
+            ("",),
+            np.zeros(1),
+            np.array([float(Castorice.GALLAGHER_HEAL_AMOUNT)]),
+        ),
+    }
+    heal_levels = np.unique(
+        np.concatenate([[0.0], *(member.heal_amount for member in members.values())])
+    )
+    erudition_counts = range(TEAM_SIZE + 1)
+
+    # Anaxa: every eidolon/light cone combination against her E0 damage
+    anaxa = Anaxa()
+    flags = list(itertools.product((False, True), repeat=len(Anaxa.FLAG_NAMES)))
+    flag_columns = np.array(flags).T
+    anaxa_output = (
+        np.stack(
+            [
+                anaxa.calculate_final_dmg_array(
+                    *flag_columns, erudition_char_count=max(count, 1)
+                )
+                for count in erudition_counts
+            ]
+        )
+        / anaxa.calculate_final_dmg()
+    )
+
+    # Castorice: how often she reaches her ultimate, against Gallagher's heals
+    castorice = Castorice()
+    skill_counts, _ = castorice.simulate_combined_hp_batch(
+        np.full(len(heal_levels), float(combined_allies_hp)), heal_levels
+    )
+    baseline_skills, _ = castorice.simulate_combined_hp_batch(
+        np.array([float(combined_allies_hp)])
+    )
+    castorice_output = baseline_skills[0] / skill_counts
+
+    carries = {
+        "anaxa": CarryTable(
+            "anaxa",
+            tuple(_anaxa_build_label(build) for build in flags),
+            np.broadcast_to(
+                anaxa_output[:, None, :],
+                (len(erudition_counts), len(heal_levels), len(flags)),
+            ).copy(),
+            erudition=True,
+        ),
+        "castorice": CarryTable(
+            "castorice",
+            ("E0",),
+            np.broadcast_to(
+                castorice_output[None, :, None],
+                (len(erudition_counts), len(heal_levels), 1),
+            ).copy(),
+        ),
+    }
+    return TeamTables(carries, members, heal_levels)
+
+
+def iter_teams(
+    tables: TeamTables, carries: Iterable[str] | None = None
+) -> Iterable[tuple[str, ...]]:
+    """
+    Every team of one carry and TEAM_SIZE - 1 supports.
+
+    Characters appear at most once per team; filler allies may repeat.
+
+    Args:
+        tables: Team tables listing the carries and supports
+        carries: Carries to build teams around, or None for all of them
+    """
+    supports = sorted(tables.members)
+    for carry in sorted(tables.carries if carries is None else carries):
+        for team in itertools.combinations_with_replacement(supports, TEAM_SIZE - 1):
+            named = [name for name in team if name not in (ERUDITION_ALLY, HEALER_ALLY)]
+            if len(named) == len(set(named)):
+                yield (carry, *team)
+
+
+def effective_heal_levels(
+    carry: CarryTable, heal_levels: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """
+    Smallest heal amount giving the carry the same output as each heal level.
+
+    The output only changes at a few heal amounts (never, for a carry that
+    ignores healing), so heals between two changes are interchangeable.
+    """
+    by_level = carry.output.transpose(1, 0, 2).reshape(len(heal_levels), -1)
+    changed = np.concatenate([[True], np.any(by_level[1:] != by_level[:-1], axis=1)])
+    starts = np.maximum.accumulate(np.where(changed, np.arange(len(heal_levels)), 0))
+    return heal_levels[starts]
+
+
+def prune_options(
+    member: MemberOptions,
+    top_k: int,
+    heal_levels: npt.NDArray[np.float64],
+    effective_heal: npt.NDArray[np.float64],
+) -> MemberOptions:
+    """
+    Drop builds that cannot appear in the top_k results.
+
+    Builds with the same effect as an earlier one are dropped, and so are
+    builds whose effect is matched or beaten by top_k others, since every
+    team score rises with DMG bonus and heal amount.
+
+    Args:
+        member: Builds of one support
+        top_k: Number of results the search keeps
+        heal_levels: Sorted heal amounts of the team tables
+        effective_heal: From effective_heal_levels for the team's carry
+    """
+    heal = effective_heal[np.searchsorted(heal_levels, member.heal_amount)]
+    effects = np.column_stack([member.dmg_bonus, heal])
+    _, first = np.unique(effects, axis=0, return_index=True)
+    first = np.sort(first)
+
+    unique_effects = effects[first]
+    dominated_by = (
+        np.sum(
+            np.all(unique_effects[None, :, :] >= unique_effects[:, None, :], axis=2),
+            axis=1,
+        )
+        - 1
+    )
+    return member.select(first[dominated_by < top_k])
+
+
+def team_upper_bound(tables: TeamTables, team: tuple[str, ...]) -> float:
+    """Best score any build of this team could reach."""
+    carry = tables.carries[team[0]]
+    supports = [tables.members[name] for name in team[1:]]
+    erudition_count = carry.erudition + sum(member.erudition for member in supports)
+    best_heal = max([0.0, *(float(m.heal_amount.max()) for m in supports)])
+    heal_level = int(np.searchsorted(tables.heal_levels, best_heal))
+    best_output = float(carry.output[erudition_count, : heal_level + 1].max())
+    return best_output * (1 + sum(float(m.dmg_bonus.max()) for m in supports))
+
+
+def evaluate_team(
+    tables: TeamTables,
+    team: tuple[str, ...],
+    top_k: int = DEFAULT_TOP_K,
+    threshold: float = -math.inf,
+) -> tuple[list[TeamResult], int]:
+    """
+    Score every remaining build of one team and keep the best top_k.
+
+    Args:
+        tables: Per-character sub-results from build_team_tables
+        team: Carry name followed by support names
+        top_k: Number of results to keep
+        threshold: Results must score above this to be kept
+
+    Returns:
+        Best results, and the number of team builds scored
+    """
+    carry = tables.carries[team[0]]
+    effective_heal = effective_heal_levels(carry, tables.heal_levels)
+    supports = [
+        prune_options(tables.members[name], top_k, tables.heal_levels, effective_heal)
+        for name in team[1:]
+    ]
+    erudition_count = carry.erudition + sum(member.erudition for member in supports)
+    outputs = carry.output[erudition_count]
+
+    axes = {"carry": np.arange(len(carry.builds))}
+    axes |= {f"support_{i}": np.arange(len(m.builds)) for i, m in enumerate(supports)}
+
+    best: list[tuple[float, tuple[int, ...]]] = []
+    evaluated = 0
+    for params in iter_grid_chunks(axes):
+        choices = [params[f"support_{i}"] for i in range(len(supports))]
+        dmg_bonus = sum(
+            (m.dmg_bonus[c] for m, c in zip(supports, choices, strict=True)),
+            start=np.zeros(len(params["carry"])),
+        )
+        heal = np.max(
+            [np.zeros(len(params["carry"]))]
+            + [m.heal_amount[c] for m, c in zip(supports, choices, strict=True)],
+            axis=0,
+        )
+        heal_level = np.searchsorted(tables.heal_levels, heal)
+        scores = outputs[heal_level, params["carry"]] * (1 + dmg_bonus)
+        evaluated += len(scores)
+
+        top = np.argsort(-scores, kind="stable")[:top_k]
+        for i in top[scores[top] > threshold]:
+            best.append(
+                (
+                    float(scores[i]),
+                    tuple(int(params[name][i]) for name in axes),
+                )
+            )
+        best = heapq.nlargest(top_k, best, key=lambda item: item[0])
+
+    members = [carry.builds, *(m.builds for m in supports)]
+    results = [
+        TeamResult(
+            score,
+            team,
+            tuple(builds[i] for builds, i in zip(members, indices, strict=True)),
+        )
+        for score, indices in best
+    ]
+    return results, evaluated
+
+
+# Tables set once per worker process by _init_worker
+_worker_tables: TeamTables | None = None
+
+
+def _init_worker(tables: TeamTables) -> None:
+    global _worker_tables
+    _worker_tables = tables
+
+
+def _evaluate_in_worker(
+    team: tuple[str, ...], top_k: int, threshold: float
+) -> tuple[list[TeamResult], int]:
+    if _worker_tables is None:
+        raise RuntimeError("Worker was started without team tables")
+    return evaluate_team(_worker_tables, team, top_k, threshold)
+
+
+def search_teams(
+    tables: TeamTables,
+    top_k: int = DEFAULT_TOP_K,
+    max_workers: int | None = None,
+    carries: Iterable[str] | None = None,
+) -> TeamSearchResult:
+    """
+    Find the best team builds by best-first search with upper-bound pruning.
+
+    Teams are visited from the highest upper bound down and evaluated across
+    a process pool. Once top_k results are known, a team whose bound cannot
+    beat the worst of them is skipped without scoring any of its builds.
+
+    Args:
+        tables: Per-character sub-results from build_team_tables; each
+            worker receives them once
+        top_k: Number of results to return
+        max_workers: Worker processes to use; 1 runs in-process, None uses
+            one worker per CPU
+        carries: Carries to build teams around, or None for all of them;
+            scores are relative to each carry's own baseline
+
+    Returns:
+        Best results with search statistics
+    """
+    teams = list(iter_teams(tables, carries))
+    bounds = {team: team_upper_bound(tables, team) for team in teams}
+    pending = sorted(teams, key=lambda team: -bounds[team])
+    candidates = sum(
+        len(tables.carries[team[0]].builds)
+        * math.prod(len(tables.members[name].builds) for name in team[1:])
+        for team in teams
+    )
+
+    best: list[TeamResult] = []
+    evaluated = 0
+    pruned_teams = 0
+
+    def threshold() -> float:
+        return best[-1].score if len(best) >= top_k else -math.inf
+
+    def merge(results: list[TeamResult], count: int) -> None:
+        nonlocal best, evaluated
+        evaluated += count
+        best = sorted([*best, *results], key=lambda r: (-r.score, r.team))[:top_k]
+
+    if max_workers == 1:
+        for team in pending:
+            if bounds[team] <= threshold():
+                pruned_teams += 1
+                continue
+            merge(*evaluate_team(tables, team, top_k, threshold()))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(tables,)
+        ) as executor:
+            in_flight: set[Future[tuple[list[TeamResult], int]]] = set()
+            queue = iter(pending)
+            capacity = 2 * (max_workers or os.cpu_count() or 1)
+            while True:
+                for team in queue:
+                    if bounds[team] <= threshold():
+                        pruned_teams += 1
+                        continue
+                    in_flight.add(
+                        executor.submit(_evaluate_in_worker, team, top_k, threshold())
+                    )
+                    if len(in_flight) >= capacity:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(*future.result())
+
+    return TeamSearchResult(best, candidates, evaluated, len(teams), pruned_teams)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Search team compositions and builds for the best team score."
+    )
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument(
+        "--carry",
+        nargs="+",
+        choices=("anaxa", "castorice"),
+        default=None,
+        help="Only search teams built around these carries (default: all)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU, 1 runs in-process)",
+    )
+    parser.add_argument(
+        "--combined-allies-hp", type=float, default=DEFAULT_COMBINED_ALLIES_HP
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write the results to this CSV file"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tables = build_team_tables(args.combined_allies_hp)
+    search = search_teams(tables, args.top, args.workers, args.carry)
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Scored {search.evaluated:,} of {search.candidates:,} team builds across "
+        f"{search.teams} teams ({search.pruned_teams} pruned) in {elapsed:.2f}s"
+    )
+
+    data = columns_to_csv(search.as_columns())
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(data)
+        logger.info(f"Saved team results to {args.output}")
+    else:
+        print(data.decode(), end="")
+
+
+if __name__ == "__main__":
+    main()
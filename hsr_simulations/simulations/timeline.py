@@ -0,0 +1,144 @@
+import heapq
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+
+# Every combatant's action gauge starts at this distance; a combatant acts once
+# it has travelled it, which takes BASE_ACTION_GAUGE / speed action value (AV)
+BASE_ACTION_GAUGE = 10000
+# Action value of the first cycle of a battle and of every cycle after it
+FIRST_CYCLE_ACTION_VALUE = 150
+CYCLE_ACTION_VALUE = 100
+
+
+def cycles_action_value(total_cycles: int) -> float:
+    """Action value at the end of the first total_cycles cycles."""
+    if total_cycles <= 0:
+        return 0.0
+    return FIRST_CYCLE_ACTION_VALUE + CYCLE_ACTION_VALUE * (total_cycles - 1)
+
+
+@dataclass
+class TimelineActor:
+    """
+    A combatant on the action-value timeline.
+
+    Args:
+        name: Unique name of the combatant
+        speed: Current speed
+        on_turn: Called with the timeline and the actor whenever it acts; it
+            may advance or delay actions and change speeds
+    """
+
+    name: str
+    speed: float
+    on_turn: Callable[["Timeline", "TimelineActor"], None] | None = None
+    turns_taken: int = field(default=0, init=False)
+
+
+@dataclass(frozen=True)
+class TurnRecord:
+    action_value: float
+    actor_name: str
+
+
+class Timeline:
+    """
+    Discrete-event turn order simulator keyed on action value.
+
+    Scheduled turns live in a binary heap. Action advance, action delay and
+    speed changes push a new entry and bump the actor's version instead of
+    searching the heap, so every scheduling operation is O(log n) and stale
+    entries are discarded when they reach the top.
+    """
+
+    def __init__(self) -> None:
+        self.action_value = 0.0
+        self.actors: dict[str, TimelineActor] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._next_action: dict[str, float] = {}
+        self._versions: dict[str, int] = {}
+        self._sequence = 0
+
+    def add_actor(self, actor: TimelineActor) -> None:
+        if actor.name in self.actors:
+            raise ValueError(f"Actor '{actor.name}' is already on the timeline")
+        self.actors[actor.name] = actor
+        self._versions[actor.name] = 0
+        self._schedule(actor.name, self.action_value + self._full_turn(actor))
+
+    def next_action_value(self, name: str) -> float:
+        return self._next_action[name]
+
+    def advance_action(self, name: str, fraction: float) -> None:
+        """Move an actor forward by a fraction of its full action gauge."""
+        actor = self.actors[name]
+        self._schedule(
+            name,
+            max(
+                self.action_value,
+                self._next_action[name] - fraction * self._full_turn(actor),
+            ),
+        )
+
+    def delay_action(self, name: str, fraction: float) -> None:
+        """Push an actor back by a fraction of its full action gauge."""
+        self.advance_action(name, -fraction)
+
+    def set_speed(self, name: str, speed: float) -> None:
+        """Change an actor's speed, keeping the gauge distance it has covered."""
+        actor = self.actors[name]
+        remaining_gauge = (self._next_action[name] - self.action_value) * actor.speed
+        actor.speed = speed
+        self._schedule(name, self.action_value + remaining_gauge / speed)
+
+    def step(self) -> TurnRecord:
+        """Run the next turn and reschedule the actor that took it."""
+        while True:
+            action_value, _, name, version = heapq.heappop(self._heap)
+            if version == self._versions[name]:
+                break
+
+        self.action_value = action_value
+        actor = self.actors[name]
+        actor.turns_taken += 1
+
+        # Reschedule first so on_turn can advance or delay the next turn
+        self._schedule(name, self.action_value + self._full_turn(actor))
+        if actor.on_turn is not None:
+            actor.on_turn(self, actor)
+
+        return TurnRecord(action_value, name)
+
+    def run(self, total_action_value: float) -> list[TurnRecord]:
+        """
+        Run every turn that starts at or before total_action_value.
+
+        Returns:
+            Turns in the order they were taken
+        """
+        return list(self.iter_turns(total_action_value))
+
+    def iter_turns(self, total_action_value: float) -> Iterator[TurnRecord]:
+        """Like run, but yield each turn as soon as it has been taken."""
+        while self._heap and self._peek() <= total_action_value:
+            yield self.step()
+
+    def _peek(self) -> float:
+        # Drop stale entries so the top of the heap is a live turn
+        while self._heap:
+            action_value, _, name, version = self._heap[0]
+            if version == self._versions[name]:
+                return action_value
+            heapq.heappop(self._heap)
+        return float("inf")
+
+    def _full_turn(self, actor: TimelineActor) -> float:
+        return BASE_ACTION_GAUGE / actor.speed
+
+    def _schedule(self, name: str, action_value: float) -> None:
+        self._versions[name] += 1
+        self._next_action[name] = action_value
+        self._sequence += 1
+        heapq.heappush(
+            self._heap, (action_value, self._sequence, name, self._versions[name])
+        )
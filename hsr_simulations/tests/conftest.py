@@ -0,0 +1,9 @@
+import multiprocessing
+
+import pytest
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Worker pools must not fork a process that pyarrow or pandas have
+    # already started threads in
+    multiprocessing.set_start_method("spawn", force=True)
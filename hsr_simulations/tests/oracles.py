@@ -0,0 +1,757 @@
+import itertools
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from simulations.characters.base_character import Character
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.castorice import Castorice
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.markov_rotation import deterministic_step, solve_markov_rotation
+from simulations.result_store import run_shared_sweep
+
+# Parameters or outputs of many cases, as columns with one entry per case
+Cases = dict[str, npt.NDArray[Any]]
+# Checks the fast outputs of all cases, returning a failure description if any
+Property = Callable[[Cases, Cases], str | None]
+
+SWEEP_SHARDS = 4
+
+
+# Reference oracles: the original pure-Python loops, kept as they were before
+# any vectorized, closed-form or parallel path replaced them, except where a
+# docstring notes a deliberate change in semantics. Only the game constants
+# are read from the character, so retuning those moves both sides.
+# Do not optimize these; they define the correct numbers.
+
+
+def castorice_newbud_reference(
+    castorice: Castorice,
+    ally_hps: Sequence[float],
+    heal_amount: float,
+    castorice_hp: float,
+) -> tuple[int, int]:
+    """Skill and heal count before Castorice gets her ultimate, one team at a time."""
+    team = {"castorice": float(castorice_hp)}
+    for i, ally_hp in enumerate(ally_hps, start=1):
+        team[f"ally{i}"] = float(ally_hp)
+    heal_rotation = list(team)
+
+    current_newbud = 0.0
+    skill_counter = 0
+    heal_counter = 0
+    heal_index = 0
+    while current_newbud < castorice.NEWBUD_REQUIRED:
+        hp_consumed_total = 0.0
+        for ally, hp in team.items():
+            hp_consumed = hp * castorice.SKILL_HP_CONSUMPTION_RATE
+            hp_consumed_total += hp_consumed
+            team[ally] = hp - hp_consumed
+
+        current_newbud += hp_consumed_total
+        skill_counter += 1
+        if current_newbud >= castorice.NEWBUD_REQUIRED:
+            break
+
+        team[heal_rotation[heal_index]] += heal_amount
+        heal_counter += 1
+        heal_index = (heal_index + 1) % len(heal_rotation)
+
+        if skill_counter > castorice.MAX_SKILL_COUNT:
+            break
+
+    return skill_counter, heal_counter
+
+
+def ruan_mei_a6_reference(ruan_mei: RuanMei, break_effect: float) -> float:
+    if break_effect <= ruan_mei.A6_BREAK_EFFECT_THRESHOLD:
+        return 0.0
+    excess_break_effect = break_effect - ruan_mei.A6_BREAK_EFFECT_THRESHOLD
+    additional_dmg = (excess_break_effect / 0.1) * ruan_mei.A6_DMG_PER_10_PERCENT
+    return min(ruan_mei.A6_MAX_ADDITIONAL_DMG, additional_dmg)
+
+
+def ruan_mei_break_effect_range_reference(ruan_mei: RuanMei) -> list[float]:
+    """Break effect values of the default sweep, stepped and rounded by hand."""
+    values = []
+    current_break_effect = ruan_mei.START_BREAK_EFFECT
+    while current_break_effect <= ruan_mei.END_BREAK_EFFECT:
+        values.append(current_break_effect)
+        current_break_effect = round(current_break_effect + 0.01, 2)
+    return values
+
+
+def hyacine_healing_reference(hyacine: Hyacine, speed: float) -> float:
+    if speed > hyacine.CONDITIONED_SPEED:
+        exceed_speed = speed - hyacine.CONDITIONED_SPEED
+        return exceed_speed * 0.01
+    return 0.0
+
+
+def _skill_point_rotation(
+    total_cycles: int, skill_points: int, skill_dmg: float, basic_atk_dmg: float
+) -> float:
+    total_dmg = 0.0
+    for _ in range(total_cycles):
+        if skill_points > 0:
+            total_dmg += skill_dmg
+            skill_points -= 1
+        else:
+            total_dmg += basic_atk_dmg
+            skill_points += 1
+    return total_dmg
+
+
+def _anaxa_e2_rotation(total_cycles: int, has_e2: bool) -> float:
+    total_dmg = 0.0
+    enemy_weakness_count = 3
+    new_enemy = True
+    for _ in range(total_cycles):
+        if has_e2 and new_enemy:
+            enemy_weakness_count += 1
+        new_enemy = False
+
+        if enemy_weakness_count >= 5:
+            total_dmg += 1000 * 1.3
+            enemy_weakness_count = 3
+            new_enemy = True
+        else:
+            total_dmg += 1000
+            enemy_weakness_count += 1
+
+        enemy_weakness_count = min(enemy_weakness_count, 5)
+    return total_dmg
+
+
+def _anaxa_e4_rotation(anaxa: Anaxa, total_cycles: int, has_e4: bool) -> float:
+    skill_points = 3
+    total_dmg = 0.0
+    atk_buffs: list[int] = []
+    for _ in range(total_cycles):
+        atk_buffs = [turns for turns in atk_buffs if turns > 0]
+        buff_stacks = min(len(atk_buffs), 2)
+        atk_buff_multiplier = 1.0 + (buff_stacks * 0.3) if has_e4 else 1.0
+
+        if skill_points > 0:
+            total_dmg += anaxa.calculate_dmg(
+                anaxa.atk * atk_buff_multiplier, anaxa.skill_mult
+            )
+            skill_points -= 1
+            if has_e4 and len(atk_buffs) < 2:
+                atk_buffs.append(2)
+        else:
+            total_dmg += anaxa.calculate_dmg(anaxa.atk * atk_buff_multiplier, 1.0)
+            skill_points += 1
+
+        atk_buffs = [turns - 1 for turns in atk_buffs]
+    return total_dmg
+
+
+def _anaxa_e6_rotation(
+    total_cycles: int, erudition_char_count: int, has_e6: bool
+) -> float:
+    crit_rate = 0.5
+    crit_dmg = 1.0
+    skill_dmg = 1000.0
+    basic_atk_dmg = 500.0
+    if has_e6:
+        crit_dmg += 1.4 * 2
+        crit_rate = 1.0
+        skill_dmg *= (1 + 0.5) * (1 + 1.3)
+        basic_atk_dmg *= (1 + 0.5) * (1 + 1.3)
+    elif erudition_char_count == 1:
+        crit_dmg += 1.4 * 2
+        crit_rate = 1.0
+        skill_dmg *= 1 + 1.3
+        basic_atk_dmg *= 1 + 1.3
+    elif erudition_char_count >= 2:
+        skill_dmg *= (1 + 0.5) * (1 + 1.3)
+        basic_atk_dmg *= (1 + 0.5) * (1 + 1.3)
+
+    return _skill_point_rotation(
+        total_cycles,
+        3,
+        skill_dmg * (1 + crit_rate * crit_dmg),
+        basic_atk_dmg * (1 + crit_rate * crit_dmg),
+    )
+
+
+def _anaxa_lc_rotation(anaxa: Anaxa, total_cycles: int, has_lc: bool) -> float:
+    """
+    Light cone rotation with the corrected energy regeneration.
+
+    Not the original loop: that one added the light cone's energy to the
+    Ultimate's cost (ult_energy += lc_enery_gain) instead of to the current
+    energy, so the Ultimate grew steadily more expensive. The light cone now
+    regenerates energy, and this oracle follows the fixed semantics.
+    """
+    total_dmg = 0.0
+    ult_energy = anaxa.ult_energy
+    current_energy = 0
+    lc_enery_gain = 10 if has_lc else 0
+    increased_dmg_mult = 0.6 if has_lc else 0.0
+    def_reduce_mult = 0.12 if has_lc else 0.0
+    for _ in range(total_cycles):
+        current_energy += lc_enery_gain
+        if current_energy >= ult_energy:
+            total_dmg += 1000
+            current_energy = 0
+
+        total_dmg += 1000 * (1 + def_reduce_mult) * (1 + increased_dmg_mult)
+        current_energy += 30
+        if current_energy >= ult_energy:
+            total_dmg += 1000
+            current_energy = 0
+    return total_dmg
+
+
+def anaxa_final_dmg_reference(
+    anaxa: Anaxa, total_cycles: int, flags: Sequence[bool]
+) -> float:
+    """
+    Final damage for one eidolon/light cone combination, simulating every cycle.
+
+    The original method overwrote the instance's multipliers when E3 or E5
+    were set, leaking them into later calls; here they are local.
+    """
+    has_e1, has_e2, has_e3, has_e4, has_e5, has_e6, has_lc = flags
+
+    def percent_change(base_dmg: float, new_dmg: float) -> float:
+        return (new_dmg - base_dmg) / base_dmg
+
+    e1_mult = e2_mult = e4_mult = e6_mult = lc_mult = 0.0
+    def_reduce_mult = all_type_res_pen_mult = 0.0
+    ult_mult = anaxa.ult_mult
+    skill_mult = anaxa.skill_mult
+    qualitative_disclosure_mult = anaxa.qualitative_disclosure_mult
+
+    if has_e1:
+        def_reduce_mult = 0.16
+        e1_mult = percent_change(
+            _skill_point_rotation(total_cycles, 3, 1000, 500),
+            _skill_point_rotation(total_cycles, 4, 1000, 500),
+        )
+    if has_e2:
+        all_type_res_pen_mult = 0.2
+        e2_mult = percent_change(
+            _anaxa_e2_rotation(total_cycles, False),
+            _anaxa_e2_rotation(total_cycles, True),
+        )
+    if has_e3:
+        ult_mult = 1.76
+    if has_e4:
+        e4_mult = percent_change(
+            _anaxa_e4_rotation(anaxa, total_cycles, False),
+            _anaxa_e4_rotation(anaxa, total_cycles, True),
+        )
+    if has_e5:
+        skill_mult = 0.77
+        qualitative_disclosure_mult = 0.324
+    if has_e6:
+        base_dmg_avg = (
+            _anaxa_e6_rotation(total_cycles, 1, False)
+            + _anaxa_e6_rotation(total_cycles, 2, False)
+        ) / 2
+        e6_mult = percent_change(
+            base_dmg_avg, _anaxa_e6_rotation(total_cycles, 1, True)
+        )
+    if has_lc:
+        lc_mult = percent_change(
+            _anaxa_lc_rotation(anaxa, total_cycles, False),
+            _anaxa_lc_rotation(anaxa, total_cycles, True),
+        )
+
+    shared_mult = (
+        (1 + def_reduce_mult)
+        * (1 + all_type_res_pen_mult)
+        * (1 + qualitative_disclosure_mult)
+    )
+    final_dmg = (
+        anaxa.calculate_dmg(anaxa.atk, skill_mult) * shared_mult
+        + anaxa.calculate_dmg(anaxa.atk, ult_mult) * shared_mult
+    )
+    return (
+        final_dmg
+        * (1 + e1_mult)
+        * (1 + e2_mult)
+        * (1 + e4_mult)
+        * (1 + e6_mult)
+        * (1 + lc_mult)
+    )
+
+
+@dataclass(frozen=True)
+class Equivalence:
+    """
+    A fast implementation checked against a reference oracle.
+
+    Args:
+        draw: Draws the parameters of a number of cases from a generator
+        reference: Evaluates one case, given its parameters as keyword
+            arguments, as output name to value
+        fast: Evaluates every case at once, as output name to array; only
+            the outputs the reference returns are compared
+        rtol: Relative tolerance of every output
+        atol: Absolute tolerance of every output
+        properties: Invariants checked on the fast outputs of all cases
+    """
+
+    draw: Callable[[np.random.Generator, int], Cases]
+    reference: Callable[..., dict[str, float]]
+    fast: Callable[[Cases], Cases]
+    rtol: float = 0.0
+    atol: float = 0.0
+    properties: tuple[Property, ...] = ()
+
+
+def run_equivalence(check: Equivalence, cases: int, seed: int = 0) -> list[str]:
+    """
+    Compare a fast implementation with its reference on random cases.
+
+    Returns:
+        A description of each mismatching output or broken property
+    """
+    params = check.draw(np.random.default_rng(seed), cases)
+    count = len(next(iter(params.values())))
+    rows = [
+        {name: values[i].item() for name, values in params.items()}
+        for i in range(count)
+    ]
+    expected_rows = [check.reference(**row) for row in rows]
+    actual = check.fast(params)
+
+    failures = []
+    for name in expected_rows[0] if expected_rows else ():
+        expected = np.array([row[name] for row in expected_rows], dtype=np.float64)
+        values = np.asarray(actual[name], dtype=np.float64)
+        if values.shape != expected.shape:
+            failures.append(
+                f"{name}: fast path gave shape {values.shape}, expected "
+                f"{expected.shape}"
+            )
+            continue
+
+        mismatches = np.flatnonzero(
+            ~np.isclose(values, expected, check.rtol, check.atol, equal_nan=True)
+        )
+        if mismatches.size:
+            i = mismatches[0]
+            failures.append(
+                f"{name}: {mismatches.size} of {count} cases differ, e.g. "
+                f"{rows[i]} gave {values[i]}, reference {expected[i]}"
+            )
+
+    for check_property in check.properties:
+        failure = check_property(params, actual)
+        if failure is not None:
+            failures.append(failure)
+
+    return failures
+
+
+def _non_increasing(x: str, y: str) -> Property:
+    def check(params: Cases, outputs: Cases) -> str | None:
+        order = np.argsort(params[x], kind="stable")
+        steps = np.diff(np.asarray(outputs[y], dtype=np.float64)[order])
+        if (steps > 0).any():
+            return f"{y} increases with {x}"
+        return None
+
+    return check
+
+
+def _non_decreasing(x: str, y: str) -> Property:
+    def check(params: Cases, outputs: Cases) -> str | None:
+        order = np.argsort(params[x], kind="stable")
+        steps = np.diff(np.asarray(outputs[y], dtype=np.float64)[order])
+        if (steps < 0).any():
+            return f"{y} decreases with {x}"
+        return None
+
+    return check
+
+
+def _within(y: str, low: float, high: float) -> Property:
+    def check(params: Cases, outputs: Cases) -> str | None:
+        values = np.asarray(outputs[y], dtype=np.float64)
+        if ((values < low) | (values > high)).any():
+            return f"{y} leaves [{low}, {high}]"
+        return None
+
+    return check
+
+
+def _with_boundaries(
+    values: npt.NDArray[np.float64], boundaries: Sequence[float]
+) -> npt.NDArray[np.float64]:
+    # Edge cases first, so small runs still cover them
+    return np.concatenate([np.asarray(boundaries, dtype=np.float64), values])[
+        : max(len(values), len(boundaries))
+    ]
+
+
+def castorice_checks() -> dict[str, Equivalence]:
+    castorice = Castorice()
+
+    def draw_teams(rng: np.random.Generator, cases: int) -> Cases:
+        # Unequal splits, including teams too frail to ever get ultimate
+        return {
+            "ally1_hp": rng.uniform(0, 30000, cases),
+            "ally2_hp": rng.uniform(0, 30000, cases),
+            "ally3_hp": rng.uniform(0, 30000, cases),
+            "heal_amount": rng.uniform(0, 4000, cases),
+        }
+
+    def reference_team(
+        ally1_hp: float, ally2_hp: float, ally3_hp: float, heal_amount: float
+    ) -> dict[str, float]:
+        skill_count, heal_count = castorice_newbud_reference(
+            castorice,
+            (ally1_hp, ally2_hp, ally3_hp),
+            heal_amount,
+            castorice.CASTORICE_BASE_HP,
+        )
+        return {"skill_count": skill_count, "heal_count": heal_count}
+
+    def fast_team(params: Cases) -> Cases:
+        ally_hps = np.column_stack(
+            [params["ally1_hp"], params["ally2_hp"], params["ally3_hp"]]
+        )
+        skill_count, heal_count = castorice.simulate_newbud_batch(
+            ally_hps, params["heal_amount"]
+        )
+        return {"skill_count": skill_count, "heal_count": heal_count}
+
+    def draw_combined_hp(rng: np.random.Generator, cases: int) -> Cases:
+        return {
+            "combined_allies_hp": _with_boundaries(
+                rng.uniform(
+                    castorice.INDEX_MIN_COMBINED_ALLIES_HP,
+                    castorice.INDEX_MAX_COMBINED_ALLIES_HP,
+                    cases,
+                ),
+                [
+                    castorice.INDEX_MIN_COMBINED_ALLIES_HP,
+                    castorice.INDEX_MAX_COMBINED_ALLIES_HP,
+                ],
+            )
+        }
+
+    def reference_combined_hp(combined_allies_hp: float) -> dict[str, float]:
+        ally_hp = (combined_allies_hp - castorice.CASTORICE_BASE_HP) / 3
+        skill_count, heal_count = castorice_newbud_reference(
+            castorice,
+            (ally_hp, ally_hp, ally_hp),
+            castorice.GALLAGHER_HEAL_AMOUNT,
+            castorice.CASTORICE_BASE_HP,
+        )
+        return {"skill_count": skill_count, "heal_count": heal_count}
+
+    def fast_combined_hp(params: Cases) -> Cases:
+        skill_count, heal_count = castorice.simulate_combined_hp_batch(
+            params["combined_allies_hp"]
+        )
+        return {"skill_count": skill_count, "heal_count": heal_count}
+
+    def fast_index(params: Cases) -> Cases:
+        # Inverse of the index: largest count whose threshold is within reach
+        index = castorice.build_skill_count_index("skill_count")
+        thresholds = sorted(index.thresholds.items())
+        counts = np.full(len(params["combined_allies_hp"]), index.low_value)
+        for count, threshold in reversed(thresholds):
+            counts[params["combined_allies_hp"] >= threshold] = count
+        return {"skill_count": counts}
+
+    def reference_index(combined_allies_hp: float) -> dict[str, float]:
+        # Thresholds lie on the index's integer grid
+        skill_count = reference_combined_hp(float(np.floor(combined_allies_hp)))[
+            "skill_count"
+        ]
+        return {"skill_count": skill_count}
+
+    return {
+        "castorice_teams": Equivalence(
+            draw_teams,
+            reference_team,
+            fast_team,
+            properties=(_within("skill_count", 1, castorice.MAX_SKILL_COUNT + 1),),
+        ),
+        "castorice_combined_hp": Equivalence(
+            draw_combined_hp,
+            reference_combined_hp,
+            fast_combined_hp,
+            properties=(
+                _non_increasing("combined_allies_hp", "skill_count"),
+                _non_increasing("combined_allies_hp", "heal_count"),
+            ),
+        ),
+        "castorice_index": Equivalence(draw_combined_hp, reference_index, fast_index),
+    }
+
+
+def ruan_mei_checks() -> dict[str, Equivalence]:
+    ruan_mei = RuanMei()
+    a6_cap_break_effect = ruan_mei.lod_breakpoints()[-1]
+
+    def draw(rng: np.random.Generator, cases: int) -> Cases:
+        return {
+            "break_effect": _with_boundaries(
+                rng.uniform(0.0, 3.0, cases),
+                [ruan_mei.A6_BREAK_EFFECT_THRESHOLD, a6_cap_break_effect, 0.0],
+            )
+        }
+
+    def reference(break_effect: float) -> dict[str, float]:
+        return {"additional_dmg_from_a6": ruan_mei_a6_reference(ruan_mei, break_effect)}
+
+    def fast(params: Cases) -> Cases:
+        return {
+            "additional_dmg_from_a6": (
+                ruan_mei.calculate_additional_skill_dmg_by_break_effect_array(
+                    params["break_effect"]
+                )
+            )
+        }
+
+    return {
+        "ruanmei_a6": Equivalence(
+            draw,
+            reference,
+            fast,
+            rtol=1e-12,
+            atol=1e-12,
+            properties=(
+                _non_decreasing("break_effect", "additional_dmg_from_a6"),
+                _within("additional_dmg_from_a6", 0.0, ruan_mei.A6_MAX_ADDITIONAL_DMG),
+            ),
+        )
+    }
+
+
+def hyacine_checks() -> dict[str, Equivalence]:
+    hyacine = Hyacine()
+
+    def draw(rng: np.random.Generator, cases: int) -> Cases:
+        # Whole speeds as in the sweep, and fractional ones from relic rolls
+        speeds = np.where(
+            rng.random(cases) < 0.5,
+            rng.integers(hyacine.speed, hyacine.MAX_SPEED + 1, cases),
+            rng.uniform(hyacine.speed, hyacine.MAX_SPEED, cases),
+        )
+        return {
+            "speed": _with_boundaries(
+                speeds, [hyacine.CONDITIONED_SPEED, hyacine.CONDITIONED_SPEED + 1]
+            )
+        }
+
+    def reference(speed: float) -> dict[str, float]:
+        return {"increased_outgoing_healing": hyacine_healing_reference(hyacine, speed)}
+
+    def fast(params: Cases) -> Cases:
+        return {
+            "increased_outgoing_healing": hyacine.calculate_increased_outgoing_healing(
+                params["speed"]
+            )
+        }
+
+    return {
+        "hyacine_healing": Equivalence(
+            draw,
+            reference,
+            fast,
+            rtol=1e-12,
+            atol=1e-12,
+            properties=(_non_decreasing("speed", "increased_outgoing_healing"),),
+        )
+    }
+
+
+def anaxa_checks() -> dict[str, Equivalence]:
+    def draw(rng: np.random.Generator, cases: int) -> Cases:
+        # Few distinct horizons, so the fast path reuses its helpers
+        horizons = np.array([1, 2, 3, 7, 139, 1000, 2024])
+        params: Cases = {
+            "total_cycles": rng.choice(horizons, min(cases, 256)),
+        }
+        for name in Anaxa.FLAG_NAMES:
+            params[name] = rng.random(min(cases, 256)) < 0.5
+        return params
+
+    def reference(total_cycles: int, **flags: bool) -> dict[str, float]:
+        anaxa = Anaxa(total_cycles)
+        flag_values = [flags[name] for name in Anaxa.FLAG_NAMES]
+        return {
+            "final_dmg": anaxa_final_dmg_reference(anaxa, total_cycles, flag_values)
+        }
+
+    def fast(params: Cases) -> Cases:
+        final_dmg = np.empty(len(params["total_cycles"]), dtype=np.float64)
+        for total_cycles in np.unique(params["total_cycles"]):
+            rows = params["total_cycles"] == total_cycles
+            final_dmg[rows] = Anaxa(int(total_cycles)).calculate_final_dmg_array(
+                *(params[name][rows] for name in Anaxa.FLAG_NAMES)
+            )
+        return {"final_dmg": final_dmg}
+
+    anaxa = Anaxa()
+
+    def draw_e4_rotation(rng: np.random.Generator, cases: int) -> Cases:
+        return {
+            "total_cycles": rng.integers(0, 200, min(cases, 256)),
+            "has_e4": rng.random(min(cases, 256)) < 0.5,
+        }
+
+    def reference_e4_rotation(total_cycles: int, has_e4: bool) -> dict[str, float]:
+        return {"dmg": _anaxa_e4_rotation(anaxa, total_cycles, has_e4)}
+
+    def markov_e4_rotation(params: Cases) -> Cases:
+        initial_state: tuple[int, tuple[int, ...]] = (anaxa.BASE_SKILL_POINTS, ())
+        steps = {
+            has_e4: deterministic_step(anaxa.e4_rotation_step(has_e4))
+            for has_e4 in (False, True)
+        }
+        return {
+            "dmg": np.array(
+                [
+                    solve_markov_rotation(
+                        initial_state, steps[bool(has_e4)], int(total_cycles)
+                    )
+                    for total_cycles, has_e4 in zip(
+                        params["total_cycles"], params["has_e4"], strict=True
+                    )
+                ]
+            )
+        }
+
+    def batch_e4_rotation(params: Cases) -> Cases:
+        dmg = np.empty(len(params["total_cycles"]), dtype=np.float64)
+        for total_cycles in np.unique(params["total_cycles"]):
+            rows = params["total_cycles"] == total_cycles
+            dmg[rows] = anaxa.simulate_e4_rotation_batch(
+                params["has_e4"][rows], int(total_cycles)
+            )
+        return {"dmg": dmg}
+
+    return {
+        # Cycle-detected horizons sum the same damage in another order
+        "anaxa_final_dmg": Equivalence(draw, reference, fast, rtol=1e-9),
+        "anaxa_markov_e4": Equivalence(
+            draw_e4_rotation, reference_e4_rotation, markov_e4_rotation, rtol=1e-9
+        ),
+        "anaxa_batch_e4": Equivalence(
+            draw_e4_rotation, reference_e4_rotation, batch_e4_rotation, rtol=1e-9
+        ),
+    }
+
+
+def sweep_checks(workers: int | None = 1) -> dict[str, Equivalence]:
+    """
+    Check each character's default sweep, evaluated into a shared result
+    store across shards, against its oracle row by row.
+    """
+    castorice = Castorice()
+    ruan_mei = RuanMei()
+    hyacine = Hyacine()
+    anaxa = Anaxa()
+    total_cycles = anaxa.total_cycles
+    if total_cycles is None:
+        raise ValueError("The Anaxa oracle simulates a finite number of cycles")
+
+    def shared_sweep(character: Character) -> Callable[[Cases], Cases]:
+        def fast(params: Cases) -> Cases:
+            with run_shared_sweep(character, SWEEP_SHARDS, workers) as store:
+                return {name: values.copy() for name, values in store.columns.items()}
+
+        return fast
+
+    def grid(
+        axes: dict[str, Sequence[Any]],
+    ) -> Callable[[np.random.Generator, int], Cases]:
+        # The default grids are fixed, so the case count does not apply
+        def draw(rng: np.random.Generator, cases: int) -> Cases:
+            rows = list(itertools.product(*axes.values()))
+            return {
+                name: np.array([row[i] for row in rows]) for i, name in enumerate(axes)
+            }
+
+        return draw
+
+    def castorice_row(combined_allies_hp: int) -> dict[str, float]:
+        ally_hp = (combined_allies_hp - castorice.CASTORICE_BASE_HP) / 3
+        skill_count, heal_count = castorice_newbud_reference(
+            castorice,
+            (ally_hp, ally_hp, ally_hp),
+            castorice.GALLAGHER_HEAL_AMOUNT,
+            castorice.CASTORICE_BASE_HP,
+        )
+        return {
+            "combined_allies_hp": combined_allies_hp,
+            "skill_count_before_getting_ult": skill_count,
+            "heal_count_before_getting_ult": heal_count,
+        }
+
+    def ruan_mei_row(break_effect: float) -> dict[str, float]:
+        additional_dmg = ruan_mei_a6_reference(ruan_mei, break_effect)
+        return {
+            "break_effect": break_effect,
+            "additional_dmg_from_a6": additional_dmg,
+            "total_skill_dmg_increase": ruan_mei.BASE_SKILL_DMG_MULT + additional_dmg,
+        }
+
+    def hyacine_row(speed: int) -> dict[str, float]:
+        return {
+            "speed": speed,
+            "increased_outgoing_healing": hyacine_healing_reference(hyacine, speed),
+        }
+
+    base_dmg = anaxa_final_dmg_reference(anaxa, total_cycles, [False] * 7)
+
+    def anaxa_row(**flags: bool) -> dict[str, float]:
+        final_dmg = anaxa_final_dmg_reference(
+            anaxa, total_cycles, [flags[name] for name in Anaxa.FLAG_NAMES]
+        )
+        return {
+            "final_dmg": final_dmg,
+            "dmg_increase": (final_dmg - base_dmg) / base_dmg,
+        }
+
+    return {
+        "castorice_sweep": Equivalence(
+            grid(
+                {
+                    "combined_allies_hp": range(
+                        castorice.MIN_COMBINED_ALLIES_HP,
+                        castorice.MAX_COMBINED_ALLIES_HP + 1,
+                        castorice.COMBINED_ALLIES_HP_STEP,
+                    )
+                }
+            ),
+            castorice_row,
+            shared_sweep(castorice),
+        ),
+        "ruanmei_sweep": Equivalence(
+            grid({"break_effect": ruan_mei_break_effect_range_reference(ruan_mei)}),
+            ruan_mei_row,
+            shared_sweep(ruan_mei),
+            rtol=1e-12,
+            atol=1e-12,
+        ),
+        "hyacine_sweep": Equivalence(
+            grid({"speed": range(hyacine.speed, hyacine.MAX_SPEED + 1)}),
+            hyacine_row,
+            shared_sweep(hyacine),
+            rtol=1e-12,
+            atol=1e-12,
+        ),
+        "anaxa_sweep": Equivalence(
+            grid({name: (False, True) for name in Anaxa.FLAG_NAMES}),
+            anaxa_row,
+            shared_sweep(anaxa),
+            rtol=1e-9,
+            atol=1e-12,
+        ),
+    }
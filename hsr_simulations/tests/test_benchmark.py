@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from simulations.benchmark import (
+    CHARACTER_FACTORIES,
+    DEFAULT_BASELINE_PATH,
+    BenchmarkResult,
+    calibrate,
+    find_regressions,
+    find_superlinear,
+    run_benchmarks,
+)
+from simulations.result_store import sweep_rows
+
+REPEAT = 3
+# Generous, since the baseline may come from a machine whose interpreter and
+# I/O speeds differ from this one's in other proportions than the calibration
+TIME_TOLERANCE = 2.0
+MEMORY_TOLERANCE = 0.2
+SCALING_TOLERANCE = 1.0
+
+
+@pytest.fixture(scope="module")
+def results() -> dict[str, BenchmarkResult]:
+    return run_benchmarks(REPEAT)
+
+
+@pytest.mark.parametrize("name", list(CHARACTER_FACTORIES))
+def test_scales_change_the_work(name: str) -> None:
+    factory, scales = CHARACTER_FACTORIES[name]
+    rows = [sweep_rows(factory(scale)) for scale in scales]
+    assert rows == sorted(set(rows)), f"{name} rows per scale: {rows}"
+
+
+def test_time_grows_linearly_with_rows(results: dict[str, BenchmarkResult]) -> None:
+    problems = find_superlinear(results, SCALING_TOLERANCE)
+    assert not problems, "\n".join(problems)
+
+
+def test_no_regressions_against_baseline(
+    results: dict[str, BenchmarkResult],
+) -> None:
+    baseline = json.loads(DEFAULT_BASELINE_PATH.read_text())
+    regressions = find_regressions(
+        results, calibrate(REPEAT), baseline, TIME_TOLERANCE, MEMORY_TOLERANCE
+    )
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,43 @@
+import pytest
+
+from simulations.build_cache import (
+    OUTPUT_MODULES,
+    _source_modules,
+    compute_character_hash,
+)
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.castorice import Castorice
+from simulations.characters.remembrance.hyacine import Hyacine
+
+
+@pytest.mark.parametrize("character_class", [Anaxa, Castorice, Hyacine, RuanMei])
+def test_hash_covers_output_pipeline(character_class: type) -> None:
+    hashed = {module.__name__ for module in _source_modules(character_class())}
+    assert set(OUTPUT_MODULES) <= hashed
+
+
+def test_memoized_helpers_do_not_change_the_hash() -> None:
+    anaxa = Anaxa()
+    before = compute_character_hash(anaxa)
+    anaxa.helper_dmg_mults()
+    assert compute_character_hash(anaxa) == before
+
+
+def test_helper_dmg_mults_follow_their_inputs(monkeypatch: pytest.MonkeyPatch) -> None:
+    anaxa = Anaxa(total_cycles=10)
+    calls: list[int | None] = []
+    e1 = Anaxa.calculate_dmg_increased_from_e1
+
+    def counted_e1(self: Anaxa) -> float:
+        calls.append(self.total_cycles)
+        return e1(self)
+
+    monkeypatch.setattr(Anaxa, "calculate_dmg_increased_from_e1", counted_e1)
+    first = anaxa.helper_dmg_mults()
+    assert anaxa.helper_dmg_mults() == first
+    assert calls == [10]
+
+    anaxa.total_cycles = 20
+    assert anaxa.helper_dmg_mults() == Anaxa(total_cycles=20).helper_dmg_mults()
+    assert calls == [10, 20, 20]
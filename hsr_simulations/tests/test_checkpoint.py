@@ -0,0 +1,75 @@
+import itertools
+from collections.abc import Iterator
+from pathlib import Path
+
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.checkpoint import CheckpointJournal, iter_checkpointed_batches
+from simulations.output_backends import Columns
+from simulations.result_store import sweep_rows
+
+BATCH_SIZE = 50
+
+
+class TaggedHyacine(Hyacine):
+    """Hyacine with an iter_batches override, recording where it starts."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.offsets: list[int] = []
+
+    def iter_batches(
+        self, batch_size: int = BATCH_SIZE, offset: int = 0
+    ) -> Iterator[Columns]:
+        self.offsets.append(offset)
+        for batch in super().iter_batches(batch_size, offset):
+            yield {**batch, "tagged": [1.0] * len(batch["speed"])}
+
+
+def concat(batches: list[Columns]) -> Columns:
+    columns: Columns = {}
+    for batch in batches:
+        for name, values in batch.items():
+            columns.setdefault(name, []).extend(values)
+    return columns
+
+
+def test_resume_continues_the_character_batches(tmp_path: Path) -> None:
+    expected = concat(list(TaggedHyacine().iter_batches(BATCH_SIZE)))
+
+    def journal(character: Hyacine) -> CheckpointJournal:
+        return CheckpointJournal(tmp_path, "hyacine", "key", sweep_rows(character))
+
+    # A run killed after two batches
+    killed = TaggedHyacine()
+    batches = iter_checkpointed_batches(killed, journal(killed), BATCH_SIZE)
+    list(itertools.islice(batches, 2))
+
+    resumed = TaggedHyacine()
+    resumed_journal = journal(resumed)
+    columns = concat(
+        list(
+            iter_checkpointed_batches(resumed, resumed_journal, BATCH_SIZE, resume=True)
+        )
+    )
+    assert columns == expected
+    assert resumed_journal.resumed_rows == 2 * BATCH_SIZE
+    assert resumed.offsets == [2 * BATCH_SIZE]
+
+
+def test_damaged_batch_is_recomputed(tmp_path: Path) -> None:
+    character = TaggedHyacine()
+    rows = sweep_rows(character)
+    expected = concat(list(character.iter_batches(BATCH_SIZE)))
+    journal = CheckpointJournal(tmp_path, "hyacine", "key", rows)
+    list(iter_checkpointed_batches(character, journal, BATCH_SIZE))
+    journal.get_chunk_path(1).write_bytes(b"damaged")
+
+    resumed = TaggedHyacine()
+    resumed_journal = CheckpointJournal(tmp_path, "hyacine", "key", rows)
+    columns = concat(
+        list(
+            iter_checkpointed_batches(resumed, resumed_journal, BATCH_SIZE, resume=True)
+        )
+    )
+    assert columns == expected
+    assert resumed.offsets == [BATCH_SIZE]
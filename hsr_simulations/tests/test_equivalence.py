@@ -0,0 +1,43 @@
+import pytest
+
+from tests.oracles import (
+    Equivalence,
+    anaxa_checks,
+    castorice_checks,
+    hyacine_checks,
+    ruan_mei_checks,
+    run_equivalence,
+    sweep_checks,
+)
+
+CASES = 2000
+
+FAST_PATHS = {
+    **castorice_checks(),
+    **ruan_mei_checks(),
+    **hyacine_checks(),
+    **anaxa_checks(),
+}
+SWEEPS = sweep_checks(workers=1)
+PARALLEL_SWEEPS = sweep_checks(workers=2)
+
+
+def assert_equivalent(check: Equivalence, seed: int) -> None:
+    failures = run_equivalence(check, CASES, seed)
+    assert not failures, "\n".join(failures)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("name", list(FAST_PATHS))
+def test_fast_path_matches_reference(name: str, seed: int) -> None:
+    assert_equivalent(FAST_PATHS[name], seed)
+
+
+@pytest.mark.parametrize("name", list(SWEEPS))
+def test_sharded_sweep_matches_reference(name: str) -> None:
+    assert_equivalent(SWEEPS[name], seed=0)
+
+
+@pytest.mark.parametrize("name", list(PARALLEL_SWEEPS))
+def test_parallel_sweep_matches_reference(name: str) -> None:
+    assert_equivalent(PARALLEL_SWEEPS[name], seed=0)
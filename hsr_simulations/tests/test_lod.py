@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from simulations.lod import LodWriter
+
+ROWS = 10_000
+BREAKPOINTS = (2500.5, 7000.0)
+
+
+def sweep() -> dict[str, npt.NDArray[Any]]:
+    x = np.arange(ROWS)
+    y = np.sin(x / 300) + (x >= 7000) + np.random.default_rng(0).normal(0, 0.1, ROWS)
+    return {"x": x, "y": y, "label": np.full(ROWS, "meta")}
+
+
+def write_tiers(directory: Path, batch_rows: int) -> dict[str, Any]:
+    columns = sweep()
+    directory.mkdir(exist_ok=True)
+    with LodWriter(ROWS, "x", BREAKPOINTS, (256, 1024), exclude=["label"]) as lod:
+        for start in range(0, ROWS, batch_rows):
+            lod.add(
+                {
+                    name: values[start : start + batch_rows].tolist()
+                    for name, values in columns.items()
+                }
+            )
+        lod.write(directory, "test")
+    index: dict[str, Any] = json.loads((directory / "test_lod_index.json").read_text())
+    return index
+
+
+def read_column(directory: Path, tier: dict[str, Any], name: str) -> npt.NDArray[Any]:
+    [column] = [column for column in tier["columns"] if column["name"] == name]
+    blob = (directory / tier["path"]).read_bytes()
+    return np.frombuffer(
+        blob, dtype=column["dtype"], count=column["length"], offset=column["offset"]
+    )
+
+
+def test_full_tier_round_trips(tmp_path: Path) -> None:
+    index = write_tiers(tmp_path, 1000)
+    full = index["tiers"][-1]
+    columns = sweep()
+    assert full["rows"] == ROWS
+    assert [column["name"] for column in full["columns"]] == ["x", "y"]
+    np.testing.assert_array_equal(read_column(tmp_path, full, "x"), columns["x"])
+    np.testing.assert_array_equal(read_column(tmp_path, full, "y"), columns["y"])
+
+
+def test_tiers_keep_ends_and_breakpoints(tmp_path: Path) -> None:
+    index = write_tiers(tmp_path, 1000)
+    for tier in index["tiers"][:-1]:
+        x = read_column(tmp_path, tier, "x")
+        assert len(x) <= tier["target_rows"]
+        assert np.all(np.diff(x) > 0)
+        assert {0, 2500, 2501, 6999, 7000, ROWS - 1} <= set(x.tolist())
+
+
+@pytest.mark.parametrize("batch_rows", [1, 333, ROWS])
+def test_tiers_do_not_depend_on_batching(tmp_path: Path, batch_rows: int) -> None:
+    expected = write_tiers(tmp_path / "reference", 1000)
+    index = write_tiers(tmp_path / "batched", batch_rows)
+    assert index == expected
+    for tier in index["tiers"]:
+        assert (tmp_path / "batched" / tier["path"]).read_bytes() == (
+            tmp_path / "reference" / tier["path"]
+        ).read_bytes()
+
+
+def test_row_count_mismatch_is_rejected(tmp_path: Path) -> None:
+    with LodWriter(ROWS + 1, "x", ()) as lod:
+        lod.add({name: values.tolist() for name, values in sweep().items()})
+        with pytest.raises(ValueError, match="rows"):
+            lod.write(tmp_path, "test")
@@ -0,0 +1,76 @@
+import functools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from simulations.monte_carlo import PERCENTILES, CritDamageSampler, run_monte_carlo
+
+SAMPLER = CritDamageSampler(
+    dmg_per_action=1000.0, crit_rate=0.5, crit_dmg=1.0, actions=100
+)
+NON_CRIT_DMG = SAMPLER.dmg_per_action / (1 + SAMPLER.crit_rate * SAMPLER.crit_dmg)
+
+
+def binomial_quantile(n: int, p: float, q: float) -> int:
+    """Smallest k with P(X <= k) >= q for X ~ Binomial(n, p)."""
+    cdf = 0.0
+    for k in range(n + 1):
+        cdf += math.comb(n, k) * p**k * (1 - p) ** (n - k)
+        if cdf >= q:
+            return k
+    return n
+
+
+def test_summary_does_not_depend_on_workers() -> None:
+    run = functools.partial(
+        run_monte_carlo, SAMPLER, batch_size=1000, min_trials=2000, rel_ci_width=0.0005
+    )
+    serial = run(seed=7)
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        one_worker = run(seed=7, executor=executor, workers=1)
+        parallel = run(seed=7, executor=executor, workers=3)
+    assert serial.trials > 2000
+    assert one_worker == serial
+    assert parallel == serial
+    assert run(seed=8) != serial
+
+
+def test_stops_at_the_first_batch_meeting_the_ci_width() -> None:
+    run = functools.partial(
+        run_monte_carlo, SAMPLER, seed=3, batch_size=100, min_trials=100
+    )
+    summary = run(max_trials=100_000, rel_ci_width=0.01)
+    assert summary.trials < 100_000
+    assert summary.ci_high - summary.ci_low <= 0.01 * summary.mean
+
+    # The same batches, cut off one batch earlier, miss the target
+    earlier = run(max_trials=summary.trials - 100, rel_ci_width=0.01)
+    assert earlier.trials == summary.trials - 100
+    assert earlier.ci_high - earlier.ci_low > 0.01 * earlier.mean
+
+
+def test_summary_matches_the_binomial_distribution() -> None:
+    summary = run_monte_carlo(SAMPLER, seed=0, rel_ci_width=0.0002, threshold=105_000)
+    n, p = SAMPLER.actions, SAMPLER.crit_rate
+    crit_step = NON_CRIT_DMG * SAMPLER.crit_dmg
+
+    expected_mean = SAMPLER.dmg_per_action * n
+    assert summary.ci_low <= expected_mean <= summary.ci_high
+    assert summary.mean == pytest.approx(expected_mean, rel=1e-3)
+    assert summary.std == pytest.approx(
+        crit_step * math.sqrt(n * p * (1 - p)), rel=0.01
+    )
+
+    for q in PERCENTILES:
+        crits = binomial_quantile(n, p, q / 100)
+        # np.percentile may interpolate towards the next number of crits
+        assert summary.percentiles[q] == pytest.approx(
+            NON_CRIT_DMG * (n + SAMPLER.crit_dmg * crits), abs=crit_step
+        )
+
+    # 105,000 damage needs more than 57.5 crits
+    prob_above = sum(
+        math.comb(n, k) * p**k * (1 - p) ** (n - k) for k in range(58, n + 1)
+    )
+    assert summary.prob_above_threshold == pytest.approx(prob_above, abs=0.01)
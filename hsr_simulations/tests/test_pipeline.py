@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy.typing as npt
+import pytest
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.pipeline import OutputOptions, OutputStatus, run_pipeline
+
+
+def test_changed_output_options_rebuild(tmp_path: Path) -> None:
+    manifest_path = tmp_path / "manifest.json"
+    base_dir = tmp_path / "public"
+
+    def build(options: OutputOptions) -> OutputStatus:
+        [result] = run_pipeline(
+            [Hyacine()], base_dir, 1, manifest_path, options=options
+        )
+        return result.status
+
+    def header() -> str:
+        return (base_dir / "hyacine" / "hyacine_data.csv").read_text().split("\n")[0]
+
+    assert build(OutputOptions()) == OutputStatus.WRITTEN
+    assert header() == "speed,increased_outgoing_healing"
+    assert build(OutputOptions()) == OutputStatus.SKIPPED
+    assert build(OutputOptions(normalize=False)) == OutputStatus.WRITTEN
+    assert header().startswith("character,speed,increased_outgoing_healing,base_speed")
+
+
+def test_failed_character_does_not_stop_the_others(tmp_path: Path) -> None:
+    # Anaxa's rotations need a positive number of cycles
+    results = run_pipeline([Anaxa(total_cycles=0), Hyacine()], tmp_path, 1)
+    assert [result.status for result in results] == [
+        OutputStatus.FAILED,
+        OutputStatus.WRITTEN,
+    ]
+
+
+class BrokenHyacine(Hyacine):
+    """Hyacine whose sweep hits a bug, as a programming error would."""
+
+    def evaluate_sweep(
+        self, params: dict[str, npt.NDArray[Any]]
+    ) -> dict[str, npt.NDArray[Any]]:
+        raise KeyError("missing_column")
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_unexpected_errors_are_recorded_per_character(
+    tmp_path: Path, max_workers: int
+) -> None:
+    manifest_path = tmp_path / "manifest.json"
+    results = run_pipeline(
+        [BrokenHyacine(), Hyacine()], tmp_path / "public", max_workers, manifest_path
+    )
+    assert [result.status for result in results] == [
+        OutputStatus.FAILED,
+        OutputStatus.WRITTEN,
+    ]
+    assert results[0].error == "KeyError: 'missing_column'"
+    assert list(json.loads(manifest_path.read_text())) == ["hyacine"]
+
+
+def test_characters_that_cannot_reach_a_worker_fail_alone(tmp_path: Path) -> None:
+    class LocalHyacine(Hyacine):
+        """Defined in a function, so it cannot be pickled for a worker."""
+
+    results = run_pipeline(
+        [LocalHyacine(), Hyacine()], tmp_path / "public", 2, tmp_path / "manifest.json"
+    )
+    assert [result.status for result in results] == [
+        OutputStatus.FAILED,
+        OutputStatus.WRITTEN,
+    ]
+    assert list(json.loads((tmp_path / "manifest.json").read_text())) == ["hyacine"]
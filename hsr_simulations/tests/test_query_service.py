@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.output_backends import Columns
+from simulations.query_service import (
+    QUERIES,
+    Query,
+    QueryService,
+    ResultCache,
+    parse_anaxa_e4,
+)
+
+
+def get(target: str) -> tuple[int, Any]:
+    return asyncio.run(QueryService(None, ResultCache()).handle("GET", target))
+
+
+def test_anaxa_e4_sweeps_ally_skill_point_chance() -> None:
+    status, body = get(
+        "/query/anaxa_e4?ally_skill_point_chance_step=0.25&crit_rate=0.5&crit_dmg=1"
+    )
+    assert status == 200
+    columns = body["columns"]
+    assert columns["ally_skill_point_chance"] == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert columns["dmg_increased_from_e4"] == [
+        Anaxa().calculate_dmg_increased_from_e4_stochastic(chance, 0.5, 1.0)
+        for chance in columns["ally_skill_point_chance"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "ally_skill_point_chance_end=1.5",
+        "ally_skill_point_chance_step=0.00001",
+        "crit_rate=2",
+        "crit_dmg=-1",
+    ],
+)
+def test_anaxa_e4_rejects_bad_parameters(query: str) -> None:
+    status, _ = get(f"/query/anaxa_e4?{query}")
+    assert status == 400
+
+
+def test_unknown_query_is_not_found() -> None:
+    status, body = get("/query/kafka")
+    assert status == 404
+    assert body == {"error": "unknown query 'kafka'"}
+
+
+def test_simulation_key_error_is_a_server_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def run(**kwargs: Any) -> Columns:
+        raise KeyError("dmg_increased_from_e4")
+
+    monkeypatch.setitem(QUERIES, "anaxa_e4", Query(parse_anaxa_e4, run))
+    status, body = get("/query/anaxa_e4")
+    assert status == 500
+    assert body == {"error": "KeyError: 'dmg_increased_from_e4'"}
@@ -0,0 +1,90 @@
+import math
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from simulations import relics
+from simulations.build_optimizer import optimize_character_builds
+from simulations.characters.base_character import Character
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.characters.harmony.ruan_mei import RuanMei
+from simulations.characters.remembrance.hyacine import Hyacine
+from simulations.sweep import grid_slice
+
+ALL_PIECES = ((True, True),) * relics.RELIC_PIECES
+
+
+def all_builds(character: Character) -> dict[str, npt.NDArray[Any]]:
+    axes = character.build_axes()
+    return grid_slice(axes, 0, math.prod(np.size(values) for values in axes.values()))
+
+
+def feasible(rolls: tuple[int, ...], pieces: tuple[tuple[bool, ...], ...]) -> bool:
+    return bool(relics.feasible_roll_table(pieces)[rolls])
+
+
+@pytest.mark.parametrize(
+    ("rolls", "expected"),
+    [
+        # Six rolls per piece into one substat
+        ((36, 0), True),
+        # Two substats share one initial roll each and five upgrades per piece
+        ((36, 6), True),
+        ((35, 7), True),
+        ((36, 7), False),
+        ((21, 21), True),
+        ((22, 21), False),
+    ],
+)
+def test_rolls_per_piece(rolls: tuple[int, int], expected: bool) -> None:
+    assert feasible(rolls, ALL_PIECES) == expected
+
+
+def test_main_stat_is_never_a_substat() -> None:
+    pieces = ((True, True),) * 5 + ((False, True),)
+    assert feasible((30, 0), pieces)
+    assert not feasible((31, 0), pieces)
+    assert feasible((30, 11), pieces)
+    assert not feasible((30, 12), pieces)
+
+
+def test_mixed_layouts_match_their_tables() -> None:
+    first = np.array([36, 31, 30])
+    second = np.array([0, 0, 7])
+    last_piece = np.array([True, False, False])
+    result = relics.substat_rolls_feasible(
+        (first, second), ((True, True),) * 5 + ((last_piece, True),)
+    )
+    assert result.tolist() == [True, False, True]
+
+
+@pytest.mark.parametrize("character_class", [Hyacine, RuanMei])
+def test_build_front_is_reachable(character_class: type) -> None:
+    character = character_class()
+    params = all_builds(character)
+    scores = character.score_builds(params)
+    feasible_rows = ~np.isnan(next(iter(scores.values())))
+    roll_columns = [name for name in params if name.endswith("_rolls")]
+    # No feasible build rolls more than the relics hold in total
+    total_rolls = np.sum([params[name] for name in roll_columns], axis=0)
+    capacity = relics.RELIC_PIECES * (
+        relics.SUBSTAT_ROLLS_PER_PIECE - relics.SUBSTATS_PER_PIECE + len(roll_columns)
+    )
+    assert (total_rolls[feasible_rows] <= capacity).all()
+    assert feasible_rows.any()
+
+
+def test_hyacine_cannot_stack_speed_and_effect_res() -> None:
+    hyacine = Hyacine()
+    params = all_builds(hyacine)
+    scores = hyacine.score_builds(params)
+    stacked = (params["speed_rolls"] == 30) & (params["effect_res_rolls"] == 18)
+    assert np.isnan(scores["hp_percent"][stacked]).all()
+
+
+def test_characters_without_a_build_model_are_rejected() -> None:
+    assert not Anaxa().build_axes()
+    with pytest.raises(ValueError, match="no build model"):
+        optimize_character_builds(Anaxa())
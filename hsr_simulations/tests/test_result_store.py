@@ -0,0 +1,61 @@
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+import pytest
+
+from simulations.result_store import ResultStore
+
+ROWS = 100
+DTYPES = {
+    "speed": np.dtype(np.float64),
+    "cycles": np.dtype(np.int64),
+    "has_lc": np.dtype(np.bool_),
+}
+
+
+@pytest.fixture
+def store() -> Iterator[ResultStore]:
+    with ResultStore.create(DTYPES, ROWS) as store:
+        store.write(
+            0,
+            {
+                "speed": np.linspace(100.0, 200.0, ROWS),
+                "cycles": np.arange(ROWS),
+                "has_lc": np.arange(ROWS) % 2 == 0,
+            },
+        )
+        yield store
+
+
+def data_address(table: Any, name: str) -> int:
+    [chunk] = table.column(name).chunks
+    address: int = chunk.buffers()[1].address
+    return address
+
+
+def test_to_dataframe_shares_every_column(store: ResultStore) -> None:
+    df = store.to_dataframe()
+    assert df.shape == (ROWS, len(DTYPES))
+    assert df.dtypes.to_dict() == DTYPES
+    for name, values in store.columns.items():
+        np.testing.assert_array_equal(df[name].to_numpy(), values)
+        assert np.shares_memory(df[name].to_numpy(), values)
+    del df
+
+
+def test_to_arrow_shares_numeric_columns(store: ResultStore) -> None:
+    pa = pytest.importorskip("pyarrow")
+    table = store.to_arrow()
+    assert table.shape == (ROWS, len(DTYPES))
+    assert table.schema == pa.schema(
+        [("speed", pa.float64()), ("cycles", pa.int64()), ("has_lc", pa.bool_())]
+    )
+
+    for name, values in store.columns.items():
+        np.testing.assert_array_equal(table.column(name).to_numpy(), values)
+    assert data_address(table, "speed") == store.columns["speed"].ctypes.data
+    assert data_address(table, "cycles") == store.columns["cycles"].ctypes.data
+    # Arrow bit-packs booleans, so this column is a copy
+    assert data_address(table, "has_lc") != store.columns["has_lc"].ctypes.data
+    del table
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.rotation import solve_rotation
+from simulations.status_effects import StatusStacks
+
+
+def test_stacks_expire_after_their_duration() -> None:
+    stacks = StatusStacks(1, max_stacks=3, duration=2)
+    stacks.apply()
+    assert stacks.counts().tolist() == [1]
+    stacks.tick()
+    assert stacks.remaining().max() == 1
+    assert stacks.counts().tolist() == [1]
+    stacks.tick()
+    assert stacks.counts().tolist() == [0]
+
+
+def test_tick_only_advances_selected_entities() -> None:
+    stacks = StatusStacks(2, max_stacks=1, duration=1)
+    stacks.apply()
+    stacks.tick([True, False])
+    assert stacks.counts().tolist() == [0, 1]
+
+
+def test_max_stacks_caps_each_entity() -> None:
+    stacks = StatusStacks(2, max_stacks=[1, 2], duration=3)
+    for _ in range(3):
+        stacks.apply()
+    assert stacks.counts().tolist() == [1, 2]
+
+
+def test_refresh_replaces_the_oldest_stack() -> None:
+    stacks = StatusStacks(1, max_stacks=2, duration=3, refresh=True)
+    stacks.apply()
+    stacks.tick()
+    stacks.apply()
+    stacks.tick()
+    stacks.apply()
+    assert sorted(stacks.remaining()[0].tolist()) == [2, 3]
+
+
+def test_clear_removes_every_stack() -> None:
+    stacks = StatusStacks(2, max_stacks=2, duration=2)
+    stacks.apply()
+    stacks.clear([True, False])
+    assert stacks.counts().tolist() == [0, 1]
+
+
+def test_codes_round_trip() -> None:
+    stacks = StatusStacks(3, max_stacks=2, duration=[1, 2, 3])
+    stacks.apply([True, True, False])
+    stacks.tick()
+    stacks.apply()
+    restored = StatusStacks.from_codes(stacks.codes(), 2, [1, 2, 3])
+    assert restored.codes().tolist() == stacks.codes().tolist()
+    np.testing.assert_array_equal(
+        np.sort(restored.remaining(), axis=1), np.sort(stacks.remaining(), axis=1)
+    )
+
+
+def test_from_codes_rejects_too_many_stacks() -> None:
+    # Two stacks with one turn left each
+    with pytest.raises(ValueError, match="more stacks"):
+        StatusStacks.from_codes([1 + 3, 1 + 3], max_stacks=[1, 2], duration=2)
+    with pytest.raises(ValueError, match="out of range"):
+        StatusStacks.from_codes([9], max_stacks=2, duration=2)
+
+
+@pytest.mark.parametrize("total_cycles", [0, 1, 5, 1000, None])
+def test_batched_e4_rotation_matches_scalar(total_cycles: int | None) -> None:
+    anaxa = Anaxa()
+    setups = [
+        (has_e4, skill_points) for has_e4 in (False, True) for skill_points in range(6)
+    ]
+    initial_states: list[tuple[int, tuple[int, ...]]] = [
+        (skill_points, ()) for _, skill_points in setups
+    ]
+    expected = [
+        solve_rotation(initial_state, anaxa.e4_rotation_step(has_e4), total_cycles)
+        for (has_e4, _), initial_state in zip(setups, initial_states, strict=True)
+    ]
+    has_e4, skill_points = zip(*setups, strict=True)
+    batched = anaxa.simulate_e4_rotation_batch(has_e4, total_cycles, skill_points)
+    assert batched.tolist() == expected
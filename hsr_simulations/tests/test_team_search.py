@@ -0,0 +1,106 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from simulations.team_search import (
+    ERUDITION_ALLY,
+    HEALER_ALLY,
+    TEAM_SIZE,
+    CarryTable,
+    MemberOptions,
+    TeamTables,
+    iter_teams,
+    search_teams,
+)
+
+TOP_K = 5
+
+
+def small_roster(seed: int = 0) -> TeamTables:
+    rng = np.random.default_rng(seed)
+
+    def member(name: str, builds: int, dmg: bool, heal: bool) -> MemberOptions:
+        return MemberOptions(
+            name,
+            tuple(f"{name}_{i}" for i in range(builds)),
+            rng.uniform(0.0, 0.5, builds) if dmg else np.zeros(builds),
+            (
+                np.asarray(rng.choice([1000.0, 2000.0, 3000.0], builds), np.float64)
+                if heal
+                else np.zeros(builds)
+            ),
+        )
+
+    members = {
+        "buffer": member("buffer", 4, dmg=True, heal=False),
+        "healer": member("healer", 3, dmg=False, heal=True),
+        "hybrid": member("hybrid", 3, dmg=True, heal=True),
+        ERUDITION_ALLY: MemberOptions(
+            ERUDITION_ALLY, ("",), np.zeros(1), np.zeros(1), erudition=True
+        ),
+        HEALER_ALLY: MemberOptions(HEALER_ALLY, ("",), np.zeros(1), np.array([1500.0])),
+    }
+    heal_levels = np.unique(
+        np.concatenate([[0.0], *(m.heal_amount for m in members.values())])
+    )
+
+    def carry(name: str, builds: int, erudition: bool) -> CarryTable:
+        # Output never drops with more healing, as for the real carries
+        steps = rng.uniform(0.0, 0.2, (TEAM_SIZE + 1, len(heal_levels), builds))
+        return CarryTable(
+            name,
+            tuple(f"{name}_{i}" for i in range(builds)),
+            1.0 + np.cumsum(steps, axis=1),
+            erudition,
+        )
+
+    carries = {
+        "erudite": carry("erudite", 5, erudition=True),
+        "sustained": carry("sustained", 2, erudition=False),
+    }
+    return TeamTables(carries, members, heal_levels)
+
+
+def exhaustive_scores(
+    tables: TeamTables,
+) -> dict[tuple[tuple[str, ...], tuple[str, ...]], float]:
+    """Score of every build of every team, keyed on (team, builds)."""
+    scores = {}
+    for team in iter_teams(tables):
+        carry = tables.carries[team[0]]
+        supports = [tables.members[name] for name in team[1:]]
+        erudition_count = carry.erudition + sum(m.erudition for m in supports)
+        for carry_build in range(len(carry.builds)):
+            for choice in itertools.product(*(range(len(m.builds)) for m in supports)):
+                picked = list(zip(supports, choice, strict=True))
+                heal = max([0.0, *(float(m.heal_amount[i]) for m, i in picked)])
+                heal_level = int(np.searchsorted(tables.heal_levels, heal))
+                score = float(carry.output[erudition_count, heal_level, carry_build])
+                score *= 1 + sum(float(m.dmg_bonus[i]) for m, i in picked)
+                builds = (carry.builds[carry_build], *(m.builds[i] for m, i in picked))
+                scores[team, builds] = score
+    return scores
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_pruned_search_matches_exhaustive_search(max_workers: int, seed: int) -> None:
+    tables = small_roster(seed)
+    scores = exhaustive_scores(tables)
+    search = search_teams(tables, TOP_K, max_workers)
+
+    # Builds with equal effects tie, so compare the scores and check that
+    # every result really scores what the search reports
+    expected = sorted(scores.values(), reverse=True)[:TOP_K]
+    assert [r.score for r in search.results] == pytest.approx(expected)
+    for result in search.results:
+        assert scores[result.team, result.builds] == pytest.approx(result.score)
+
+    teams = list(iter_teams(tables))
+    assert search.teams == len(teams)
+    assert search.candidates == len(scores)
+    # The bounds and dominated builds must actually have been used
+    assert search.evaluated < search.candidates
+    if max_workers == 1:
+        assert search.pruned_teams > 0
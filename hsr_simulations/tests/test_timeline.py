@@ -0,0 +1,128 @@
+import pytest
+
+from simulations.characters.erudition.anaxa import Anaxa
+from simulations.rotation import solve_rotation
+from simulations.timeline import (
+    Timeline,
+    TimelineActor,
+    TurnRecord,
+    cycles_action_value,
+)
+
+
+def turn_order(turns: list[TurnRecord]) -> list[tuple[float, str]]:
+    return [(turn.action_value, turn.actor_name) for turn in turns]
+
+
+def test_faster_actors_act_first_and_more_often() -> None:
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("slow", 100))
+    timeline.add_actor(TimelineActor("fast", 160))
+    assert turn_order(timeline.run(200)) == [
+        (62.5, "fast"),
+        (100.0, "slow"),
+        (125.0, "fast"),
+        (187.5, "fast"),
+        (200.0, "slow"),
+    ]
+
+
+def test_equal_action_values_keep_scheduling_order() -> None:
+    timeline = Timeline()
+    for name in ("first", "second", "third"):
+        timeline.add_actor(TimelineActor(name, 125))
+    assert [turn.actor_name for turn in timeline.run(160)] == [
+        "first",
+        "second",
+        "third",
+    ] * 2
+
+
+def test_advance_and_delay_move_by_a_fraction_of_the_gauge() -> None:
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("ally", 100))
+    timeline.add_actor(TimelineActor("enemy", 80))
+    timeline.advance_action("ally", 0.25)
+    timeline.delay_action("enemy", 0.2)
+    assert timeline.next_action_value("ally") == 75.0
+    assert timeline.next_action_value("enemy") == 150.0
+    assert turn_order(timeline.run(175)) == [
+        (75.0, "ally"),
+        (150.0, "enemy"),
+        (175.0, "ally"),
+    ]
+
+
+def test_advance_cannot_move_before_the_current_action_value() -> None:
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("ally", 100))
+    timeline.run(100)
+    timeline.advance_action("ally", 1.5)
+    assert timeline.next_action_value("ally") == 100.0
+
+
+def test_on_turn_can_advance_another_actor() -> None:
+    def advance_ally(timeline: Timeline, actor: TimelineActor) -> None:
+        timeline.advance_action("ally", 1.0)
+
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("ally", 50))
+    timeline.add_actor(TimelineActor("support", 100, advance_ally))
+    assert turn_order(timeline.run(200)) == [
+        (100.0, "support"),
+        (100.0, "ally"),
+        (200.0, "support"),
+        (200.0, "ally"),
+    ]
+
+
+def test_set_speed_mid_turn_keeps_the_covered_distance() -> None:
+    def speed_up_ally(timeline: Timeline, actor: TimelineActor) -> None:
+        timeline.set_speed("ally", 200)
+
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("ally", 100))
+    timeline.add_actor(TimelineActor("support", 250, speed_up_ally))
+    # At 40 AV the ally has covered 4000 of its gauge; the remaining 6000
+    # take 30 AV at speed 200, and every turn after takes 50. Rescheduling
+    # by set_speed puts the ally behind the support's turn at 120
+    assert turn_order(timeline.run(130)) == [
+        (40.0, "support"),
+        (70.0, "ally"),
+        (80.0, "support"),
+        (120.0, "support"),
+        (120.0, "ally"),
+    ]
+
+
+def test_duplicate_actors_are_rejected() -> None:
+    timeline = Timeline()
+    timeline.add_actor(TimelineActor("ally", 100))
+    with pytest.raises(ValueError, match="already"):
+        timeline.add_actor(TimelineActor("ally", 120))
+
+
+def test_anaxa_lc_rotation_follows_speed() -> None:
+    # At speed 125 Anaxa acts every 80 AV: 4 turns in the first 3 cycles
+    turns = list(Anaxa().iter_lc_rotation(True, 125, cycles_action_value(3)))
+    assert [turn.action_value for turn, _ in turns] == [80.0, 160.0, 240.0, 320.0]
+    # Skill with the light cone deals 1000 * 1.12 * 1.6. Energy after each
+    # turn is 40, 80, 120 and 160, spent on an Ultimate in the fourth turn
+    assert [dmg for _, dmg in turns] == pytest.approx([1792, 1792, 1792, 2792])
+
+
+@pytest.mark.parametrize("total_cycles", [0, 1, 7, 1000])
+def test_anaxa_lc_rotation_at_cycle_speed_matches_fixed_cycles(
+    total_cycles: int,
+) -> None:
+    anaxa = Anaxa()
+    for has_lc in (False, True):
+        turns = list(
+            anaxa.iter_lc_rotation(
+                has_lc, anaxa.SPEED, cycles_action_value(total_cycles)
+            )
+        )
+        assert len(turns) == total_cycles
+        assert sum(dmg for _, dmg in turns) == solve_rotation(
+            0, anaxa.lc_rotation_step(has_lc), total_cycles
+        )
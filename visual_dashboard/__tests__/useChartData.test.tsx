@@ -153,6 +153,53 @@ describe("useChartData hook", () => {
     });
   });
 
+  it("merges the metadata sidecar into every row", async () => {
+    (global.fetch as any).mockImplementation((path: string) =>
+      Promise.resolve(
+        path === "/hyacine/hyacine_metadata.json"
+          ? {
+              ok: true,
+              text: () =>
+                Promise.resolve('{"character": "Hyacine", "base_speed": 110}'),
+            }
+          : {
+              ok: true,
+              text: () => Promise.resolve("speed,value\n110,0\n120,0.1"),
+            },
+      ),
+    );
+
+    const Papa = await import("papaparse");
+    Papa.default.parse = vi.fn((csvText, options) => {
+      setTimeout(() => {
+        if (options.complete) {
+          options.complete({
+            data: [
+              { speed: 110, value: 0 },
+              { speed: 120, value: 0.1 },
+            ],
+            meta: { fields: ["speed", "value"] },
+          });
+        }
+      }, 0);
+      return {};
+    });
+
+    const { result } = renderHook(() =>
+      useChartData({ csvPath: "/hyacine/hyacine_data.csv" }),
+    );
+
+    await waitFor(() => {
+      expect(result.current.loading).toBe(false);
+    });
+
+    expect(global.fetch).toHaveBeenCalledWith("/hyacine/hyacine_metadata.json");
+    expect(result.current.data).toEqual([
+      { character: "Hyacine", base_speed: 110, speed: 110, value: 0 },
+      { character: "Hyacine", base_speed: 110, speed: 120, value: 0.1 },
+    ]);
+  });
+
   it("uses correct Papa Parse options", async () => {
     (global.fetch as any).mockResolvedValue({
       text: () => Promise.resolve("test data"),
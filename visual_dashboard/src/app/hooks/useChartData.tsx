@@ -12,6 +12,26 @@ interface UseChartDataOptions<T> {
   onDataProcessed?: (data: T[]) => void;
 }
 
+// Scalars shared by every row, e.g. Hyacine's base speed, are written once to
+// a <character>_metadata.json sidecar next to <character>_data.csv
+async function fetchMetadata(
+  csvPath: string,
+): Promise<Record<string, unknown>> {
+  const metadataPath = csvPath.replace(/_data\.csv$/, "_metadata.json");
+  if (metadataPath === csvPath) return {};
+  try {
+    const response = await fetch(metadataPath);
+    if (!response.ok) return {};
+    const metadata: unknown = JSON.parse(await response.text());
+    return metadata !== null && typeof metadata === "object"
+      ? (metadata as Record<string, unknown>)
+      : {};
+  } catch {
+    // Without a readable sidecar the rows are used as they are
+    return {};
+  }
+}
+
 export function useChartData<T>({
   csvPath,
   onDataProcessed,
@@ -23,7 +43,10 @@ export function useChartData<T>({
   useEffect(() => {
     const fetchAndParseData = async () => {
       try {
-        const response = await fetch(csvPath);
+        const [response, metadata] = await Promise.all([
+          fetch(csvPath),
+          fetchMetadata(csvPath),
+        ]);
         const csvText = await response.text();
 
         Papa.parse<T>(csvText, {
@@ -32,8 +55,9 @@ export function useChartData<T>({
           skipEmptyLines: true,
           complete: (results) => {
             if (results.data.length > 0) {
-              setData(results.data);
-              onDataProcessed?.(results.data);
+              const rows = results.data.map((row) => ({ ...metadata, ...row }));
+              setData(rows);
+              onDataProcessed?.(rows);
             }
             setLoading(false);
           },